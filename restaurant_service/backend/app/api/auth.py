@@ -11,12 +11,20 @@ from app.core.security import (
     get_password_hash,
     create_access_token,
     get_current_user,
-    get_current_active_user
+    get_current_active_user,
+    invalidate_user_cache,
+    password_needs_rehash
 )
 from app.core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["Аутентификация"])
 
+def _rehash_if_needed(user: User, plain_password: str, db: Session):
+    """Перехеширование пароля при входе, если изменилась стоимость bcrypt"""
+    if password_needs_rehash(user.password):
+        user.password = get_password_hash(plain_password)
+        db.commit()
+
 @router.post("/register", response_model=Token)
 def register(
     user_data: UserRegister,
@@ -79,6 +87,8 @@ def login(
             detail="Пользователь заблокирован"
         )
 
+    _rehash_if_needed(user, form_data.password, db)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id), "role": user.role},
@@ -129,6 +139,8 @@ def login_json(
             detail="Пользователь заблокирован"
         )
 
+    _rehash_if_needed(user, password, db)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id), "role": user.role},
@@ -168,16 +180,22 @@ def change_password(
     db: Session = Depends(get_db)
 ):
     """Смена пароля"""
-    if not verify_password(password_data.old_password, current_user.password):
+    # current_user может быть взят из кеша, поэтому изменяем строку из БД
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
+
+    if not verify_password(password_data.old_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Неверный текущий пароль"
         )
 
     hashed_password = get_password_hash(password_data.new_password)
-    current_user.password = hashed_password
+    user.password = hashed_password
 
     db.commit()
+    invalidate_user_cache(user.id)
 
     return {"message": "Пароль успешно изменен"}
 
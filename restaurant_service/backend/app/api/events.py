@@ -0,0 +1,70 @@
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.core.events import kitchen_events
+
+router = APIRouter(prefix="/events", tags=["События кухни"])
+
+HEARTBEAT_SECONDS = 15
+
+def _matches(event: dict, order_id: Optional[int]) -> bool:
+    return order_id is None or event.get("order_id") == order_id
+
+@router.get("/kitchen")
+async def kitchen_event_stream(request: Request, order_id: Optional[int] = None):
+    """
+    Поток событий по блюдам (Server-Sent Events).
+    Событие отправляется после каждого коммита, меняющего блюда заказа.
+    """
+    async def stream():
+        subscription = kitchen_events.subscribe()
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": ping\n\n"
+                elif _matches(event, order_id):
+                    data = json.dumps(event, ensure_ascii=False, default=str)
+                    yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            kitchen_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/kitchen/ws")
+async def kitchen_event_socket(websocket: WebSocket, order_id: Optional[int] = None):
+    """Поток событий по блюдам через WebSocket"""
+    subscription = kitchen_events.subscribe()
+    receiver = None
+    try:
+        await websocket.accept()
+        # Входящие сообщения читаем параллельно, чтобы сразу заметить отключение клиента
+        receiver = asyncio.create_task(websocket.receive())
+        while True:
+            getter = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+
+            if getter in done:
+                event = getter.result()
+                if _matches(event, order_id):
+                    await websocket.send_text(json.dumps(event, ensure_ascii=False, default=str))
+            else:
+                getter.cancel()
+
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if receiver is not None:
+            receiver.cancel()
+        kitchen_events.unsubscribe(subscription)
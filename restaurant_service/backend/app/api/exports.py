@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import get_db
+from app.db_models import CookingStatusHistory, Menu, Order, User
+
+router = APIRouter(prefix="/exports", tags=["Экспорт"])
+
+# Выгрузки читают строки серверным курсором (yield_per) и пишут ответ
+# частями, поэтому память воркера не зависит от размера периода.
+
+ORDER_COLUMNS = ["id", "waiter", "waiter_name", "status", "timestart", "endtime", "total", "plate_count"]
+HISTORY_COLUMNS = ["id", "change_time", "new_status", "order_id", "plate_id", "plate_name", "change_by", "user_name"]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+def _period(start_date: Optional[date], end_date: Optional[date]):
+    """Границы периода: начало start_date и конец end_date включительно"""
+    start = datetime.combine(start_date, time.min) if start_date else None
+    end = datetime.combine(end_date, time.min) + timedelta(days=1) if end_date else None
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="Начало периода позже конца")
+    return start, end
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется")
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Sequence], chunk_size: int) -> Iterator[str]:
+    """CSV с заголовком; строки отдаются пачками по chunk_size"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for number, row in enumerate(rows, start=1):
+        writer.writerow([_csv_value(value) for value in row])
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def iter_ndjson(columns: Sequence[str], rows: Iterable[Sequence], chunk_size: int) -> Iterator[str]:
+    """Один JSON-объект на строку; строки отдаются пачками по chunk_size"""
+    lines: List[str] = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def _export_response(name: str, export_format: str, columns: Sequence[str], rows: Iterable[Sequence],
+                     start_date: Optional[date], end_date: Optional[date]) -> StreamingResponse:
+    chunk_size = settings.EXPORT_BATCH_SIZE
+    body = iter_csv(columns, rows, chunk_size) if export_format == "csv" else iter_ndjson(columns, rows, chunk_size)
+    filename = "_".join([name, str(start_date or "begin"), str(end_date or "now")]) + f".{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+def _check_format(export_format: str):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неверный формат. Допустимые: {', '.join(EXPORT_FORMATS)}"
+        )
+
+def _stream_rows(db: Session, statement) -> Iterator[Sequence]:
+    """Строки запроса серверным курсором пачками по EXPORT_BATCH_SIZE"""
+    result = db.execute(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+# ===== ЭНДПОИНТЫ =====
+@router.get("/orders")
+def export_orders(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    format: str = "csv",
+    db: Session = Depends(get_db)
+):
+    """Выгрузка заказов за период (по времени начала) в CSV или NDJSON"""
+    _check_format(format)
+    start, end = _period(start_date, end_date)
+
+    statement = select(
+        Order.id, Order.waiter, User.name, Order.status, Order.timestart,
+        Order.endtime, Order.total, Order.plate_count
+    ).outerjoin(User, User.id == Order.waiter)
+    if start:
+        statement = statement.where(Order.timestart >= start)
+    if end:
+        statement = statement.where(Order.timestart < end)
+    statement = statement.order_by(Order.timestart, Order.id)
+
+    return _export_response("orders", format, ORDER_COLUMNS, _stream_rows(db, statement), start_date, end_date)
+
+@router.get("/cooking-status-history")
+def export_cooking_status_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    format: str = "csv",
+    db: Session = Depends(get_db)
+):
+    """Выгрузка истории статусов блюд за период в CSV или NDJSON"""
+    _check_format(format)
+    start, end = _period(start_date, end_date)
+
+    statement = select(
+        CookingStatusHistory.id, CookingStatusHistory.change_time, CookingStatusHistory.new_status,
+        CookingStatusHistory.order_id, CookingStatusHistory.plate_id, Menu.name,
+        CookingStatusHistory.change_by, User.name
+    ).outerjoin(Menu, Menu.id == CookingStatusHistory.plate_id)\
+        .outerjoin(User, User.id == CookingStatusHistory.change_by)
+    if start:
+        statement = statement.where(CookingStatusHistory.change_time >= start)
+    if end:
+        statement = statement.where(CookingStatusHistory.change_time < end)
+    statement = statement.order_by(CookingStatusHistory.change_time, CookingStatusHistory.id)
+
+    return _export_response(
+        "cooking_status_history", format, HISTORY_COLUMNS, _stream_rows(db, statement), start_date, end_date
+    )
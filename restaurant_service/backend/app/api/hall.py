@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.orm import Session
+from app.core.hall_state import hall_state
+from app.database import get_db
+
+router = APIRouter(prefix="/hall", tags=["Зал"])
+
+@router.get("/")
+def get_hall_state(db: Session = Depends(get_db)):
+    """
+    Снимок зала одним ответом: столы с координатами и статусом, активный
+    заказ на каждом столе и его текущая сумма.
+    """
+    return Response(content=hall_state.get(db).payload, media_type="application/json")
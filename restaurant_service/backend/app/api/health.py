@@ -1,20 +1,49 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.database import get_db
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.db_metrics import route_db_metrics
+from app.core.health import HealthChecker, STATUS_DOWN, STATUS_OK
+from app.database import engine, async_engine, probe_engine
+from app.db_models import Base
 
 router = APIRouter()
 
+_pools = [("sync", engine.pool)]
+if async_engine is not None:
+    _pools.append(("async", async_engine.pool))
+
+health_checker = HealthChecker(
+    probe_engine, _pools, Base.metadata,
+    cache_seconds=settings.HEALTH_CACHE_SECONDS,
+    schema_cache_seconds=settings.HEALTH_SCHEMA_CACHE_SECONDS
+)
+
 @router.get("/health")
-def health_check(db: Session = Depends(get_db)):
-    """Проверка подключения к БД"""
-    try:
-        db.execute(text("SELECT 1"))
-        db_status = "connected"
-    except Exception:
-        db_status = "disconnected"
-
-    return {
-        "status": "healthy",
-        "database": db_status
-    }
\ No newline at end of file
+def health_check():
+    """Проверка подключения к БД (503, если БД недоступна)"""
+    result = health_checker.check()
+    connected = result["status"] != STATUS_DOWN
+
+    return JSONResponse(
+        status_code=200 if connected else 503,
+        content={
+            "status": "healthy" if connected else "unhealthy",
+            "database": "connected" if connected else "disconnected"
+        }
+    )
+
+@router.get("/health/live")
+def liveness():
+    """Процесс жив и обрабатывает запросы. БД не проверяется"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+def readiness():
+    """Готовность принимать трафик: задержка БД, пулы, схема. 503, если не ok"""
+    result = health_checker.check()
+    return JSONResponse(status_code=200 if result["status"] == STATUS_OK else 503, content=result)
+
+@router.get("/health/queries")
+def query_stats():
+    """Гистограммы числа SQL-запросов и времени в БД по маршрутам"""
+    return route_db_metrics.snapshot()
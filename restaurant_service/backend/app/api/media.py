@@ -0,0 +1,51 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.core.media import CONTENT_TYPES, MEDIA_NAME, media_store
+
+router = APIRouter(prefix="/media", tags=["Фото"])
+
+# Имя файла - хеш содержимого, поэтому ответ по ссылке не меняется никогда
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+# Оригинал вместо еще не построенной миниатюры кешируется ненадолго
+FALLBACK_CACHE = "public, max-age=300"
+
+def _check_name(name: str) -> str:
+    """Имя из URL: только sha256.расширение, без путей"""
+    if not MEDIA_NAME.match(name):
+        raise HTTPException(status_code=404, detail="Фото не найдено")
+    path = media_store.path(name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Фото не найдено")
+    return path
+
+def _file_response(request: Request, path: str, name: str, cache_control: str) -> Response:
+    etag = f'"{name.split(".")[0]}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=CONTENT_TYPES[name.rsplit(".", 1)[1]], headers=headers)
+
+@router.get("/thumbs/{name}")
+async def get_thumbnail(name: str, request: Request):
+    """Миниатюра фото блюда; строится при первом запросе, если ее еще нет"""
+    original = _check_name(name)
+    thumbnail = media_store.thumbnail_path(name)
+
+    if not os.path.exists(thumbnail):
+        future = media_store.request_thumbnail(name)
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception:
+                pass
+        if not os.path.exists(thumbnail):
+            return _file_response(request, original, name, FALLBACK_CACHE)
+
+    return _file_response(request, thumbnail, name, IMMUTABLE_CACHE)
+
+@router.get("/{name}")
+def get_photo(name: str, request: Request):
+    """Фото блюда в исходном размере"""
+    return _file_response(request, _check_name(name), name, IMMUTABLE_CACHE)
@@ -1,38 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.media import MediaError, media_store, photo_url, thumbnail_url
+from app.core.menu_cache import menu_cache
 from app.database import get_db
 from app.db_models import Menu, Category
 from app.schemas.menu_schemas import *
 
 router = APIRouter(prefix="/menu", tags=["Меню"])
 
+# Максимальное число результатов поиска за один запрос
+MAX_SEARCH_LIMIT = 100
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Проверка заголовка If-None-Match против текущего ETag каталога"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+def _store_photo(value: Optional[str]) -> Optional[str]:
+    """Фото из запроса в хранилище; в БД остается только ссылка"""
+    try:
+        return media_store.store_photo_value(value)
+    except MediaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _menu_response(item: Menu, category_name: Optional[str]) -> MenuResponse:
+    return MenuResponse(
+        id=item.id,
+        name=item.name,
+        description=item.description,
+        photo=photo_url(item.photo),
+        price=item.price,
+        category=item.category,
+        category_name=category_name,
+        is_available=item.is_available,
+        thumbnail=thumbnail_url(item.photo)
+    )
+
 # ===== ЭНДПОИНТЫ ДЛЯ БЛЮД =====
 @router.get("/", response_model=List[MenuResponse])
-def get_all_menu(category_id: Optional[int] = None, is_available: Optional[bool] = None, db: Session = Depends(get_db)):
-    """Получить все блюда"""
-    query = db.query(Menu)
+def get_all_menu(
+    request: Request,
+    response: Response,
+    category_id: Optional[int] = None,
+    is_available: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Получить все блюда (из кеша меню, с поддержкой ETag/If-None-Match)"""
+    catalog = menu_cache.get(db)
+    if _etag_matches(request, catalog.etag):
+        return _not_modified(catalog.etag)
+
+    menu_items = catalog.items
 
     if category_id is not None:
-        query = query.filter(Menu.category == category_id)
+        menu_items = [item for item in menu_items if item.category == category_id]
 
     if is_available is not None:
-        query = query.filter(Menu.is_available == is_available)
-
-    menu_items = query.order_by(Menu.name).all()
+        menu_items = [item for item in menu_items if item.is_available == is_available]
 
+    response.headers["ETag"] = catalog.etag
     return menu_items
 
+@router.get("/search", response_model=List[MenuSearchResult])
+def search_menu(
+    q: str,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    category_id: Optional[int] = None,
+    is_available: Optional[bool] = None,
+    db: Session = Depends(get_db)
+):
+    """Поиск блюд по названию и описанию с учетом опечаток (индекс в памяти)"""
+    catalog = menu_cache.get(db)
+
+    results = []
+    # Фильтры применяются после ранжирования, поэтому кандидатов берем с запасом
+    candidates = limit if category_id is None and is_available is None else len(catalog.items)
+    for item_id, score in menu_cache.search_index.search(q, candidates):
+        item = catalog.items_by_id.get(item_id)
+        if item is None:
+            continue
+        if category_id is not None and item.category != category_id:
+            continue
+        if is_available is not None and item.is_available != is_available:
+            continue
+        results.append(MenuSearchResult(**item.model_dump(), score=score))
+        if len(results) == limit:
+            break
+
+    return results
+
 @router.get("/{menu_id}", response_model=MenuResponse)
 def get_menu_item(menu_id: int, db: Session = Depends(get_db)):
     """Получить блюдо по ID"""
-    item = db.query(Menu).filter(Menu.id == menu_id).first()
+    item = menu_cache.get(db).items_by_id.get(menu_id)
     if not item:
         raise HTTPException(status_code=404, detail="Блюдо не найдено")
 
-    item_dict = item.__dict__.copy()
-    item_dict['category_name'] = item.category_of_item.name if item.category_of_item else None
-    return MenuResponse(**item_dict)
+    return item
 
 @router.post("/", response_model=MenuResponse)
 def create_menu_item(menu_data: MenuCreate, db: Session = Depends(get_db)):
@@ -44,7 +115,7 @@ def create_menu_item(menu_data: MenuCreate, db: Session = Depends(get_db)):
     menu_item = Menu(
         name=menu_data.name,
         description=menu_data.description,
-        photo=menu_data.photo,
+        photo=_store_photo(menu_data.photo),
         price=menu_data.price,
         category=menu_data.category,
         is_available=menu_data.is_available
@@ -53,10 +124,9 @@ def create_menu_item(menu_data: MenuCreate, db: Session = Depends(get_db)):
     db.add(menu_item)
     db.commit()
     db.refresh(menu_item)
+    menu_cache.invalidate()
 
-    item_dict = menu_item.__dict__.copy()
-    item_dict['category_name'] = category.name
-    return MenuResponse(**item_dict)
+    return _menu_response(menu_item, category.name)
 
 @router.put("/{menu_id}", response_model=MenuResponse)
 def update_menu_item(menu_id: int, menu_data: MenuUpdate, db: Session = Depends(get_db)):
@@ -65,29 +135,50 @@ def update_menu_item(menu_id: int, menu_data: MenuUpdate, db: Session = Depends(
     if not item:
         raise HTTPException(status_code=404, detail="Блюдо не найдено")
 
+    if menu_data.category is not None:
+        # Проверяем существование новой категории
+        category = db.query(Category).filter(Category.id == menu_data.category).first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Категория не найдена")
+        item.category = menu_data.category
     if menu_data.name is not None:
         item.name = menu_data.name
     if menu_data.description is not None:
         item.description = menu_data.description
-    if menu_data.photo is not None:
-        item.photo = menu_data.photo
     if menu_data.price is not None:
         item.price = menu_data.price
     if menu_data.is_available is not None:
         item.is_available = menu_data.is_available
-    if menu_data.category is not None:
-        # Проверяем существование новой категории
-        category = db.query(Category).filter(Category.id == menu_data.category).first()
-        if not category:
-            raise HTTPException(status_code=404, detail="Категория не найдена")
-        item.category = menu_data.category
+    # Фото сохраняется в хранилище последним, после всех проверок,
+    # чтобы отклоненный запрос не оставлял файлов без ссылок
+    if menu_data.photo is not None:
+        item.photo = _store_photo(menu_data.photo)
 
     db.commit()
     db.refresh(item)
+    menu_cache.invalidate()
 
-    item_dict = item.__dict__.copy()
-    item_dict['category_name'] = item.category_of_item.name if item.category_of_item else None
-    return MenuResponse(**item_dict)
+    return _menu_response(item, item.category_of_item.name if item.category_of_item else None)
+
+@router.put("/{menu_id}/photo", response_model=MenuResponse)
+def upload_menu_photo(menu_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Загрузить фото блюда файлом (multipart/form-data)"""
+    item = db.query(Menu).filter(Menu.id == menu_id).first()
+    if not item:
+        raise HTTPException(status_code=404, detail="Блюдо не найдено")
+
+    # Читаем на байт больше лимита, чтобы отличить слишком большой файл
+    data = file.file.read(media_store.max_bytes + 1)
+    try:
+        item.photo = media_store.put(data)
+    except MediaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db.commit()
+    db.refresh(item)
+    menu_cache.invalidate()
+
+    return _menu_response(item, item.category_of_item.name if item.category_of_item else None)
 
 @router.delete("/{menu_id}")
 def delete_menu_item(menu_id: int, db: Session = Depends(get_db)):
@@ -98,19 +189,25 @@ def delete_menu_item(menu_id: int, db: Session = Depends(get_db)):
 
     db.delete(item)
     db.commit()
+    menu_cache.invalidate()
 
     return {"message": "Блюдо удалено"}
 
 # ===== ЭНДПОИНТЫ ДЛЯ КАТЕГОРИЙ =====
 @router.get("/categories/", response_model=List[CategoryResponse])
-def get_all_categories(db: Session = Depends(get_db)):
+def get_all_categories(request: Request, response: Response, db: Session = Depends(get_db)):
     """Получить все категории"""
-    return db.query(Category).order_by(Category.name).all()
+    catalog = menu_cache.get(db)
+    if _etag_matches(request, catalog.etag):
+        return _not_modified(catalog.etag)
+
+    response.headers["ETag"] = catalog.etag
+    return catalog.categories
 
 @router.get("/categories/{category_id}", response_model=CategoryResponse)
 def get_category(category_id: int, db: Session = Depends(get_db)):
     """Получить категорию по ID"""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = menu_cache.get(db).categories_by_id.get(category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
     return category
@@ -122,6 +219,7 @@ def create_category(category_data: CategoryCreate, db: Session = Depends(get_db)
     db.add(category)
     db.commit()
     db.refresh(category)
+    menu_cache.invalidate()
     return category
 
 @router.put("/categories/{category_id}", response_model=CategoryResponse)
@@ -134,6 +232,7 @@ def update_category(category_id: int, category_data: CategoryCreate, db: Session
     category.name = category_data.name
     db.commit()
     db.refresh(category)
+    menu_cache.invalidate()
     return category
 
 @router.delete("/categories/{category_id}")
@@ -145,5 +244,6 @@ def delete_category(category_id: int, db: Session = Depends(get_db)):
 
     db.delete(category)
     db.commit()
+    menu_cache.invalidate()
 
     return {"message": "Категория удалена"}
\ No newline at end of file
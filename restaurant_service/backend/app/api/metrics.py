@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.metrics import MetricsWriter, request_metrics, write_db_query_metrics, write_pool_metrics
+from app.database import engine, async_engine, get_db
+from app.db_models import Order, Table
+
+router = APIRouter(tags=["Мониторинг"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _write_business_metrics(writer: MetricsWriter, db: Session):
+    """Активные заказы, блюда в работе и столы по статусам - два агрегатных запроса"""
+    active_orders, pending_plates = db.query(
+        func.count(Order.id), func.coalesce(func.sum(Order.pending_plate_count), 0)
+    ).filter(Order.status == "active").one()
+    tables = db.query(Table.status, func.count(Table.id)).group_by(Table.status).all()
+
+    writer.family("restaurant_active_orders", "gauge", "Активные заказы")
+    writer.sample("restaurant_active_orders", active_orders)
+    writer.family("restaurant_pending_plates", "gauge", "Неподанные блюда в активных заказах")
+    writer.sample("restaurant_pending_plates", pending_plates)
+    writer.family("restaurant_tables", "gauge", "Столы по статусам")
+    for status, count in tables:
+        writer.sample("restaurant_tables", count, {"status": status})
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics(db: Session = Depends(get_db)):
+    """Метрики в текстовом формате Prometheus"""
+    writer = MetricsWriter()
+    request_metrics.write(writer)
+    write_db_query_metrics(writer)
+
+    pools = [("sync", engine.pool)]
+    if async_engine is not None:
+        pools.append(("async", async_engine.pool))
+    write_pool_metrics(writer, pools)
+
+    try:
+        _write_business_metrics(writer, db)
+        db_up = 1
+    except Exception:
+        db.rollback()
+        db_up = 0
+    writer.family("restaurant_db_up", "gauge", "Доступность БД при последнем сборе метрик")
+    writer.sample("restaurant_db_up", db_up)
+
+    return PlainTextResponse(writer.render(), media_type=PROMETHEUS_CONTENT_TYPE)
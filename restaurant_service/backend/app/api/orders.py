@@ -1,91 +1,346 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+from decimal import Decimal
+from typing import Annotated, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, case, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.database import get_db
-from app.db_models import Order, User, Table, Menu, PlateForOrder, TableForOrder, CookingStatusHistory, CookingStatus
+from app.core.events import kitchen_events
+from app.core.hall_state import hall_state
+from app.core.history_buffer import record_history
+from app.core.responses import FastJSONResponse
+from app.core.sales_rollups import apply_order_to_rollups
+from app.database import DbSession, get_db, get_session, run_db
+from app.db_models import Order, User, Table, Menu, PlateForOrder, TableForOrder, CookingStatus
 from app.schemas.orders_schemas import *
 
 router = APIRouter(prefix="/orders", tags=["Заказы"])
 
-@router.get("/", response_model=List[OrderResponse])
-def get_all_orders(status: Optional[str] = None, waiter_id: Optional[int] = None, db: Session = Depends(get_db)):
-    """Получить все заказы"""
-    query = db.query(Order)
+MAX_ORDERS_PAGE_SIZE = 500
+
+# Допустимые статусы блюда при смене с кухни
+PLATE_STATUSES = ["ordered", "preparing", "ready", "served"]
+# Сколько блюд можно перевести одним запросом
+MAX_BULK_PLATES = 500
+
+def _order_records(db: Session, orders_query, include_plates: bool = True) -> List[OrderSummaryRecord]:
+    """
+    Заказы прямо из строк SQL в записи со __slots__, без объектов ORM:
+    заказы с именем официанта, номера столов и блюда с названиями из меню.
+    Количество запросов к БД фиксировано (не больше 3) и не зависит от числа
+    заказов. Порядок заказов - как в orders_query.
+    """
+    rows = db.execute(orders_query).all()
+    if not rows:
+        return []
+    order_ids = [row[0] for row in rows]
+
+    table_numbers: Dict[int, List[int]] = {order_id: [] for order_id in order_ids}
+    for order_id, number in db.execute(
+        select(TableForOrder.order, Table.number)
+            .join(Table, Table.id == TableForOrder.table)
+            .where(TableForOrder.order.in_(order_ids))
+            .order_by(TableForOrder.id)
+    ):
+        table_numbers[order_id].append(number)
+
+    if not include_plates:
+        return [
+            OrderSummaryRecord(
+                order_id, waiter, status, timestart, endtime, waiter_name,
+                table_numbers[order_id], float(total), plate_count, pending_plate_count
+            )
+            for order_id, waiter, status, timestart, endtime, waiter_name, total, plate_count, pending_plate_count
+            in rows
+        ]
+
+    plates: Dict[int, List[PlateInOrderRecord]] = {order_id: [] for order_id in order_ids}
+    for plate_row in db.execute(
+        select(
+            PlateForOrder.order_id, PlateForOrder.id, PlateForOrder.plate_id, PlateForOrder.count,
+            PlateForOrder.comment, PlateForOrder.cooking_status, PlateForOrder.price, Menu.name
+        )
+            .outerjoin(Menu, Menu.id == PlateForOrder.plate_id)
+            .where(PlateForOrder.order_id.in_(order_ids))
+            .order_by(PlateForOrder.id)
+    ):
+        order_id, plate_id, dish_id, count, comment, cooking_status, price, plate_name = plate_row
+        plates[order_id].append(PlateInOrderRecord(
+            plate_id, dish_id, count, comment, cooking_status, float(price), plate_name
+        ))
+
+    return [
+        OrderRecord(
+            order_id, waiter, status, timestart, endtime, waiter_name,
+            table_numbers[order_id], float(total), plate_count, pending_plate_count,
+            plates[order_id]
+        )
+        for order_id, waiter, status, timestart, endtime, waiter_name, total, plate_count, pending_plate_count
+        in rows
+    ]
+
+def _orders_select():
+    """Колонки заказа в порядке полей OrderSummaryRecord (имя официанта - через JOIN)"""
+    return select(
+        Order.id, Order.waiter, Order.status, Order.timestart, Order.endtime, User.name,
+        Order.total, Order.plate_count, Order.pending_plate_count
+    ).outerjoin(User, User.id == Order.waiter)
+
+def _publish_plate_event(event_type: str, order_id: int, plate: PlateInOrderResponse):
+    """Отправка события по блюду подписчикам потока кухни (после коммита)"""
+    kitchen_events.publish(event_type, {
+        "order_id": order_id,
+        "plate": plate.model_dump(mode="json")
+    })
+
+def _line_total(price, count: int) -> Decimal:
+    """Сумма позиции заказа (Decimal, чтобы не смешивать float и NUMERIC)"""
+    return Decimal(str(price)) * count
+
+def _is_pending(cooking_status: str) -> bool:
+    return cooking_status != CookingStatus.SERVED.value
+
+def _adjust_order_counters(db: Session, order_id: int, total_delta=0, plate_delta: int = 0, pending_delta: int = 0):
+    """
+    Инкрементальное изменение счетчиков заказа (total, plate_count,
+    pending_plate_count). Арифметика выполняется в UPDATE на стороне БД,
+    поэтому параллельные изменения блюд одного заказа не теряются.
+    """
+    if not (total_delta or plate_delta or pending_delta):
+        return
+    db.execute(
+        update(Order)
+        .where(Order.id == order_id)
+        .values(
+            total=Order.total + total_delta,
+            plate_count=Order.plate_count + plate_delta,
+            pending_plate_count=Order.pending_plate_count + pending_delta
+        )
+        .execution_options(synchronize_session=False)
+    )
 
-    if status:
-        query = query.filter(Order.status == status)
-    if waiter_id:
-        query = query.filter(Order.waiter == waiter_id)
-
-    orders = query.order_by(Order.timestart.desc()).all()
-
-    result = []
-    for order in orders:
-        order_data = OrderResponse(
-            id=order.id,
-            waiter=order.waiter,
-            status=order.status,
-            timestart=order.timestart,
-            endtime=order.endtime,
-            waiter_name=order.waiter_user.name if order.waiter_user else None,
-            table_numbers=[table.table_for_order.number for table in order.tables if table.table_for_order],
-            plates=[]
+def _adjust_pending_counters(db: Session, pending_deltas: Dict[int, int]):
+    """Изменение pending_plate_count сразу у нескольких заказов одним UPDATE с CASE по id"""
+    pending_deltas = {order_id: delta for order_id, delta in pending_deltas.items() if delta}
+    if not pending_deltas:
+        return
+    db.execute(
+        update(Order)
+        .where(Order.id.in_(pending_deltas))
+        .values(pending_plate_count=Order.pending_plate_count + case(pending_deltas, value=Order.id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+def _plate_aggregates():
+    """Фактические значения счетчиков по строкам plates_for_order"""
+    return select(
+        PlateForOrder.order_id.label("order_id"),
+        func.sum(PlateForOrder.price * PlateForOrder.count).label("total"),
+        func.count(PlateForOrder.id).label("plate_count"),
+        func.sum(case((PlateForOrder.cooking_status != CookingStatus.SERVED.value, 1), else_=0)).label("pending_plate_count")
+    ).group_by(PlateForOrder.order_id).subquery()
+
+def check_order_counters(db: Session) -> List[OrderCountersMismatch]:
+    """Заказы, у которых денормализованные счетчики расходятся с блюдами"""
+    plates = _plate_aggregates()
+    expected_total = func.coalesce(plates.c.total, 0)
+    expected_plate_count = func.coalesce(plates.c.plate_count, 0)
+    expected_pending = func.coalesce(plates.c.pending_plate_count, 0)
+
+    rows = db.query(
+        Order.id, Order.total, Order.plate_count, Order.pending_plate_count,
+        expected_total, expected_plate_count, expected_pending
+    ).outerjoin(plates, plates.c.order_id == Order.id)\
+        .filter(or_(
+            Order.total != expected_total,
+            Order.plate_count != expected_plate_count,
+            Order.pending_plate_count != expected_pending
+        ))\
+        .order_by(Order.id)\
+        .all()
+
+    return [
+        OrderCountersMismatch(
+            order_id=row[0],
+            total=row[1],
+            plate_count=row[2],
+            pending_plate_count=row[3],
+            expected_total=row[4],
+            expected_plate_count=row[5],
+            expected_pending_plate_count=row[6]
         )
+        for row in rows
+    ]
+
+def rebuild_order_counters(db: Session, order_ids: Optional[List[int]] = None) -> int:
+    """
+    Пересчитать счетчики заказов по блюдам одним UPDATE с коррелированными
+    подзапросами. Без order_ids пересчитываются все заказы.
+    """
+    by_order = PlateForOrder.order_id == Order.id
+    statement = update(Order).values(
+        total=select(func.coalesce(func.sum(PlateForOrder.price * PlateForOrder.count), 0))
+            .where(by_order).scalar_subquery(),
+        plate_count=select(func.count(PlateForOrder.id))
+            .where(by_order).scalar_subquery(),
+        pending_plate_count=select(func.count(PlateForOrder.id))
+            .where(by_order, PlateForOrder.cooking_status != CookingStatus.SERVED.value).scalar_subquery()
+    )
+    if order_ids is not None:
+        statement = statement.where(Order.id.in_(order_ids))
 
-        # Добавляем блюда
-        for plate in order.plates:
-            plate_data = PlateInOrderResponse(
-                id=plate.id,
-                plate_id=plate.plate_id,
-                count=plate.count,
-                comment=plate.comment,
-                cooking_status=plate.cooking_status,
-                price=plate.price,
-                plate_name=plate.menu_item.name if plate.menu_item else None
-            )
-            order_data.plates.append(plate_data)
+    result = db.execute(statement.execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+def _encode_cursor(order) -> str:
+    """Курсор на позицию заказа в выдаче, отсортированной по (timestart, id)"""
+    raw = f"{order.timestart.isoformat()}|{order.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestart, order_id = raw.split("|")
+        return datetime.fromisoformat(timestart), int(order_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Неверный курсор")
+
+def _list_orders(
+    db: Session,
+    status: Optional[str] = None,
+    waiter_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[tuple] = None,
+    include_plates: bool = True
+):
+    """
+    Выборка страницы заказов, отсортированной по (timestart, id) по убыванию.
+    Возвращает (список OrderRecord/OrderSummaryRecord, курсор следующей
+    страницы или None).
+    """
+    query = _orders_select()
 
-        result.append(order_data)
+    if status:
+        query = query.where(Order.status == status)
+    if waiter_id:
+        query = query.where(Order.waiter == waiter_id)
+    if cursor:
+        cursor_time, cursor_id = cursor
+        query = query.where(or_(
+            Order.timestart < cursor_time,
+            and_(Order.timestart == cursor_time, Order.id < cursor_id)
+        ))
+
+    query = query.order_by(Order.timestart.desc(), Order.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    orders = _order_records(db, query, include_plates=include_plates)
+    has_more = limit is not None and len(orders) > limit
+    if has_more:
+        orders = orders[:limit]
+
+    next_cursor = _encode_cursor(orders[-1]) if has_more else None
+    return orders, next_cursor
+
+def _load_order(db: Session, order_id: int) -> Optional[OrderRecord]:
+    """Заказ по ID со всем графом или None"""
+    orders = _order_records(db, _orders_select().where(Order.id == order_id))
+    return orders[0] if orders else None
+
+@router.get("/", response_model=List[OrderResponse])
+async def get_all_orders(
+    status: Optional[str] = None,
+    waiter_id: Optional[int] = None,
+    limit: Annotated[Optional[int], Query(ge=1, le=MAX_ORDERS_PAGE_SIZE)] = None,
+    cursor: Optional[str] = None,
+    include_plates: bool = True,
+    db: DbSession = Depends(get_session)
+):
+    """
+    Получить все заказы.
+
+    Поддерживает keyset-пагинацию по (timestart, id): если указан limit и есть
+    следующая страница, ее курсор возвращается в заголовке X-Next-Cursor.
+    При include_plates=false возвращаются только заголовки заказов без plates.
+    """
+    orders, next_cursor = await run_db(
+        db, _list_orders,
+        status=status,
+        waiter_id=waiter_id,
+        limit=limit,
+        cursor=_decode_cursor(cursor) if cursor else None,
+        include_plates=include_plates
+    )
 
-    return result
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return FastJSONResponse(content=orders, headers=headers)
 
 @router.get("/active", response_model=List[OrderResponse])
-def get_active_orders(db: Session = Depends(get_db)):
+async def get_active_orders(
+    limit: Annotated[Optional[int], Query(ge=1, le=MAX_ORDERS_PAGE_SIZE)] = None,
+    cursor: Optional[str] = None,
+    include_plates: bool = True,
+    db: DbSession = Depends(get_session)
+):
     """Получить активные заказы"""
-    return get_all_orders(status="active", db=db)
+    return await get_all_orders(
+        status="active",
+        waiter_id=None,
+        limit=limit,
+        cursor=cursor,
+        include_plates=include_plates,
+        db=db
+    )
 
 @router.get("/{order_id}", response_model=OrderResponse)
-def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(order_id: int, db: DbSession = Depends(get_session)):
     """Получить заказ по ID"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = await run_db(db, _load_order, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
-    order_data = OrderResponse(
-        id=order.id,
-        waiter=order.waiter,
-        status=order.status,
-        timestart=order.timestart,
-        endtime=order.endtime,
-        waiter_name=order.waiter_user.name if order.waiter_user else None,
-        table_numbers=[table.table_for_order.number for table in order.tables if table.table_for_order],
-        plates=[]
-    )
-
-    # Добавление блюд
-    for plate in order.plates:
-        plate_data = PlateInOrderResponse(
-            id=plate.id,
-            plate_id=plate.plate_id,
-            count=plate.count,
-            comment=plate.comment,
-            cooking_status=plate.cooking_status,
-            price=plate.price,
-            plate_name=plate.menu_item.name if plate.menu_item else None
+    return FastJSONResponse(content=order)
+
+@router.get("/counters/check", response_model=List[OrderCountersMismatch])
+def check_counters(db: Session = Depends(get_db)):
+    """Проверить согласованность сумм и счетчиков блюд в заказах"""
+    return check_order_counters(db)
+
+@router.post("/counters/rebuild", response_model=OrderCountersRebuildResult)
+def rebuild_counters(db: Session = Depends(get_db)):
+    """Пересчитать суммы и счетчики блюд во всех заказах"""
+    updated = rebuild_order_counters(db)
+    hall_state.invalidate()
+    return OrderCountersRebuildResult(updated=updated)
+
+def _claim_tables(db: Session, tables: List[Table]):
+    """
+    Атомарно занять столы: UPDATE ... WHERE status = 'free' RETURNING id.
+    Параллельный заказ на тот же стол ждет блокировку строки и после коммита
+    первого уже не проходит условие, поэтому стол достается ровно одному
+    заказу. Если занять удалось не все столы, транзакция откатывается.
+    """
+    if not tables:
+        return
+
+    table_ids = [table.id for table in tables]
+    claimed = set(db.scalars(
+        update(Table)
+        .where(Table.id.in_(table_ids), Table.status == "free")
+        .values(status="occupied")
+        .returning(Table.id)
+        .execution_options(synchronize_session=False)
+    ).all())
+
+    if len(claimed) != len(table_ids):
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Столы {[t.number for t in tables if t.id not in claimed]} заняты"
         )
-        order_data.plates.append(plate_data)
-
-    return order_data
 
 @router.post("/", response_model=OrderResponse)
 def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
@@ -100,7 +355,7 @@ def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
     if len(tables) != len(order_data.tables):
         raise HTTPException(status_code=404, detail="Один или несколько столов не найдены")
 
-    # Проверка что столы свободны
+    # Быстрая проверка что столы свободны (окончательно решает _claim_tables)
     occupied_tables = [t for t in tables if t.status != "free"]
     if occupied_tables:
         raise HTTPException(
@@ -108,45 +363,94 @@ def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
             detail=f"Столы {[t.number for t in occupied_tables]} заняты"
         )
 
-    # Проверка существования позиций меню
-    plate_ids = [plate.plate_id for plate in order_data.plates]
-    dishes = db.query(Menu).filter(Menu.id.in_(plate_ids)).all()
+    # Проверка существования позиций меню (одно блюдо может встречаться несколько раз)
+    plate_ids = {plate.plate_id for plate in order_data.plates}
+    dishes = {dish.id: dish for dish in db.query(Menu).filter(Menu.id.in_(plate_ids)).all()}
 
     if len(dishes) != len(plate_ids):
         raise HTTPException(status_code=404, detail="Одно или несколько блюд не найдены")
 
-    # Создание заказа
-    order = Order(
+    _claim_tables(db, tables)
+
+    total = sum((_line_total(p.price, p.count) for p in order_data.plates), Decimal(0))
+    pending_plate_count = sum(1 for p in order_data.plates if _is_pending(p.cooking_status))
+
+    # Заказ, связи со столами и блюда создаются в одной транзакции
+    # многострочными INSERT ... RETURNING
+    order_id = db.execute(
+        insert(Order).returning(Order.id),
+        {
+            "waiter": order_data.waiter,
+            "status": order_data.status,
+            "timestart": order_data.timestart,
+            "endtime": None,
+            "total": total,
+            "plate_count": len(order_data.plates),
+            "pending_plate_count": pending_plate_count
+        }
+    ).scalar_one()
+
+    if tables:
+        db.execute(insert(TableForOrder), [{"order": order_id, "table": table.id} for table in tables])
+
+    plate_rows = [
+        {
+            "order_id": order_id,
+            "plate_id": plate_data.plate_id,
+            "count": plate_data.count,
+            "comment": plate_data.comment,
+            "cooking_status": plate_data.cooking_status,
+            "price": plate_data.price,
+            "category": dishes[plate_data.plate_id].category
+        }
+        for plate_data in order_data.plates
+    ]
+    plate_row_ids = db.scalars(
+        insert(PlateForOrder).returning(PlateForOrder.id, sort_by_parameter_order=True),
+        plate_rows
+    ).all() if plate_rows else []
+
+    # Начальный статус блюд - отсчет первого этапа в статистике кухни
+    created_at = datetime.utcnow()
+    record_history(db, [
+        {
+            "order_id": order_id,
+            "plate_id": row["plate_id"],
+            "new_status": row["cooking_status"],
+            "change_by": order_data.waiter,
+            "change_time": created_at
+        }
+        for row in plate_rows
+    ])
+
+    db.commit()
+    hall_state.invalidate()
+
+    # Ответ собирается из уже имеющихся данных, без повторного чтения заказа
+    order_response = OrderResponse(
+        id=order_id,
         waiter=order_data.waiter,
         status=order_data.status,
         timestart=order_data.timestart,
-        endtime=None
+        endtime=None,
+        waiter_name=waiter.name,
+        table_numbers=[table.number for table in tables],
+        total=total,
+        plate_count=len(order_data.plates),
+        pending_plate_count=pending_plate_count,
+        plates=[
+            PlateInOrderResponse(
+                id=row_id,
+                plate_name=dishes[row["plate_id"]].name,
+                **{key: value for key, value in row.items() if key not in ("order_id", "category")}
+            )
+            for row_id, row in zip(plate_row_ids, plate_rows)
+        ]
     )
+    for plate in order_response.plates:
+        _publish_plate_event("plate_added", order_response.id, plate)
 
-    db.add(order)
-    db.commit()
-    db.refresh(order)
-
-    for table in tables:
-        table_link = TableForOrder(order=order.id, table=table.id)
-        db.add(table_link)
-        table.status = "occupied"
-
-    # Добавление блюд в заказ
-    for plate_data in order_data.plates:
-        plate = PlateForOrder(
-            order_id=order.id,
-            plate_id=plate_data.plate_id,
-            count=plate_data.count,
-            comment=plate_data.comment,
-            cooking_status=plate_data.cooking_status,
-            price=plate_data.price
-        )
-        db.add(plate)
-
-    db.commit()
-
-    return get_order(order.id, db)
+    return order_response
 
 @router.put("/{order_id}", response_model=OrderResponse)
 def update_order(order_id: int, order_data: OrderUpdate, db: Session = Depends(get_db)):
@@ -155,15 +459,24 @@ def update_order(order_id: int, order_data: OrderUpdate, db: Session = Depends(g
     if not order:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
+    # Закрытый заказ учтен в агрегатах продаж: убираем старый вклад
+    # и добавляем новый, если заказ остается закрытым
+    if order.status == "completed":
+        apply_order_to_rollups(db, order, sign=-1)
+
     if order_data.status is not None:
         order.status = order_data.status
     if order_data.endtime is not None:
         order.endtime = order_data.endtime
 
+    if order.status == "completed":
+        apply_order_to_rollups(db, order)
+
     db.commit()
+    hall_state.invalidate()
     db.refresh(order)
 
-    return get_order(order.id, db)
+    return _load_order(db, order.id)
 
 @router.put("/{order_id}/complete")
 def complete_order(order_id: int, db: Session = Depends(get_db)):
@@ -172,8 +485,12 @@ def complete_order(order_id: int, db: Session = Depends(get_db)):
     if not order:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
+    if order.status == "completed":
+        apply_order_to_rollups(db, order, sign=-1)
+
     order.status = "completed"
     order.endtime = datetime.utcnow()
+    apply_order_to_rollups(db, order)
 
     for table_link in order.tables:
         table = table_link.table_for_order
@@ -181,6 +498,7 @@ def complete_order(order_id: int, db: Session = Depends(get_db)):
             table.status = "free"
 
     db.commit()
+    hall_state.invalidate()
 
     return {"message": "Заказ завершен"}
 
@@ -188,11 +506,10 @@ def complete_order(order_id: int, db: Session = Depends(get_db)):
 def update_plate_status(plate_id: int, status: str, db: Session = Depends(get_db)):
     """Изменить статус блюда"""
     # Проверка допустимости статуса
-    allowed_statuses = ["ordered", "preparing", "ready", "served"]
-    if status not in allowed_statuses:
+    if status not in PLATE_STATUSES:
         raise HTTPException(
             status_code=400,
-            detail=f"Неверный статус. Допустимые: {', '.join(allowed_statuses)}"
+            detail=f"Неверный статус. Допустимые: {', '.join(PLATE_STATUSES)}"
         )
 
     plate = db.query(PlateForOrder).filter(PlateForOrder.id == plate_id).first()
@@ -200,20 +517,123 @@ def update_plate_status(plate_id: int, status: str, db: Session = Depends(get_db
         raise HTTPException(status_code=404, detail="Блюдо не найдено")
 
     # Запись в истории
-    status_history = CookingStatusHistory(
-        order_id=plate.order_id,
-        plate_id=plate.plate_id,
-        new_status=status,
-        change_time=datetime.utcnow(),
-        change_by=25
-    )
-
-    db.add(status_history)
+    record_history(db, [{
+        "order_id": plate.order_id,
+        "plate_id": plate.plate_id,
+        "new_status": status,
+        "change_time": datetime.utcnow(),
+        "change_by": 25
+    }])
+    pending_delta = int(_is_pending(status)) - int(_is_pending(plate.cooking_status))
+    _adjust_order_counters(db, plate.order_id, pending_delta=pending_delta)
     plate.cooking_status = status
     db.commit()
+    if pending_delta:
+        # В снимке зала показывается число неподанных блюд заказа
+        hall_state.invalidate()
+
+    _publish_plate_event("plate_status_changed", plate.order_id, PlateInOrderResponse(
+        id=plate.id,
+        plate_id=plate.plate_id,
+        count=plate.count,
+        comment=plate.comment,
+        cooking_status=plate.cooking_status,
+        price=plate.price,
+        plate_name=plate.menu_item.name if plate.menu_item else None
+    ))
 
     return {"message": f"Статус блюда изменен на {status}"}
 
+@router.post("/plates/status", response_model=PlateStatusBulkResult)
+def update_plates_status(bulk_data: PlateStatusBulkUpdate, db: Session = Depends(get_db)):
+    """
+    Изменить статус сразу нескольких блюд (например, всего подноса).
+    Одна транзакция: блокирующее чтение текущих статусов, один UPDATE ... RETURNING,
+    одна многострочная вставка в историю и один UPDATE счетчиков заказов.
+    """
+    status = bulk_data.status
+    if status not in PLATE_STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неверный статус. Допустимые: {', '.join(PLATE_STATUSES)}"
+        )
+
+    plate_ids = list(dict.fromkeys(bulk_data.plate_ids))
+    if len(plate_ids) > MAX_BULK_PLATES:
+        raise HTTPException(status_code=400, detail=f"Не больше {MAX_BULK_PLATES} блюд за один запрос")
+
+    # Текущие статусы нужны для счетчиков и ответа; строки блокируются до коммита
+    current = {
+        row.id: row for row in db.execute(
+            select(PlateForOrder.id, PlateForOrder.order_id, PlateForOrder.cooking_status)
+            .where(PlateForOrder.id.in_(plate_ids))
+            .with_for_update()
+        )
+    }
+
+    updated = db.execute(
+        update(PlateForOrder)
+        .where(PlateForOrder.id.in_(list(current)), PlateForOrder.cooking_status != status)
+        .values(cooking_status=status)
+        .returning(
+            PlateForOrder.id, PlateForOrder.order_id, PlateForOrder.plate_id,
+            PlateForOrder.count, PlateForOrder.comment, PlateForOrder.price
+        )
+        .execution_options(synchronize_session=False)
+    ).all() if current else []
+
+    change_time = datetime.utcnow()
+    pending_deltas: Dict[int, int] = {}
+    for plate in updated:
+        delta = int(_is_pending(status)) - int(_is_pending(current[plate.id].cooking_status))
+        pending_deltas[plate.order_id] = pending_deltas.get(plate.order_id, 0) + delta
+
+    if updated:
+        record_history(db, [
+            {
+                "order_id": plate.order_id,
+                "plate_id": plate.plate_id,
+                "new_status": status,
+                "change_time": change_time,
+                "change_by": 25  # Временно, до реализации авторизации
+            }
+            for plate in updated
+        ])
+        _adjust_pending_counters(db, pending_deltas)
+    db.commit()
+
+    if any(pending_deltas.values()):
+        hall_state.invalidate()
+
+    if updated:
+        names = dict(db.query(Menu.id, Menu.name).filter(Menu.id.in_({plate.plate_id for plate in updated})).all())
+        for plate in updated:
+            _publish_plate_event("plate_status_changed", plate.order_id, PlateInOrderResponse(
+                id=plate.id,
+                plate_id=plate.plate_id,
+                count=plate.count,
+                comment=plate.comment,
+                cooking_status=status,
+                price=plate.price,
+                plate_name=names.get(plate.plate_id)
+            ))
+
+    updated_ids = {plate.id for plate in updated}
+    results = []
+    for plate_id in plate_ids:
+        row = current.get(plate_id)
+        if row is None:
+            results.append(PlateStatusResult(id=plate_id, result="not_found"))
+            continue
+        results.append(PlateStatusResult(
+            id=plate_id,
+            order_id=row.order_id,
+            previous_status=row.cooking_status,
+            result="updated" if plate_id in updated_ids else "unchanged"
+        ))
+
+    return PlateStatusBulkResult(status=status, updated=len(updated), results=results)
+
 @router.delete("/{order_id}")
 def delete_order(order_id: int, db: Session = Depends(get_db)):
     """Удалить заказ"""
@@ -227,8 +647,12 @@ def delete_order(order_id: int, db: Session = Depends(get_db)):
         if table:
             table.status = "free"
 
+    if order.status == "completed":
+        apply_order_to_rollups(db, order, sign=-1)
+
     db.delete(order)
     db.commit()
+    hall_state.invalidate()
 
     return {"message": "Заказ удален"}
 
@@ -264,22 +688,27 @@ def add_plate_to_order(order_id: int, plate_data: PlateInOrderCreate, db: Sessio
         count=plate_data.count,
         comment=plate_data.comment,
         cooking_status=plate_data.cooking_status,
-        price=plate_data.price
+        price=plate_data.price,
+        category=menu_item.category
     )
 
     db.add(plate)
-    db.commit()
-    db.refresh(plate)
-
-    status_history = CookingStatusHistory(
-        order_id=order.id,
-        plate_id=plate.plate_id,
-        new_status=plate_data.cooking_status,
-        change_by=25,  # Временно, до реализации авторизации
-        change_time=datetime.utcnow()
+    _adjust_order_counters(
+        db, order_id,
+        total_delta=_line_total(plate_data.price, plate_data.count),
+        plate_delta=1,
+        pending_delta=int(_is_pending(plate_data.cooking_status))
     )
-    db.add(status_history)
+    record_history(db, [{
+        "order_id": order.id,
+        "plate_id": plate_data.plate_id,
+        "new_status": plate_data.cooking_status,
+        "change_by": 25,  # Временно, до реализации авторизации
+        "change_time": datetime.utcnow()
+    }])
     db.commit()
+    db.refresh(plate)
+    hall_state.invalidate()
 
     plate_response = PlateInOrderResponse(
         id=plate.id,
@@ -291,6 +720,8 @@ def add_plate_to_order(order_id: int, plate_data: PlateInOrderCreate, db: Sessio
         plate_name=menu_item.name if menu_item else None
     )
 
+    _publish_plate_event("plate_added", order_id, plate_response)
+
     return plate_response
 
 @router.put("/plates/{plate_id}", response_model=PlateInOrderResponse)
@@ -310,7 +741,8 @@ def update_plate_in_order(plate_id: int, plate_data: PlateInOrderUpdate, db: Ses
     if order.status not in ["active", "waiting"]:
         raise HTTPException(status_code=400, detail="Нельзя изменять блюда в завершенном или отмененном заказе")
 
-    old_total = plate.price * plate.count
+    old_total = _line_total(plate.price, plate.count)
+    was_pending = _is_pending(plate.cooking_status)
 
     # Обновление полей
     if plate_data.count is not None:
@@ -331,19 +763,24 @@ def update_plate_in_order(plate_id: int, plate_data: PlateInOrderUpdate, db: Ses
                 detail=f"Неверный статус. Допустимые: {', '.join(allowed_statuses)}"
             )
 
-        status_history = CookingStatusHistory(
-            order_id=order.id,
-            plate_id=plate.plate_id,
-            new_status=plate_data.cooking_status,
-            change_by=25,  # Временно, до реализации авторизации
-            change_time=datetime.utcnow()
-        )
+        record_history(db, [{
+            "order_id": order.id,
+            "plate_id": plate.plate_id,
+            "new_status": plate_data.cooking_status,
+            "change_by": 25,  # Временно, до реализации авторизации
+            "change_time": datetime.utcnow()
+        }])
         plate.cooking_status = plate_data.cooking_status
-        db.add(status_history)
 
-    new_total = plate.price * plate.count
+    new_total = _line_total(plate.price, plate.count)
 
+    _adjust_order_counters(
+        db, order.id,
+        total_delta=new_total - old_total,
+        pending_delta=int(_is_pending(plate.cooking_status)) - int(was_pending)
+    )
     db.commit()
+    hall_state.invalidate()
     db.refresh(plate)
 
     menu_item = db.query(Menu).filter(Menu.id == plate.plate_id).first()
@@ -358,6 +795,8 @@ def update_plate_in_order(plate_id: int, plate_data: PlateInOrderUpdate, db: Ses
         plate_name=menu_item.name if menu_item else None
     )
 
+    _publish_plate_event("plate_updated", plate.order_id, plate_response)
+
     return plate_response
 
 @router.delete("/plates/{plate_id}")
@@ -377,7 +816,25 @@ def delete_plate_from_order(plate_id: int,db: Session = Depends(get_db)):
     if order.status not in ["active", "waiting"]:
         raise HTTPException(status_code=400, detail="Нельзя удалять блюда из завершенного или отмененного заказа")
 
+    removed = PlateInOrderResponse(
+        id=plate.id,
+        plate_id=plate.plate_id,
+        count=plate.count,
+        comment=plate.comment,
+        cooking_status=plate.cooking_status,
+        price=plate.price
+    )
+
+    _adjust_order_counters(
+        db, order.id,
+        total_delta=-_line_total(plate.price, plate.count),
+        plate_delta=-1,
+        pending_delta=-int(_is_pending(plate.cooking_status))
+    )
     db.delete(plate)
     db.commit()
+    hall_state.invalidate()
+
+    _publish_plate_event("plate_removed", order.id, removed)
 
     return {"message": "Блюдо удалено из заказа"}
\ No newline at end of file
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+from app.core.sales_rollups import rebuild_rollups
+from app.database import get_db
+from app.db_models import OrderHourlyRollup, DishHourlyRollup, User, Menu, Category
+from app.schemas.reports_schemas import *
+
+router = APIRouter(prefix="/reports", tags=["Отчеты"])
+
+# Все отчеты читают почасовые агрегаты (order_hourly_rollup, dish_hourly_rollup),
+# которые обновляются при закрытии заказа.
+
+def _in_period(query, hour_column, start: Optional[datetime], end: Optional[datetime]):
+    if start:
+        query = query.filter(hour_column >= start)
+    if end:
+        query = query.filter(hour_column < end)
+    return query
+
+@router.get("/revenue", response_model=List[RevenuePoint])
+def get_revenue(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = "day",
+    waiter_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Выручка и число закрытых заказов по часам или по дням"""
+    if granularity not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="Неверная детализация. Допустимые: hour, day")
+
+    query = db.query(
+        OrderHourlyRollup.hour,
+        func.sum(OrderHourlyRollup.orders),
+        func.sum(OrderHourlyRollup.revenue)
+    )
+    query = _in_period(query, OrderHourlyRollup.hour, start, end)
+    if waiter_id:
+        query = query.filter(OrderHourlyRollup.waiter == waiter_id)
+    rows = query.group_by(OrderHourlyRollup.hour).order_by(OrderHourlyRollup.hour).all()
+
+    points = OrderedDict()
+    for hour, orders, revenue in rows:
+        period = hour if granularity == "hour" else hour.replace(hour=0)
+        point = points.setdefault(period, [0, 0.0])
+        point[0] += orders
+        point[1] += float(revenue)
+
+    return [
+        RevenuePoint(period=period, orders=orders, revenue=revenue)
+        for period, (orders, revenue) in points.items()
+    ]
+
+@router.get("/waiters", response_model=List[WaiterRevenue])
+def get_revenue_by_waiter(start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Выручка по официантам"""
+    query = db.query(
+        OrderHourlyRollup.waiter,
+        User.name,
+        func.sum(OrderHourlyRollup.orders),
+        func.sum(OrderHourlyRollup.revenue).label("revenue")
+    ).outerjoin(User, User.id == OrderHourlyRollup.waiter)
+    query = _in_period(query, OrderHourlyRollup.hour, start, end)
+    rows = query.group_by(OrderHourlyRollup.waiter, User.name).order_by(func.sum(OrderHourlyRollup.revenue).desc()).all()
+
+    return [
+        WaiterRevenue(waiter=waiter, waiter_name=name, orders=orders, revenue=revenue)
+        for waiter, name, orders, revenue in rows
+    ]
+
+@router.get("/categories", response_model=List[CategoryRevenue])
+def get_revenue_by_category(start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """Выручка по категориям меню"""
+    query = db.query(
+        DishHourlyRollup.category,
+        Category.name,
+        func.sum(DishHourlyRollup.quantity),
+        func.sum(DishHourlyRollup.revenue)
+    ).outerjoin(Category, Category.id == DishHourlyRollup.category)
+    query = _in_period(query, DishHourlyRollup.hour, start, end)
+    rows = query.group_by(DishHourlyRollup.category, Category.name).order_by(func.sum(DishHourlyRollup.revenue).desc()).all()
+
+    return [
+        CategoryRevenue(category=category, category_name=name, quantity=quantity, revenue=revenue)
+        for category, name, quantity, revenue in rows
+    ]
+
+@router.get("/dishes", response_model=List[DishRevenue])
+def get_revenue_by_dish(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Выручка и количество проданных порций по блюдам"""
+    query = db.query(
+        DishHourlyRollup.plate_id,
+        Menu.name,
+        func.sum(DishHourlyRollup.quantity),
+        func.sum(DishHourlyRollup.revenue)
+    ).outerjoin(Menu, Menu.id == DishHourlyRollup.plate_id)
+    query = _in_period(query, DishHourlyRollup.hour, start, end)
+    query = query.group_by(DishHourlyRollup.plate_id, Menu.name).order_by(func.sum(DishHourlyRollup.revenue).desc())
+    if limit:
+        query = query.limit(limit)
+
+    return [
+        DishRevenue(plate_id=plate_id, plate_name=name, quantity=quantity, revenue=revenue)
+        for plate_id, name, quantity, revenue in query.all()
+    ]
+
+@router.post("/rollups/rebuild", response_model=RollupRebuildResult)
+def rebuild_report_rollups(db: Session = Depends(get_db)):
+    """Пересчитать агрегаты продаж по всем закрытым заказам"""
+    return RollupRebuildResult(orders=rebuild_rollups(db))
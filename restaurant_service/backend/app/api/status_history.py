@@ -1,13 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, literal, select
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from app.core.config import settings
+from app.core.kitchen_stats import kitchen_stats_cache
+from app.core.responses import FastJSONResponse
 from app.database import get_db
-from app.db_models import CookingStatusHistory, Menu, User, Order
+from app.db_models import CookingStatusHistory, CookingStatusHistoryArchive, Menu, User, Order
 from app.schemas.history_schemas import *
 
 router = APIRouter(prefix="/cooking-status-history", tags=["История статусов блюд"])
 
+def _history_records_select():
+    """
+    Колонки записи истории с названием блюда и именем пользователя для быстрого
+    пути чтения: строки идут прямо в CookingStatusHistoryRecord, без ORM.
+    """
+    return select(
+        CookingStatusHistory.id, CookingStatusHistory.change_time, CookingStatusHistory.new_status,
+        CookingStatusHistory.order_id, CookingStatusHistory.plate_id, CookingStatusHistory.change_by,
+        Menu.name, User.name
+    )\
+        .outerjoin(Menu, Menu.id == CookingStatusHistory.plate_id)\
+        .outerjoin(User, User.id == CookingStatusHistory.change_by)
+
+def _history_record(row) -> CookingStatusHistoryRecord:
+    """Строка _history_records_select() -> запись ответа"""
+    history_id, change_time, new_status, order_id, plate_id, change_by, plate_name, user_name = row
+    return CookingStatusHistoryRecord(
+        history_id, change_time, new_status, order_id, plate_id, change_by, plate_name,
+        user_name if change_by else None,
+        f"Заказ #{order_id}" if order_id else None
+    )
+
+def _build_history_response(item: CookingStatusHistory, plate_name: Optional[str], user_name: Optional[str]) -> CookingStatusHistoryResponse:
+    """Сборка ответа по записи истории и уже полученным названиям"""
+    return CookingStatusHistoryResponse(
+        id=item.id,
+        change_time=item.change_time,
+        new_status=item.new_status,
+        order_id=item.order_id,
+        plate_id=item.plate_id,
+        change_by=item.change_by,
+        plate_name=plate_name,
+        user_name=user_name if item.change_by else None,
+        order_number=f"Заказ #{item.order_id}" if item.order_id else None
+    )
+
 # ===== ЭНДПОИНТЫ =====
 @router.get("/", response_model=List[CookingStatusHistoryResponse])
 def get_all_cooking_status_history(
@@ -20,69 +60,38 @@ def get_all_cooking_status_history(
     new_status: Optional[str] = None
 ):
     """Получить всю историю изменения статусов с фильтрацией"""
-    query = db.query(CookingStatusHistory)
+    query = _history_records_select()
 
     if start_date:
-        query = query.filter(CookingStatusHistory.change_time >= start_date)
+        query = query.where(CookingStatusHistory.change_time >= start_date)
     if end_date:
-        query = query.filter(CookingStatusHistory.change_time <= end_date)
+        query = query.where(CookingStatusHistory.change_time <= end_date)
     if plate_id:
-        query = query.filter(CookingStatusHistory.plate_id == plate_id)
+        query = query.where(CookingStatusHistory.plate_id == plate_id)
     if order_id:
-        query = query.filter(CookingStatusHistory.order_id == order_id)
+        query = query.where(CookingStatusHistory.order_id == order_id)
     if change_by:
-        query = query.filter(CookingStatusHistory.change_by == change_by)
+        query = query.where(CookingStatusHistory.change_by == change_by)
     if new_status:
-        query = query.filter(CookingStatusHistory.new_status == new_status)
-
-    history_items = query.order_by(CookingStatusHistory.change_time.desc()).all()
+        query = query.where(CookingStatusHistory.new_status == new_status)
 
-    result = []
-    for item in history_items:
-        item_dict = item.__dict__.copy()
+    rows = db.execute(query.order_by(CookingStatusHistory.change_time.desc()))
 
-        # Добавление информации о блюде
-        plate = db.query(Menu).filter(Menu.id == item.plate_id).first()
-        item_dict['plate_name'] = plate.name if plate else None
+    return FastJSONResponse(content=[_history_record(row) for row in rows])
 
-        # Добавление информации о пользователе
-        if item.change_by:
-            user = db.query(User).filter(User.id == item.change_by).first()
-            item_dict['user_name'] = user.name if user else None
-
-        # Добавление информации о заказе
-        if item.order_id:
-            order = db.query(Order).filter(Order.id == item.order_id).first()
-            item_dict['order_number'] = f"Заказ #{item.order_id}"
-
-        result.append(CookingStatusHistoryResponse(**item_dict))
-
-    return result
+@router.get("/kitchen-stats", response_model=KitchenStats)
+def get_kitchen_stats(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """Время этапов приготовления (среднее, p50/p90/p99) по блюдам и поварам за день"""
+    return kitchen_stats_cache.get(db, day or datetime.utcnow().date())
 
 @router.get("/{history_id}", response_model=CookingStatusHistoryResponse)
 def get_cooking_status_history(history_id: int, db: Session = Depends(get_db)):
     """Получить запись истории статуса по ID"""
-    history_item = db.query(CookingStatusHistory).filter(CookingStatusHistory.id == history_id).first()
-    if not history_item:
+    row = db.execute(_history_records_select().where(CookingStatusHistory.id == history_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Запись истории не найдена")
 
-    item_dict = history_item.__dict__.copy()
-
-    # Добавление информации о блюде
-    plate = db.query(Menu).filter(Menu.id == history_item.plate_id).first()
-    item_dict['plate_name'] = plate.name if plate else None
-
-    # Добавление информации о пользователе
-    if history_item.change_by:
-        user = db.query(User).filter(User.id == history_item.change_by).first()
-        item_dict['user_name'] = user.name if user else None
-
-    # Добавление информации о заказе
-    if history_item.order_id:
-        order = db.query(Order).filter(Order.id == history_item.order_id).first()
-        item_dict['order_number'] = f"Заказ #{history_item.order_id}"
-
-    return CookingStatusHistoryResponse(**item_dict)
+    return FastJSONResponse(content=_history_record(row))
 
 @router.post("/", response_model=CookingStatusHistoryResponse)
 def create_cooking_status_history(history_data: CookingStatusHistoryCreate, db: Session = Depends(get_db)):
@@ -113,15 +122,7 @@ def create_cooking_status_history(history_data: CookingStatusHistoryCreate, db:
     db.commit()
     db.refresh(history_item)
 
-    item_dict = history_item.__dict__.copy()
-    item_dict['plate_name'] = plate.name
-    if history_data.change_by:
-        user = db.query(User).filter(User.id == history_data.change_by).first()
-        item_dict['user_name'] = user.name if user else None
-    if history_data.order_id:
-        item_dict['order_number'] = f"Заказ #{history_data.order_id}"
-
-    return CookingStatusHistoryResponse(**item_dict)
+    return _build_history_response(history_item, plate.name, user.name if history_data.change_by else None)
 
 @router.put("/{history_id}", response_model=CookingStatusHistoryResponse)
 def update_cooking_status_history(history_id: int, history_data: CookingStatusHistoryUpdate, db: Session = Depends(get_db)):
@@ -149,21 +150,8 @@ def update_cooking_status_history(history_id: int, history_data: CookingStatusHi
         history_item.change_by = history_data.change_by
 
     db.commit()
-    db.refresh(history_item)
-
-    item_dict = history_item.__dict__.copy()
 
-    plate = db.query(Menu).filter(Menu.id == history_item.plate_id).first()
-    item_dict['plate_name'] = plate.name if plate else None
-
-    if history_item.change_by:
-        user = db.query(User).filter(User.id == history_item.change_by).first()
-        item_dict['user_name'] = user.name if user else None
-
-    if history_item.order_id:
-        item_dict['order_number'] = f"Заказ #{history_item.order_id}"
-
-    return CookingStatusHistoryResponse(**item_dict)
+    return get_cooking_status_history(history_id, db)
 
 @router.delete("/{history_id}")
 def delete_cooking_status_history(history_id: int, db: Session = Depends(get_db)):
@@ -184,83 +172,37 @@ def get_history_by_plate(plate_id: int, db: Session = Depends(get_db)):
     if not plate:
         raise HTTPException(status_code=404, detail="Блюдо не найдено")
 
-    history_items = db.query(CookingStatusHistory)\
-        .filter(CookingStatusHistory.plate_id == plate_id)\
-        .order_by(CookingStatusHistory.change_time.desc())\
-        .all()
-
-    result = []
-    for item in history_items:
-        item_dict = item.__dict__.copy()
-        item_dict['plate_name'] = plate.name
-
-        if item.change_by:
-            user = db.query(User).filter(User.id == item.change_by).first()
-            item_dict['user_name'] = user.name if user else None
+    rows = db.execute(_history_records_select()
+        .where(CookingStatusHistory.plate_id == plate_id)
+        .order_by(CookingStatusHistory.change_time.desc()))
 
-        if item.order_id:
-            item_dict['order_number'] = f"Заказ #{item.order_id}"
-
-        result.append(CookingStatusHistoryResponse(**item_dict))
-
-    return result
+    return FastJSONResponse(content=[_history_record(row) for row in rows])
 
 @router.get("/order/{order_id}", response_model=List[CookingStatusHistoryResponse])
 def get_history_by_order(order_id: int, db: Session = Depends(get_db)):
     """Получить историю статусов для конкретного заказа"""
-    order = db.query(Order).filter(Order.id == order_id).first()
-    if not order:
+    order_exists = db.query(Order.id).filter(Order.id == order_id).first()
+    if not order_exists:
         raise HTTPException(status_code=404, detail="Заказ не найден")
 
-    history_items = db.query(CookingStatusHistory)\
-        .filter(CookingStatusHistory.order_id == order_id)\
-        .order_by(CookingStatusHistory.change_time.desc())\
-        .all()
-
-    result = []
-    for item in history_items:
-        item_dict = item.__dict__.copy()
-
-        plate = db.query(Menu).filter(Menu.id == item.plate_id).first()
-        item_dict['plate_name'] = plate.name if plate else None
-
-        if item.change_by:
-            user = db.query(User).filter(User.id == item.change_by).first()
-            item_dict['user_name'] = user.name if user else None
+    rows = db.execute(_history_records_select()
+        .where(CookingStatusHistory.order_id == order_id)
+        .order_by(CookingStatusHistory.change_time.desc()))
 
-        item_dict['order_number'] = f"Заказ #{order_id}"
-
-        result.append(CookingStatusHistoryResponse(**item_dict))
-
-    return result
+    return FastJSONResponse(content=[_history_record(row) for row in rows])
 
 @router.get("/user/{user_id}", response_model=List[CookingStatusHistoryResponse])
 def get_history_by_user(user_id: int, db: Session = Depends(get_db)):
     """Получить историю статусов, измененных конкретным пользователем"""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user_exists = db.query(User.id).filter(User.id == user_id).first()
+    if not user_exists:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
 
-    history_items = db.query(CookingStatusHistory)\
-        .filter(CookingStatusHistory.change_by == user_id)\
-        .order_by(CookingStatusHistory.change_time.desc())\
-        .all()
-
-    result = []
-    for item in history_items:
-        item_dict = item.__dict__.copy()
-
-        plate = db.query(Menu).filter(Menu.id == item.plate_id).first()
-        item_dict['plate_name'] = plate.name if plate else None
-
-        item_dict['user_name'] = user.name
+    rows = db.execute(_history_records_select()
+        .where(CookingStatusHistory.change_by == user_id)
+        .order_by(CookingStatusHistory.change_time.desc()))
 
-        if item.order_id:
-            item_dict['order_number'] = f"Заказ #{item.order_id}"
-
-        result.append(CookingStatusHistoryResponse(**item_dict))
-
-    return result
+    return FastJSONResponse(content=[_history_record(row) for row in rows])
 
 @router.get("/latest/plate/{plate_id}", response_model=CookingStatusHistoryResponse)
 def get_latest_status_for_plate(plate_id: int, db: Session = Depends(get_db)):
@@ -269,22 +211,65 @@ def get_latest_status_for_plate(plate_id: int, db: Session = Depends(get_db)):
     if not plate:
         raise HTTPException(status_code=404, detail="Блюдо не найдено")
 
-    latest_item = db.query(CookingStatusHistory)\
-        .filter(CookingStatusHistory.plate_id == plate_id)\
-        .order_by(CookingStatusHistory.change_time.desc())\
-        .first()
+    latest_row = db.execute(_history_records_select()
+        .where(CookingStatusHistory.plate_id == plate_id)
+        .order_by(CookingStatusHistory.change_time.desc())
+        .limit(1)).first()
 
-    if not latest_item:
+    if not latest_row:
         raise HTTPException(status_code=404, detail="История статусов для этого блюда не найдена")
 
-    item_dict = latest_item.__dict__.copy()
-    item_dict['plate_name'] = plate.name
-
-    if latest_item.change_by:
-        user = db.query(User).filter(User.id == latest_item.change_by).first()
-        item_dict['user_name'] = user.name if user else None
-
-    if latest_item.order_id:
-        item_dict['order_number'] = f"Заказ #{latest_item.order_id}"
-
-    return CookingStatusHistoryResponse(**item_dict)
\ No newline at end of file
+    return FastJSONResponse(content=_history_record(latest_row))
+
+def archive_history_before(db: Session, before: datetime, batch_size: int = None) -> int:
+    """
+    Перенести записи истории старше before в архивную таблицу.
+    Работает пачками по batch_size строк, каждая пачка - отдельная транзакция
+    (INSERT ... SELECT + DELETE), чтобы не держать долгих блокировок.
+    Возвращает количество перенесенных записей.
+    """
+    batch_size = batch_size or settings.HISTORY_ARCHIVE_BATCH_SIZE
+    archived_at = datetime.utcnow()
+    total = 0
+
+    while True:
+        ids = [row[0] for row in db.query(CookingStatusHistory.id)
+               .filter(CookingStatusHistory.change_time < before)
+               .order_by(CookingStatusHistory.change_time)
+               .limit(batch_size)
+               .all()]
+        if not ids:
+            break
+
+        source = select(
+            CookingStatusHistory.id,
+            CookingStatusHistory.change_time,
+            CookingStatusHistory.new_status,
+            CookingStatusHistory.order_id,
+            CookingStatusHistory.plate_id,
+            CookingStatusHistory.change_by,
+            literal(archived_at)
+        ).where(CookingStatusHistory.id.in_(ids))
+
+        db.execute(insert(CookingStatusHistoryArchive).from_select(
+            ["id", "change_time", "new_status", "order_id", "plate_id", "change_by", "archived_at"],
+            source
+        ))
+        db.execute(delete(CookingStatusHistory).where(CookingStatusHistory.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+
+    return total
+
+@router.post("/archive", response_model=CookingStatusHistoryArchiveResult)
+def archive_cooking_status_history(before: Optional[datetime] = None, db: Session = Depends(get_db)):
+    """
+    Перенести старую историю статусов в архив.
+    По умолчанию переносятся записи старше HISTORY_RETENTION_DAYS дней.
+    """
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=settings.HISTORY_RETENTION_DAYS)
+
+    archived = archive_history_before(db, before)
+
+    return CookingStatusHistoryArchiveResult(archived=archived, before=before)
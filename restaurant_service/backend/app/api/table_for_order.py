@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.hall_state import hall_state
 from app.database import get_db
 from app.db_models import TableForOrder, Order, Table
 from app.schemas.table_orders_schemas import *
@@ -69,6 +70,7 @@ def create_table_for_order(record_data: TableForOrderCreate, db: Session = Depen
 
     db.add(record)
     db.commit()
+    hall_state.invalidate()
     db.refresh(record)
 
     return record
@@ -93,6 +95,7 @@ def update_table_for_order(record_id: int, record_data: TableForOrderUpdate, db:
         record.table = record_data.table
 
     db.commit()
+    hall_state.invalidate()
     db.refresh(record)
 
     return record
@@ -106,5 +109,6 @@ def delete_table_for_order(record_id: int, db: Session = Depends(get_db)):
 
     db.delete(record)
     db.commit()
+    hall_state.invalidate()
 
     return {"message": "Связь удалена"}
\ No newline at end of file
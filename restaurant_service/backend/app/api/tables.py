@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.hall_state import hall_state
 from app.database import get_db
 from app.db_models import Table
 from app.schemas.tables_schemas import *
@@ -50,6 +51,7 @@ def create_table(table_data: TableCreate, db: Session = Depends(get_db)):
 
     db.add(table)
     db.commit()
+    hall_state.invalidate()
     db.refresh(table)
 
     return table
@@ -77,6 +79,7 @@ def update_table(table_id: int, table_data: TableUpdate, db: Session = Depends(g
         table.is_available = table_data.is_available
 
     db.commit()
+    hall_state.invalidate()
     db.refresh(table)
 
     return table
@@ -90,5 +93,6 @@ def delete_table(table_id: int, db: Session = Depends(get_db)):
 
     db.delete(table)
     db.commit()
+    hall_state.invalidate()
 
     return {"message": "Стол удален"}
\ No newline at end of file
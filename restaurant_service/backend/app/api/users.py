@@ -5,7 +5,7 @@ from typing import List
 from app.database import get_db
 from app.db_models import User
 from app.schemas.users_schemas import *
-from app.core.security import get_password_hash, get_current_user
+from app.core.security import get_password_hash, get_current_user, invalidate_user_cache
 from app.core.config import settings
 
 router = APIRouter(prefix="/users", tags=["Пользователи"])
@@ -113,6 +113,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.id)
 
     return UserResponse(
         id=user.id,
@@ -131,6 +132,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 
     db.delete(user)
     db.commit()
+    invalidate_user_cache(user_id)
 
     return {"message": "Пользователь удален"}
 
@@ -169,6 +171,7 @@ def update_user_full(user_id: int, user_data: UserUpdateFull, db: Session = Depe
 
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.id)
 
     return UserResponse(
         id=user.id,
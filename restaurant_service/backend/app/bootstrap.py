@@ -0,0 +1,174 @@
+"""
+Подготовка схемы БД. Выполняется явно при развертывании, а не при импорте приложения:
+
+    python -m app.bootstrap          # создать недостающие таблицы, перенести base64-фото в файлы
+    python -m app.bootstrap --check  # только проверить схему (код выхода 1, если не совпадает)
+
+create_all создает только отсутствующие таблицы (вместе с их индексами), поэтому
+колонки и индексы, добавленные в модели позже, добавляются в существующие
+таблицы отдельно: колонки - ALTER TABLE ... ADD COLUMN со значением по умолчанию
+и заполнением из _BACKFILLS, индексы - CREATE INDEX.
+"""
+import argparse
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import inspect, not_, or_, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from app.core.health import schema_state
+from app.core.media import MEDIA_URL_PREFIX, MediaError, MediaStore, media_store
+from app.database import DATABASE_URL, engine
+from app.db_models import Base, Menu, PlateForOrder
+
+
+def _backfill_order_counters(bind: Engine):
+    # Импорт здесь: модуль эндпоинтов заказов нужен только для заполнения
+    from app.api.orders import rebuild_order_counters
+    with Session(bind=bind) as db:
+        rebuild_order_counters(db)
+
+
+def _backfill_plate_categories(bind: Engine):
+    # Для уже проданных блюд другой категории, кроме текущей в меню, не сохранилось
+    category = select(Menu.category).where(Menu.id == PlateForOrder.plate_id).scalar_subquery()
+    with bind.begin() as connection:
+        connection.execute(
+            update(PlateForOrder).where(PlateForOrder.category.is_(None)).values(category=category)
+        )
+
+
+# Заполнение колонок, добавленных в существующие таблицы: колонка -> функция
+_BACKFILLS = {
+    "orders.total": _backfill_order_counters,
+    "orders.plate_count": _backfill_order_counters,
+    "orders.pending_plate_count": _backfill_order_counters,
+    "plates_for_order.category": _backfill_plate_categories,
+}
+
+
+def add_missing_columns(bind: Engine = engine) -> List[str]:
+    """
+    Добавить в существующие таблицы колонки моделей, которых там нет, и
+    заполнить их по _BACKFILLS. Колонку NOT NULL без server_default добавить
+    нельзя - такая колонка остается в отчете --check.
+    """
+    inspector = inspect(bind)
+    existing = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as connection:
+        for name, table in Base.metadata.tables.items():
+            if name not in existing:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(name)}
+            for column in table.columns:
+                if column.name in columns or (not column.nullable and column.server_default is None):
+                    continue
+                table_name = bind.dialect.identifier_preparer.format_table(table)
+                ddl = CreateColumn(column).compile(dialect=bind.dialect)
+                connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {ddl}"))
+                added.append(f"{name}.{column.name}")
+
+    backfills = []
+    for column in added:
+        backfill = _BACKFILLS.get(column)
+        if backfill is not None and backfill not in backfills:
+            backfills.append(backfill)
+    for backfill in backfills:
+        backfill(bind)
+    return added
+
+
+def create_missing_indexes(bind: Engine = engine) -> List[str]:
+    """Создать индексы моделей, которых нет в уже существующих таблицах"""
+    inspector = inspect(bind)
+    existing = set(inspector.get_table_names())
+    created = []
+    for name, table in Base.metadata.tables.items():
+        if name not in existing:
+            continue
+        indexes = {index["name"] for index in inspector.get_indexes(name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in indexes:
+                index.create(bind=bind, checkfirst=True)
+                created.append(index.name)
+    return created
+
+
+def create_schema(bind: Engine = engine) -> List[str]:
+    """
+    Создать недостающие таблицы, колонки и индексы.
+    Возвращает имена созданных объектов: сначала таблицы, затем колонки и
+    индексы существующих таблиц.
+    """
+    existing = set(inspect(bind).get_table_names())
+    Base.metadata.create_all(bind=bind)
+    created = sorted(name for name in Base.metadata.tables if name not in existing)
+    return created + add_missing_columns(bind) + create_missing_indexes(bind)
+
+
+def move_inline_photos(bind: Engine = engine, store: MediaStore = media_store) -> Tuple[int, int]:
+    """
+    Перенести фото, хранящиеся в menu.photo как base64, в хранилище файлов.
+    Фото читаются по одному, чтобы не держать в памяти все сразу.
+    Возвращает (перенесено, пропущено из-за ошибок).
+    """
+    inline = not_(or_(
+        Menu.photo.startswith(MEDIA_URL_PREFIX), Menu.photo.startswith("http://"), Menu.photo.startswith("https://")
+    ))
+    with bind.connect() as connection:
+        ids = connection.execute(select(Menu.id).where(Menu.photo.isnot(None), Menu.photo != "", inline)).scalars().all()
+
+    moved = skipped = 0
+    for menu_id in ids:
+        with bind.begin() as connection:
+            value = connection.execute(select(Menu.photo).where(Menu.id == menu_id)).scalar()
+            try:
+                url = store.store_photo_value(value)
+            except MediaError as e:
+                print(f"Фото блюда {menu_id} не перенесено: {e}")
+                skipped += 1
+                continue
+            connection.execute(update(Menu).where(Menu.id == menu_id).values(photo=url))
+            moved += 1
+    return moved, skipped
+
+
+def check_schema(bind: Engine = engine) -> dict:
+    """Сравнить схему БД с моделями"""
+    with bind.connect() as connection:
+        return schema_state(connection, Base.metadata)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="только проверить схему")
+    args = parser.parse_args(argv)
+
+    print(f"База данных: {DATABASE_URL.split('@')[-1]}")
+
+    if not args.check:
+        created = create_schema()
+        print(f"Созданы: {', '.join(created)}" if created else "Все таблицы и индексы уже существуют")
+        moved, skipped = move_inline_photos()
+        if moved or skipped:
+            print(f"Фото перенесены в {media_store.root}: {moved}, пропущены: {skipped}")
+
+    state = check_schema()
+    if state["up_to_date"]:
+        print("Схема соответствует моделям")
+        return 0
+
+    for name in state["missing_tables"]:
+        print(f"Нет таблицы: {name}")
+    for name in state["missing_columns"]:
+        print(f"Нет колонки: {name}")
+    for name in state["missing_indexes"]:
+        print(f"Нет индекса: {name}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,12 +6,72 @@ class Settings(BaseSettings):
     DEBUG: bool = False
 
     DATABASE_URL: str = ""
+    # Пул соединений основного движка
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    # Создавать недостающие таблицы при старте приложения (только для разработки,
+    # в остальных случаях - python -m app.bootstrap)
+    AUTO_CREATE_SCHEMA: bool = False
+    # Асинхронный режим БД (AsyncSession + asyncpg)
+    DATABASE_ASYNC: bool = False
+    # Если не задан, выводится из DATABASE_URL заменой драйвера на asyncpg
+    ASYNC_DATABASE_URL: str = ""
 
     # JWT настройки
     SECRET_KEY: str = ""
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24
 
+    # Хеширование паролей: стоимость bcrypt и число процессов пула (0 - без пула)
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Кеш пользователей для get_current_user (имя и логин; роль и блокировка
+    # проверяются в БД на каждом запросе)
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 1024
+
+    # Кеш меню в памяти процесса
+    MENU_CACHE_TTL_SECONDS: int = 300
+
+    # Фото блюд: каталог на диске, размер миниатюр, лимит размера, процессы для миниатюр
+    MEDIA_ROOT: str = "var/media"
+    MEDIA_THUMBNAIL_SIZE: int = 320
+    MEDIA_MAX_BYTES: int = 10 * 1024 * 1024
+    MEDIA_WORKERS: int = 2
+
+    # Снимок зала в памяти процесса
+    HALL_STATE_TTL_SECONDS: int = 5
+
+    # Хранение истории статусов блюд
+    HISTORY_RETENTION_DAYS: int = 90
+    HISTORY_ARCHIVE_BATCH_SIZE: int = 5000
+
+    # Отложенная запись истории статусов: очередь в памяти + журнал на диске
+    HISTORY_WRITE_BEHIND: bool = False
+    HISTORY_BUFFER_SIZE: int = 10000
+    HISTORY_FLUSH_SIZE: int = 500
+    HISTORY_FLUSH_INTERVAL_MS: int = 500
+    HISTORY_SPILL_DIR: str = "var/history_spill"
+
+    # Кеш статистики кухни: сколько дней держать и как часто пересчитывать текущий день
+    KITCHEN_STATS_CACHE_DAYS: int = 31
+    KITCHEN_STATS_TODAY_TTL_SECONDS: int = 60
+
+    # Потоковые выгрузки: строк на одну выборку курсора и на один кусок ответа
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Запросы к БД дольше этого порога пишутся в лог вместе с маршрутом
+    SLOW_QUERY_MS: int = 200
+
+    # Проверки готовности: время кеширования результата и пороги деградации.
+    # Сверка схемы с моделями дорогая (чтение каталога БД) и кешируется отдельно
+    HEALTH_CACHE_SECONDS: float = 2
+    HEALTH_SCHEMA_CACHE_SECONDS: float = 600
+    HEALTH_DB_LATENCY_MS: int = 250
+    HEALTH_POOL_SATURATION: float = 0.9
+    HEALTH_CONNECT_TIMEOUT_SECONDS: int = 3
+
     # CORS настройки
     ALLOWED_ORIGINS: list = ["http://localhost:3000", "http://localhost:19006"]
 
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограмм: число SQL-запросов на HTTP-запрос и время в БД (секунды)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+DB_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами (значение попадает в первую корзину >= значения)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Пары (граница, число наблюдений <= границы), последняя граница - +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): total for bound, total in self.cumulative()}
+        }
+
+
+class RequestDbStats:
+    """Число SQL-запросов и время в БД в рамках одного HTTP-запроса"""
+
+    __slots__ = ("scope", "queries", "seconds")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope or {}
+        self.queries = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        return route_of(self.scope)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.queries} queries"'
+
+
+_current_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def route_of(scope: dict) -> str:
+    """Шаблон пути маршрута (/api/orders/{order_id}), а не конкретный URL"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def start_request_stats(scope: dict):
+    """Начать учет запросов; возвращает статистику и токен для finish_request_stats"""
+    stats = RequestDbStats(scope)
+    return stats, _current_stats.set(stats)
+
+
+def finish_request_stats(token):
+    _current_stats.reset(token)
+
+
+class RouteDbMetrics:
+    """Гистограммы числа запросов и времени в БД по маршрутам"""
+
+    def __init__(self):
+        self._routes: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, stats: RequestDbStats):
+        with self._lock:
+            histograms = self._routes.get((method, route))
+            if histograms is None:
+                histograms = (Histogram(QUERY_COUNT_BUCKETS), Histogram(DB_SECONDS_BUCKETS))
+                self._routes[(method, route)] = histograms
+            histograms[0].observe(stats.queries)
+            histograms[1].observe(stats.seconds)
+
+    def items(self):
+        with self._lock:
+            return list(self._routes.items())
+
+    def snapshot(self) -> dict:
+        return {
+            f"{method} {route}": {"queries": queries.snapshot(), "db_seconds": seconds.snapshot()}
+            for (method, route), (queries, seconds) in self.items()
+        }
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_db_metrics = RouteDbMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Медленный запрос %.1f мс (%s %s): %s",
+            elapsed * 1000,
+            stats.scope.get("method", "-") if stats else "-",
+            stats.route if stats else "-",
+            statement[:1000]
+        )
+
+
+def _handle_error(exception_context):
+    # После ошибки after_cursor_execute не вызывается - убираем отметку времени
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """Подключить учет запросов к движку (для AsyncEngine - к engine.sync_engine)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+
+class Subscription:
+    """Подписка одного клиента: очередь событий, привязанная к его event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _put(self, event: Dict[str, Any]):
+        # Медленный клиент не должен тормозить остальных: вытесняем самое старое событие
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Брокер событий в памяти процесса.
+    publish можно вызывать из любого потока (в том числе из синхронных
+    эндпоинтов в пуле потоков), события доставляются в event loop подписчика.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, payload: Dict[str, Any]):
+        event = {
+            "type": event_type,
+            "time": datetime.utcnow().isoformat(),
+            **payload
+        }
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:
+                # event loop подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+kitchen_events = EventBroker()
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db_models import Order, Table, TableForOrder, User
+
+
+class HallSnapshot:
+    """Готовый к отдаче JSON со столами зала и активными заказами на них"""
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.loaded_at = time.monotonic()
+
+
+class HallState:
+    """
+    Состояние зала в памяти процесса.
+    Снимок строится двумя запросами - столы и активные заказы с именем
+    официанта (суммы берутся из счетчиков заказа) - и сразу сериализуется,
+    поэтому чтение - это отдача готовых байтов.
+    Эндпоинты, меняющие столы и заказы, вызывают invalidate, и следующий
+    запрос строит снимок заново.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[HallSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, snapshot: Optional[HallSnapshot]) -> bool:
+        return snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+
+    def get(self, db: Session) -> HallSnapshot:
+        snapshot = self._snapshot
+        if self._fresh(snapshot):
+            return snapshot
+
+        with self._lock:
+            version = self._version
+
+        snapshot = HallSnapshot(self._build(db, version))
+
+        with self._lock:
+            if self._version == version:
+                self._snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+
+    @staticmethod
+    def _build(db: Session, version: int) -> bytes:
+        tables = db.query(Table).order_by(Table.number).all()
+
+        active_orders = db.query(
+            TableForOrder.table, Order.id, Order.waiter, User.name, Order.timestart,
+            Order.total, Order.plate_count, Order.pending_plate_count
+        )\
+            .join(Order, Order.id == TableForOrder.order)\
+            .outerjoin(User, User.id == Order.waiter)\
+            .filter(Order.status == "active")\
+            .all()
+
+        orders_by_table = {
+            table_id: {
+                "id": order_id,
+                "waiter": waiter_id,
+                "waiter_name": waiter_name,
+                "timestart": timestart.isoformat(),
+                "total": float(total),
+                "plate_count": plate_count,
+                "pending_plate_count": pending_plate_count
+            }
+            for table_id, order_id, waiter_id, waiter_name, timestart, total, plate_count, pending_plate_count
+            in active_orders
+        }
+
+        payload = {
+            "version": version,
+            "generated_at": datetime.utcnow().isoformat(),
+            "tables": [
+                {
+                    "id": table.id,
+                    "number": table.number,
+                    "pos_x": float(table.pos_x),
+                    "pos_y": float(table.pos_y),
+                    "status": table.status,
+                    "is_available": table.is_available,
+                    "order": orders_by_table.get(table.id)
+                }
+                for table in tables
+            ]
+        }
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+hall_state = HallState(ttl_seconds=settings.HALL_STATE_TTL_SECONDS)
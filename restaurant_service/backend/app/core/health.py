@@ -0,0 +1,147 @@
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# Статусы готовности: ok - готов, degraded - работает, но медленно или на пределе,
+# down - БД недоступна
+STATUS_OK = "ok"
+STATUS_DEGRADED = "degraded"
+STATUS_DOWN = "down"
+
+
+def _pool_state(name: str, pool, max_overflow: int) -> Optional[dict]:
+    """Заполненность пула; пулы без счетчиков (StaticPool, NullPool) не учитываются"""
+    if not hasattr(pool, "checkedout"):
+        return None
+    limit = pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "engine": name,
+        "size": pool.size(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "limit": limit,
+        "saturation": round(checked_out / limit, 3) if limit else 0.0,
+    }
+
+
+def schema_state(connection, metadata: MetaData) -> dict:
+    """Сравнение схемы БД с моделями: недостающие таблицы, колонки и индексы"""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+
+    missing_tables = sorted(name for name in metadata.tables if name not in existing)
+    missing_columns = []
+    missing_indexes = []
+    for name, table in metadata.tables.items():
+        if name not in existing:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(name)}
+        missing_columns.extend(f"{name}.{column.name}" for column in table.columns if column.name not in columns)
+        indexes = {index["name"] for index in inspector.get_indexes(name)}
+        missing_indexes.extend(sorted(index.name for index in table.indexes if index.name not in indexes))
+
+    version = None
+    if "alembic_version" in existing:
+        version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+    return {
+        "up_to_date": not missing_tables and not missing_columns and not missing_indexes,
+        "version": version,
+        "missing_tables": missing_tables,
+        "missing_columns": missing_columns,
+        "missing_indexes": missing_indexes,
+    }
+
+
+class HealthChecker:
+    """
+    Проверка готовности: задержка БД, заполненность пулов, состояние схемы.
+    БД проверяется через отдельный движок без пула. Результат кешируется на
+    cache_seconds, и одновременные пробы ждут одну проверку, а не запускают свои.
+    Сравнение схемы с моделями читает весь каталог БД, поэтому выполняется при
+    первой проверке и затем не чаще раза в schema_cache_seconds.
+    """
+
+    def __init__(self, probe_engine: Engine, pools: Iterable[Tuple[str, object]], metadata: MetaData,
+                 cache_seconds: float, schema_cache_seconds: float = 600):
+        self.probe_engine = probe_engine
+        self.pools = list(pools)
+        self.metadata = metadata
+        self.cache_seconds = cache_seconds
+        self.schema_cache_seconds = schema_cache_seconds
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+        self._schema: Optional[dict] = None
+        self._schema_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def check(self) -> dict:
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.cache_seconds:
+                self._result = self._run()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def clear(self):
+        with self._lock:
+            self._result = None
+            self._schema = None
+
+    def _schema_state(self, connection) -> dict:
+        if self._schema is None or time.monotonic() - self._schema_checked_at >= self.schema_cache_seconds:
+            self._schema = schema_state(connection, self.metadata)
+            self._schema_checked_at = time.monotonic()
+        return self._schema
+
+    def _run(self) -> dict:
+        problems: List[str] = []
+        database = {"connected": False, "latency_ms": None}
+        schema = None
+
+        try:
+            with self.probe_engine.connect() as connection:
+                started = time.perf_counter()
+                connection.execute(text("SELECT 1"))
+                database["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                database["connected"] = True
+                schema = self._schema_state(connection)
+        except Exception as e:
+            database["error"] = type(e).__name__
+            problems.append("База данных недоступна")
+
+        if database["connected"]:
+            if database["latency_ms"] > settings.HEALTH_DB_LATENCY_MS:
+                problems.append(f"Задержка БД выше {settings.HEALTH_DB_LATENCY_MS} мс")
+            if not schema["up_to_date"]:
+                problems.append("Схема БД не соответствует моделям")
+
+        pools = [
+            state for state in (_pool_state(name, pool, settings.DB_MAX_OVERFLOW) for name, pool in self.pools)
+            if state is not None
+        ]
+        for state in pools:
+            if state["saturation"] >= settings.HEALTH_POOL_SATURATION:
+                problems.append(f"Пул соединений {state['engine']} заполнен на {state['saturation']:.0%}")
+
+        if not database["connected"]:
+            status = STATUS_DOWN
+        elif problems:
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_OK
+
+        return {
+            "status": status,
+            "checked_at": datetime.utcnow().isoformat(),
+            "problems": problems,
+            "database": database,
+            "pools": pools,
+            "schema": schema,
+        }
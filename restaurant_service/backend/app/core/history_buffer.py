@@ -0,0 +1,324 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.db_models import CookingStatusHistory
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировки файлов нет, журналы восстанавливаются без проверки владельца
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Ключ в session.info, где копятся записи истории до коммита запроса
+PENDING_KEY = "pending_history"
+
+
+class HistoryBuffer:
+    """
+    Отложенная запись истории статусов (write-behind).
+    Записи попадают в ограниченную очередь после коммита запроса и
+    дописываются в журнал на диске; фоновый поток вставляет их в БД пачками
+    по flush_size или раз в flush_interval секунд. После падения процесса
+    записи из журнала, не отмеченные в контрольной точке, вставляются при
+    следующем старте (доставка "хотя бы один раз": пачка, закоммиченная
+    прямо перед падением, может записаться повторно).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], spill_dir: str, max_size: int,
+                 flush_size: int, flush_interval: float):
+        self.session_factory = session_factory
+        self.spill_dir = spill_dir
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.flushed = 0
+        self.overflowed = 0
+        self._queue: "queue.Queue[Tuple[int, Dict]]" = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._journal = None
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+        # Все ли записи удалось вставить при остановке потока
+        self._drained = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _paths(self, pid: int) -> Tuple[str, str]:
+        base = os.path.join(self.spill_dir, f"history-{pid}")
+        return base + ".jsonl", base + ".checkpoint"
+
+    def start(self):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.recover()
+
+        # Журнал появляется под своим именем уже заблокированным: иначе recover()
+        # другого воркера может успеть захватить и удалить только что созданный файл
+        journal_path, _ = self._paths(os.getpid())
+        temp_path = journal_path + ".tmp"
+        self._journal = open(temp_path, "w", encoding="utf-8")
+        if fcntl is not None:
+            fcntl.flock(self._journal, fcntl.LOCK_EX)
+        os.replace(temp_path, journal_path)
+
+        self._drained = False
+        self._thread = threading.Thread(target=self._run, name="history-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 30):
+        """Дописать все записи из очереди и остановить поток (вызывается при завершении приложения)"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        finished = not self._thread.is_alive()
+        self._thread = None
+
+        if not finished:
+            # Поток еще пишет в журнал: оставляем его открытым до выхода процесса
+            logger.warning("Поток записи истории не завершился за %.0f с, журнал сохранен", timeout)
+            return
+
+        journal_path, checkpoint_path = self._paths(os.getpid())
+        self._journal.close()
+        self._journal = None
+        if not self._drained or not self._queue.empty():
+            logger.warning("История статусов записана не полностью, остаток в журнале %s", journal_path)
+            return
+        for path in (journal_path, checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def enqueue(self, rows: List[Dict]) -> List[Dict]:
+        """Поставить записи в очередь; возвращает те, что не поместились"""
+        rejected = []
+        with self._lock:
+            for row in rows:
+                self._seq += 1
+                try:
+                    self._queue.put_nowait((self._seq, row))
+                except queue.Full:
+                    rejected.append(row)
+                    continue
+                self._journal.write(json.dumps({"seq": self._seq, "row": row}, default=_json_default) + "\n")
+            self._journal.flush()
+        return rejected
+
+    def insert_now(self, rows: List[Dict]):
+        """Синхронная вставка в отдельной транзакции (переполнение очереди, восстановление)"""
+        db = self.session_factory()
+        try:
+            db.execute(insert(CookingStatusHistory), rows)
+            db.commit()
+        finally:
+            db.close()
+
+    def recover(self) -> int:
+        """
+        Вставить незаписанные записи из журналов завершившихся процессов.
+        Пустые журналы и журналы живых процессов пропускаются (кроме журнала
+        текущего процесса, оставшегося от прошлого запуска буфера).
+        """
+        recovered = 0
+        for name in sorted(os.listdir(self.spill_dir)):
+            if not name.startswith("history-") or not name.endswith(".jsonl"):
+                continue
+            try:
+                pid = int(name[len("history-"):-len(".jsonl")])
+            except ValueError:
+                continue
+            if pid != os.getpid() and _pid_alive(pid):
+                continue
+            journal_path = os.path.join(self.spill_dir, name)
+            checkpoint_path = journal_path[:-len(".jsonl")] + ".checkpoint"
+
+            try:
+                if os.path.getsize(journal_path) == 0:
+                    continue  # нечего восстанавливать
+                journal = open(journal_path, "r+", encoding="utf-8")
+            except FileNotFoundError:
+                continue  # журнал уже забрал другой воркер
+            with journal:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        continue  # журнал работающего воркера
+
+                flushed_seq = 0
+                if os.path.exists(checkpoint_path):
+                    with open(checkpoint_path, encoding="utf-8") as checkpoint:
+                        flushed_seq = int(checkpoint.read().strip() or 0)
+
+                rows = []
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # недописанная последняя строка
+                    if entry["seq"] > flushed_seq:
+                        rows.append(_restore_row(entry["row"]))
+
+                for start in range(0, len(rows), self.flush_size):
+                    self.insert_now(rows[start:start + self.flush_size])
+                recovered += len(rows)
+
+            os.remove(journal_path)
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+
+        if recovered:
+            logger.warning("Восстановлено записей истории из журнала: %d", recovered)
+        return recovered
+
+    def _run(self):
+        batch: List[Tuple[int, Dict]] = []
+        deadline = None
+        while True:
+            # Пока пачка пуста, ждем без таймаута: поток спит до первой записи или остановки
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+
+            if item is None:
+                self._drained = self._drain(batch)
+                return
+            if item:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.flush_size or time.monotonic() >= deadline):
+                if self._flush(batch):
+                    batch = []
+                    deadline = None
+                else:
+                    deadline = time.monotonic() + self.flush_interval
+
+    def _drain(self, batch: List[Tuple[int, Dict]]) -> bool:
+        """Записать все, что осталось в очереди, перед остановкой; False - если не все пачки записаны"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+
+        for start in range(0, len(batch), self.flush_size):
+            more_pending = start + self.flush_size < len(batch)
+            if not self._flush(batch[start:start + self.flush_size], retry_delay=0, more_pending=more_pending):
+                # БД недоступна: записи остаются в журнале до следующего старта
+                return False
+        return True
+
+    def _flush(self, batch: List[Tuple[int, Dict]], retry_delay: Optional[float] = None,
+               more_pending: bool = False) -> bool:
+        try:
+            self.insert_now([row for _, row in batch])
+        except Exception:
+            retry_delay = self.flush_interval if retry_delay is None else retry_delay
+            logger.exception("Не удалось записать историю статусов, повтор через %.1f с", retry_delay)
+            time.sleep(retry_delay)
+            return False
+
+        self.flushed += len(batch)
+        self._checkpoint(batch[-1][0], more_pending)
+        return True
+
+    def _checkpoint(self, seq: int, more_pending: bool = False):
+        """Отметить записи до seq как записанные; журнал без незаписанных записей обрезается"""
+        journal_path, checkpoint_path = self._paths(os.getpid())
+        with self._lock:
+            if self._queue.empty() and not more_pending:
+                self._journal.seek(0)
+                self._journal.truncate()
+                if os.path.exists(checkpoint_path):
+                    os.remove(checkpoint_path)
+                return
+
+            temp_path = checkpoint_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as checkpoint:
+                checkpoint.write(str(seq))
+            os.replace(temp_path, checkpoint_path)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Работает ли процесс pid (на Windows не проверяется)"""
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется")
+
+
+def _restore_row(row: Dict) -> Dict:
+    row["change_time"] = datetime.fromisoformat(row["change_time"])
+    return row
+
+
+history_buffer = HistoryBuffer(
+    SessionLocal,
+    spill_dir=settings.HISTORY_SPILL_DIR,
+    max_size=settings.HISTORY_BUFFER_SIZE,
+    flush_size=settings.HISTORY_FLUSH_SIZE,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL_MS / 1000
+)
+
+
+def record_history(db: Session, rows: List[Dict]):
+    """
+    Записать историю статусов блюд.
+    Без write-behind - вставка одним INSERT в транзакции запроса. С write-behind
+    записи копятся в сессии и уходят в буфер только после коммита запроса.
+    """
+    if not rows:
+        return
+    if history_buffer.running:
+        db.info.setdefault(PENDING_KEY, []).extend(rows)
+    else:
+        db.execute(insert(CookingStatusHistory), rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_history(session: Session):
+    rows = session.info.pop(PENDING_KEY, None)
+    if not rows:
+        return
+    if not history_buffer.running:
+        history_buffer.insert_now(rows)
+        return
+    rejected = history_buffer.enqueue(rows)
+    if rejected:
+        # Очередь заполнена: пишем сразу, замедляя запрос вместо потери записей
+        history_buffer.overflowed += len(rejected)
+        history_buffer.insert_now(rejected)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_history(session: Session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,145 @@
+import math
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import DateTime, Integer, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db_models import CookingStatusHistory, Menu, User
+from app.schemas.history_schemas import KitchenStats, KitchenStageStats, KitchenDishStats, KitchenCookStats
+
+# Этапы, время в которых считается: от записи со статусом до следующей записи
+# по тому же блюду заказа. Начальный статус - "ordered" (блюда из create_order)
+# или "waiting" (блюда, добавленные в заказ позже). "served" - конечный статус,
+# его длительность не считается.
+STAGES = ("waiting", "ordered", "preparing", "ready")
+
+PERCENTILES = (50, 90, 99)
+
+
+def _percentile(sorted_values: List[float], percent: int) -> float:
+    """Перцентиль методом ближайшего ранга по отсортированному списку"""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _stage_stats(durations: Dict[str, List[float]]) -> List[KitchenStageStats]:
+    result = []
+    for stage in STAGES:
+        values = durations.get(stage)
+        if not values:
+            continue
+        values.sort()
+        p50, p90, p99 = (_percentile(values, p) for p in PERCENTILES)
+        result.append(KitchenStageStats(
+            stage=stage,
+            count=len(values),
+            avg_seconds=sum(values) / len(values),
+            p50_seconds=p50,
+            p90_seconds=p90,
+            p99_seconds=p99
+        ))
+    return result
+
+
+def compute_kitchen_stats(db: Session, day: date, batch_size: int = 1000) -> KitchenStats:
+    """
+    Время этапов приготовления за день по блюдам и поварам.
+    Длительность этапа считает оконная функция LEAD в одном запросе, строки
+    читаются потоком. Этап относится к дню, в который он начался; повар -
+    пользователь, который перевел блюдо в следующий статус.
+
+    История хранит позицию меню, а не строку plates_for_order, поэтому окно
+    разбито по (заказ, блюдо меню). Если в заказе несколько порций одного
+    блюда отдельными строками, их статусы попадают в одну последовательность
+    и длительности этапов для них считаются приблизительно.
+    """
+    day_start = datetime.combine(day, dt_time.min)
+    day_end = day_start + timedelta(days=1)
+
+    window = dict(
+        partition_by=(CookingStatusHistory.order_id, CookingStatusHistory.plate_id),
+        order_by=(CookingStatusHistory.change_time, CookingStatusHistory.id)
+    )
+    # Окно захватывает и следующий день, чтобы этапы, начатые до полуночи, имели конец
+    timeline = select(
+        CookingStatusHistory.plate_id,
+        CookingStatusHistory.new_status,
+        CookingStatusHistory.change_time,
+        func.lead(CookingStatusHistory.change_time, type_=DateTime).over(**window).label("next_time"),
+        func.lead(CookingStatusHistory.change_by, type_=Integer).over(**window).label("next_by")
+    ).where(
+        CookingStatusHistory.change_time >= day_start,
+        CookingStatusHistory.change_time < day_end + timedelta(days=1)
+    ).subquery()
+
+    stages = select(
+        timeline.c.plate_id, timeline.c.new_status, timeline.c.change_time,
+        timeline.c.next_time, timeline.c.next_by
+    ).where(
+        timeline.c.change_time < day_end,
+        timeline.c.new_status.in_(STAGES),
+        timeline.c.next_time.isnot(None)
+    ).execution_options(yield_per=batch_size)
+
+    overall: Dict[str, List[float]] = defaultdict(list)
+    by_dish: Dict[int, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    by_cook: Dict[int, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    for plate_id, stage, started, finished, cook_id in db.execute(stages):
+        seconds = (finished - started).total_seconds()
+        overall[stage].append(seconds)
+        by_dish[plate_id][stage].append(seconds)
+        if cook_id is not None:
+            by_cook[cook_id][stage].append(seconds)
+
+    dish_names = dict(db.query(Menu.id, Menu.name).filter(Menu.id.in_(by_dish)).all()) if by_dish else {}
+    cook_names = dict(db.query(User.id, User.name).filter(User.id.in_(by_cook)).all()) if by_cook else {}
+
+    return KitchenStats(
+        day=day,
+        stages=_stage_stats(overall),
+        dishes=[
+            KitchenDishStats(plate_id=plate_id, plate_name=dish_names.get(plate_id), stages=_stage_stats(durations))
+            for plate_id, durations in sorted(by_dish.items())
+        ],
+        cooks=[
+            KitchenCookStats(cook_id=cook_id, cook_name=cook_names.get(cook_id), stages=_stage_stats(durations))
+            for cook_id, durations in sorted(by_cook.items())
+        ]
+    )
+
+
+class KitchenStatsCache:
+    """
+    Кеш статистики кухни по дням. Прошедшие дни уже не меняются и хранятся
+    долго, текущий день пересчитывается не чаще раза в today_ttl_seconds.
+    """
+
+    def __init__(self, max_days: int, today_ttl_seconds: int, past_ttl_seconds: int):
+        self._today = TTLCache(max_size=1, ttl_seconds=today_ttl_seconds)
+        self._past = TTLCache(max_size=max_days, ttl_seconds=past_ttl_seconds)
+
+    def get(self, db: Session, day: date, today: Optional[date] = None) -> KitchenStats:
+        today = today or datetime.utcnow().date()
+        cache = self._past if day < today else self._today
+
+        stats = cache.get(day)
+        if stats is None:
+            stats = compute_kitchen_stats(db, day)
+            cache.set(day, stats)
+        return stats
+
+    def clear(self):
+        self._today.clear()
+        self._past.clear()
+
+
+kitchen_stats_cache = KitchenStatsCache(
+    max_days=settings.KITCHEN_STATS_CACHE_DAYS,
+    today_ttl_seconds=settings.KITCHEN_STATS_TODAY_TTL_SECONDS,
+    past_ttl_seconds=24 * 60 * 60
+)
@@ -0,0 +1,178 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # без Pillow миниатюры не строятся, отдается оригинал
+    Image = None
+
+# Модуль не импортирует ничего, связанного с БД: построение миниатюр
+# выполняется в дочерних процессах пула.
+
+logger = logging.getLogger(__name__)
+
+MEDIA_URL_PREFIX = "/api/media/"
+THUMBNAIL_URL_PREFIX = "/api/media/thumbs/"
+
+# Сигнатуры поддерживаемых форматов: (начало файла, расширение)
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+MEDIA_NAME = re.compile(r"^[0-9a-f]{64}\.(jpg|png|gif|webp)$")
+
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+
+class MediaError(ValueError):
+    pass
+
+
+def image_extension(data: bytes) -> Optional[str]:
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in _SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return None
+
+
+def is_media_url(value: Optional[str]) -> bool:
+    return bool(value) and (value.startswith(MEDIA_URL_PREFIX) or value.startswith(("http://", "https://")))
+
+
+def decode_inline_photo(value: str) -> bytes:
+    """Байты картинки из data URL (data:image/png;base64,...) или голого base64"""
+    payload = value.split(",", 1)[1] if value.startswith("data:") else value
+    try:
+        return base64.b64decode("".join(payload.split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise MediaError("Фото должно быть ссылкой или картинкой в base64")
+
+
+def photo_url(value: Optional[str]) -> Optional[str]:
+    """Значение для ответов API: ссылка или None для еще не перенесенных base64-фото"""
+    return value if is_media_url(value) else None
+
+
+def thumbnail_url(value: Optional[str]) -> Optional[str]:
+    if value and value.startswith(MEDIA_URL_PREFIX):
+        return THUMBNAIL_URL_PREFIX + value[len(MEDIA_URL_PREFIX):]
+    return photo_url(value)
+
+
+def _write_atomic(path: str, data: bytes):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+def _make_thumbnail(source: str, target: str, size: int):
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        image.save(temp_path, format=image.format)
+    os.replace(temp_path, target)
+
+
+class MediaStore:
+    """
+    Хранилище фото блюд на диске с адресацией по содержимому: имя файла -
+    sha256 байтов, поэтому файл никогда не меняется и может кешироваться
+    бессрочно, а одинаковые фото хранятся один раз. Миниатюры строятся в
+    пуле процессов (если установлен Pillow).
+    """
+
+    def __init__(self, root: str, thumbnail_size: int, max_bytes: int, workers: int):
+        self.root = root
+        self.thumbnail_size = thumbnail_size
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def thumbnails_enabled(self) -> bool:
+        return Image is not None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name[:2], name)
+
+    def thumbnail_path(self, name: str) -> str:
+        return os.path.join(self.root, "thumbs", str(self.thumbnail_size), name[:2], name)
+
+    def put(self, data: bytes) -> str:
+        """Сохранить картинку; возвращает ее URL"""
+        if len(data) > self.max_bytes:
+            raise MediaError(f"Фото больше {self.max_bytes // (1024 * 1024)} МБ")
+        extension = image_extension(data)
+        if extension is None:
+            raise MediaError("Поддерживаются фото в форматах JPEG, PNG, GIF и WebP")
+
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = self.path(name)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        self.request_thumbnail(name)
+        return MEDIA_URL_PREFIX + name
+
+    def store_photo_value(self, value: Optional[str]) -> Optional[str]:
+        """Значение поля photo из запроса -> что хранить в БД: ссылки как есть, base64 - в файл"""
+        if not value or is_media_url(value):
+            return value
+        return self.put(decode_inline_photo(value))
+
+    def request_thumbnail(self, name: str) -> Optional[Future]:
+        """Поставить построение миниатюры в пул; повторные запросы получают ту же задачу"""
+        if not self.thumbnails_enabled or os.path.exists(self.thumbnail_path(name)):
+            return None
+        with self._lock:
+            future = self._pending.get(name)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._executor.submit(_make_thumbnail, self.path(name), self.thumbnail_path(name), self.thumbnail_size)
+            self._pending[name] = future
+        future.add_done_callback(lambda done: self._thumbnail_done(name, done))
+        return future
+
+    def _thumbnail_done(self, name: str, future: Future):
+        with self._lock:
+            self._pending.pop(name, None)
+        if future.exception() is not None:
+            logger.error("Не удалось построить миниатюру %s: %s", name, future.exception())
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+media_store = MediaStore(
+    root=settings.MEDIA_ROOT,
+    thumbnail_size=settings.MEDIA_THUMBNAIL_SIZE,
+    max_bytes=settings.MEDIA_MAX_BYTES,
+    workers=settings.MEDIA_WORKERS
+)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.media import photo_url, thumbnail_url
+from app.core.menu_search import MenuSearchIndex
+from app.db_models import Menu, Category
+from app.schemas.menu_schemas import MenuResponse, CategoryResponse
+
+
+class MenuCatalog:
+    """Снимок меню и категорий, из которого обслуживаются запросы на чтение"""
+
+    def __init__(self, items: List[MenuResponse], categories: List[CategoryResponse]):
+        self.items = items
+        self.items_by_id: Dict[int, MenuResponse] = {item.id: item for item in items}
+        self.categories = categories
+        self.categories_by_id: Dict[int, CategoryResponse] = {c.id: c for c in categories}
+        self.etag = self._make_etag()
+        self.loaded_at = time.monotonic()
+
+    def _make_etag(self) -> str:
+        # ETag считается от содержимого, поэтому совпадает у всех воркеров
+        payload = json.dumps(
+            [[item.model_dump() for item in self.items], [c.model_dump() for c in self.categories]],
+            sort_keys=True,
+            default=str
+        )
+        return '"' + hashlib.sha1(payload.encode()).hexdigest() + '"'
+
+
+class MenuCache:
+    """
+    Кеш каталога меню в памяти процесса.
+    Заполняется при первом обращении, сбрасывается эндпоинтами, изменяющими
+    меню и категории. TTL ограничивает рассинхронизацию между воркерами.
+    Поисковый индекс живет дольше снимков: при загрузке нового снимка в нем
+    обновляются только изменившиеся блюда.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.search_index = MenuSearchIndex()
+        self._catalog: Optional[MenuCatalog] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> MenuCatalog:
+        catalog = self._catalog
+        if catalog is not None and time.monotonic() - catalog.loaded_at < self.ttl_seconds:
+            return catalog
+
+        with self._lock:
+            catalog = self._catalog
+            if catalog is not None and time.monotonic() - catalog.loaded_at < self.ttl_seconds:
+                return catalog
+            version = self._version
+
+        catalog = self._load(db)
+
+        with self._lock:
+            # Если во время загрузки кеш сбросили, снимок мог устареть - не сохраняем его
+            if self._version == version:
+                self._catalog = catalog
+                self.search_index.sync(catalog.items)
+        return catalog
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._catalog = None
+
+    @staticmethod
+    def _load(db: Session) -> MenuCatalog:
+        menu_items = db.query(Menu)\
+            .options(joinedload(Menu.category_of_item))\
+            .order_by(Menu.name)\
+            .all()
+        items = [
+            MenuResponse(
+                id=item.id,
+                name=item.name,
+                description=item.description,
+                photo=photo_url(item.photo),
+                price=item.price,
+                category=item.category,
+                category_name=item.category_of_item.name if item.category_of_item else None,
+                is_available=item.is_available,
+                thumbnail=thumbnail_url(item.photo)
+            )
+            for item in menu_items
+        ]
+        categories = [
+            CategoryResponse(id=category.id, name=category.name)
+            for category in db.query(Category).order_by(Category.name).all()
+        ]
+        return MenuCatalog(items, categories)
+
+
+menu_cache = MenuCache(ttl_seconds=settings.MENU_CACHE_TTL_SECONDS)
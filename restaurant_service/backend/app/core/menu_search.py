@@ -0,0 +1,175 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.schemas.menu_schemas import MenuResponse
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Похожесть слов по триграммам (Жаккар), ниже которой слово не считается совпадением
+MIN_TOKEN_SIMILARITY = 0.3
+# Совпадение по началу слова: не ниже этой похожести
+PREFIX_SIMILARITY = 0.8
+# Вес совпадения в описании относительно совпадения в названии
+DESCRIPTION_WEIGHT = 0.4
+# Минимальная средняя по словам запроса оценка блюда
+MIN_SCORE = 0.3
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return _NON_WORD.sub(" ", text.lower().replace("ё", "е")).split()
+
+
+def trigrams(token: str) -> Set[str]:
+    """Триграммы слова с отступами, как в pg_trgm: начало слова дает отдельные триграммы"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Document:
+    __slots__ = ("name", "description", "name_tokens", "description_tokens")
+
+    def __init__(self, name: str, description: Optional[str]):
+        self.name = name
+        self.description = description
+        self.name_tokens = set(tokenize(name))
+        self.description_tokens = set(tokenize(description)) - self.name_tokens
+
+
+class MenuSearchIndex:
+    """
+    Инвертированный индекс меню в памяти.
+    Слова названий и описаний ведут к блюдам; триграммы ведут к словам
+    словаря (он намного меньше меню), что дает устойчивость к опечаткам, а
+    отсортированный словарь - поиск по началу слова. Индекс обновляется по
+    одной позиции: sync переиндексирует только блюда, у которых изменились
+    название или описание.
+    """
+
+    def __init__(self):
+        self._documents: Dict[int, _Document] = {}
+        self._name_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._description_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._gram_tokens: Dict[str, Set[str]] = defaultdict(set)
+        self._token_grams: Dict[str, Set[str]] = {}
+        self._sorted_tokens: List[str] = []
+        self._tokens_dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def sync(self, items: Iterable[MenuResponse]) -> int:
+        """Привести индекс к списку блюд; возвращает число переиндексированных позиций"""
+        changed = 0
+        with self._lock:
+            seen = set()
+            for item in items:
+                seen.add(item.id)
+                document = self._documents.get(item.id)
+                if document is not None and document.name == item.name and document.description == item.description:
+                    continue
+                self._remove(item.id)
+                self._add(item.id, item.name, item.description)
+                changed += 1
+            for item_id in [item_id for item_id in self._documents if item_id not in seen]:
+                self._remove(item_id)
+                changed += 1
+        return changed
+
+    def _add(self, item_id: int, name: str, description: Optional[str]):
+        document = _Document(name, description)
+        self._documents[item_id] = document
+        for postings, tokens in ((self._name_postings, document.name_tokens),
+                                 (self._description_postings, document.description_tokens)):
+            for token in tokens:
+                postings[token].add(item_id)
+                if token not in self._token_grams:
+                    grams = trigrams(token)
+                    self._token_grams[token] = grams
+                    for gram in grams:
+                        self._gram_tokens[gram].add(token)
+                    self._tokens_dirty = True
+
+    def _remove(self, item_id: int):
+        document = self._documents.pop(item_id, None)
+        if document is None:
+            return
+        for postings, tokens in ((self._name_postings, document.name_tokens),
+                                 (self._description_postings, document.description_tokens)):
+            for token in tokens:
+                postings[token].discard(item_id)
+                if not postings[token]:
+                    del postings[token]
+        for token in document.name_tokens | document.description_tokens:
+            if token in self._name_postings or token in self._description_postings:
+                continue
+            for gram in self._token_grams.pop(token):
+                self._gram_tokens[gram].discard(token)
+                if not self._gram_tokens[gram]:
+                    del self._gram_tokens[gram]
+            self._tokens_dirty = True
+
+    def _similar_tokens(self, query_token: str) -> Dict[str, float]:
+        """Слова словаря, похожие на слово запроса, с похожестью 0..1"""
+        grams = trigrams(query_token)
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for token in self._gram_tokens.get(gram, ()):
+                shared[token] += 1
+
+        similar = {}
+        for token, count in shared.items():
+            similarity = count / (len(grams) + len(self._token_grams[token]) - count)
+            if similarity >= MIN_TOKEN_SIMILARITY:
+                similar[token] = similarity
+
+        if self._tokens_dirty:
+            self._sorted_tokens = sorted(self._token_grams)
+            self._tokens_dirty = False
+        position = bisect_left(self._sorted_tokens, query_token)
+        while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(query_token):
+            token = self._sorted_tokens[position]
+            similar[token] = max(similar.get(token, 0), PREFIX_SIMILARITY, len(query_token) / len(token))
+            position += 1
+        return similar
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """Пары (id блюда, оценка 0..1), лучшие первыми"""
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            for query_token in query_tokens:
+                # Оценки по возрастанию: dict.update оставляет для блюда лучшее совпадение
+                matches = []
+                for token, similarity in self._similar_tokens(query_token).items():
+                    if token in self._name_postings:
+                        matches.append((similarity, self._name_postings[token]))
+                    if token in self._description_postings:
+                        matches.append((similarity * DESCRIPTION_WEIGHT, self._description_postings[token]))
+                matches.sort(key=itemgetter(0))
+                best: Dict[int, float] = {}
+                for similarity, postings in matches:
+                    best.update(dict.fromkeys(postings, similarity))
+
+                if scores is None:
+                    scores = best
+                else:
+                    for item_id, similarity in best.items():
+                        scores[item_id] = scores.get(item_id, 0) + similarity
+
+            threshold = MIN_SCORE * len(query_tokens)
+            top = heapq.nlargest(limit, (pair for pair in scores.items() if pair[1] >= threshold), key=itemgetter(1))
+            names = {item_id: self._documents[item_id].name for item_id, _ in top}
+
+        top.sort(key=lambda pair: (-pair[1], names[pair[0]]))
+        return [(item_id, round(score / len(query_tokens), 4)) for item_id, score in top]
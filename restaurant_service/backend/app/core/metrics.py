@@ -0,0 +1,125 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.db_metrics import Histogram, route_db_metrics
+
+# Метрики процесса в текстовом формате Prometheus, без внешних агентов и библиотек.
+# Каждый воркер отдает свои значения; Prometheus собирает их по отдельности.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class MetricsWriter:
+    """Сборка текста в формате exposition: HELP/TYPE и строки значений"""
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, object]] = None):
+        self._lines.append(f"{name}{_labels(labels or {})} {_number(value)}")
+
+    def histogram(self, name: str, histogram: Histogram, labels: Dict[str, object]):
+        for bound, total in histogram.cumulative():
+            self.sample(f"{name}_bucket", total, {**labels, "le": _number(float(bound))})
+        self.sample(f"{name}_sum", histogram.sum, labels)
+        self.sample(f"{name}_count", histogram.count, labels)
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+class RequestMetrics:
+    """Длительность и число HTTP-запросов по маршрутам, запросы в обработке"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status_code: int, seconds: float):
+        with self._lock:
+            self.in_flight -= 1
+            histogram = self._latency.get((method, route))
+            if histogram is None:
+                histogram = self._latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            key = (method, route, status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def write(self, writer: MetricsWriter):
+        with self._lock:
+            in_flight = self.in_flight
+            latency = list(self._latency.items())
+            responses = list(self._responses.items())
+
+        writer.family("http_requests_in_flight", "gauge", "HTTP-запросы в обработке")
+        writer.sample("http_requests_in_flight", in_flight)
+
+        writer.family("http_requests_total", "counter", "Обработанные HTTP-запросы")
+        for (method, route, status_code), count in responses:
+            writer.sample("http_requests_total", count, {"method": method, "route": route, "status": status_code})
+
+        writer.family("http_request_duration_seconds", "histogram", "Длительность HTTP-запросов")
+        for (method, route), histogram in latency:
+            writer.histogram("http_request_duration_seconds", histogram, {"method": method, "route": route})
+
+    def clear(self):
+        with self._lock:
+            self._latency.clear()
+            self._responses.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+def write_db_query_metrics(writer: MetricsWriter):
+    """Гистограммы числа SQL-запросов и времени в БД по маршрутам (см. db_metrics)"""
+    routes = route_db_metrics.items()
+    writer.family("http_request_db_queries", "histogram", "SQL-запросы на один HTTP-запрос")
+    for (method, route), (queries, _) in routes:
+        writer.histogram("http_request_db_queries", queries, {"method": method, "route": route})
+    writer.family("http_request_db_seconds", "histogram", "Время в БД на один HTTP-запрос")
+    for (method, route), (_, seconds) in routes:
+        writer.histogram("http_request_db_seconds", seconds, {"method": method, "route": route})
+
+
+def write_pool_metrics(writer: MetricsWriter, pools: Iterable[Tuple[str, object]]):
+    """Состояние пулов соединений; пулы без счетчиков (StaticPool, NullPool) пропускаются"""
+    gauges = (
+        ("db_pool_size", "size", "Размер пула соединений"),
+        ("db_pool_checked_out", "checkedout", "Соединения, выданные из пула"),
+        ("db_pool_checked_in", "checkedin", "Свободные соединения в пуле"),
+        ("db_pool_overflow", "overflow", "Соединения сверх pool_size"),
+    )
+    pools = [(name, pool) for name, pool in pools if hasattr(pool, "checkedout")]
+    for metric, method, help_text in gauges:
+        writer.family(metric, "gauge", help_text)
+        for name, pool in pools:
+            writer.sample(metric, getattr(pool, method)(), {"engine": name})
@@ -0,0 +1,38 @@
+import dataclasses
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # без orjson сериализует стандартный json, медленнее
+    orjson = None
+
+
+def _default(value: Any):
+    """Типы, которые сериализатор не знает сам"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ для горячих эндпоинтов чтения. Принимает записи-датаклассы
+    со __slots__ как есть и сериализует их orjson без валидации через
+    pydantic: response_model у эндпоинта остается только для документации.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db_models import Menu, Order, PlateForOrder, OrderHourlyRollup, DishHourlyRollup
+
+# Почасовые агрегаты продаж. Обновляются инкрементально в транзакции,
+# закрывающей заказ, поэтому отчеты читают небольшие таблицы агрегатов,
+# а не все заказы.
+#
+# Категория продажи берется из строки заказа (plates_for_order.category,
+# записывается при добавлении блюда), а не из текущего меню: перенос блюда
+# в другую категорию не меняет уже проданное. Почасовая строка блюда хранит
+# категорию первой продажи за этот час - одинаково при пошаговом учете и
+# при полном пересчете.
+
+# Строки, заполненные до появления колонки, берут категорию из меню
+_sold_category = func.coalesce(PlateForOrder.category, Menu.category)
+
+def hour_of(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def _upsert_add(db: Session, model, key_columns: List[str], rows: List[Dict], add_columns: List[str],
+                insert_only_columns: List[str] = ()):
+    """
+    Многострочный upsert: новые ключи вставляются, у существующих значения
+    add_columns увеличиваются на переданные. insert_only_columns задаются
+    только при вставке строки, остальные колонки перезаписываются.
+    """
+    if not rows:
+        return
+
+    kept = set(key_columns) | set(insert_only_columns)
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = dialect_insert(model).values(rows)
+        set_ = {
+            column: (getattr(model, column) + statement.excluded[column]
+                     if column in add_columns else statement.excluded[column])
+            for column in rows[0] if column not in kept
+        }
+        db.execute(statement.on_conflict_do_update(index_elements=key_columns, set_=set_))
+        return
+
+    # Прочие СУБД: UPDATE, а если строки нет - INSERT
+    for row in rows:
+        key = [getattr(model, column) == row[column] for column in key_columns]
+        values = {
+            column: (getattr(model, column) + row[column] if column in add_columns else row[column])
+            for column in row if column not in kept
+        }
+        if db.execute(update(model).where(*key).values(**values)).rowcount == 0:
+            db.execute(insert(model).values(**row))
+
+def apply_order_to_rollups(db: Session, order: Order, sign: int = 1):
+    """
+    Учесть закрытый заказ в агрегатах (sign=1) или убрать его оттуда (sign=-1).
+    Вызывается в той же транзакции, что и смена статуса заказа.
+    """
+    hour = hour_of(order.endtime or order.timestart)
+
+    plates = db.query(PlateForOrder.plate_id, _sold_category, PlateForOrder.price, PlateForOrder.count)\
+        .outerjoin(Menu, Menu.id == PlateForOrder.plate_id)\
+        .filter(PlateForOrder.order_id == order.id)\
+        .order_by(PlateForOrder.id)\
+        .all()
+
+    dishes = {}
+    for plate_id, category, price, count in plates:
+        revenue = Decimal(str(price)) * count
+        row = dishes.setdefault(plate_id, {
+            "hour": hour, "plate_id": plate_id, "category": category, "quantity": 0, "revenue": Decimal(0)
+        })
+        row["quantity"] += sign * count
+        row["revenue"] += sign * revenue
+
+    order_revenue = sum((row["revenue"] for row in dishes.values()), Decimal(0))
+
+    _upsert_add(
+        db, OrderHourlyRollup, ["hour", "waiter"],
+        [{"hour": hour, "waiter": order.waiter, "orders": sign, "revenue": order_revenue}],
+        ["orders", "revenue"]
+    )
+    # Категория строки - категория первой учтенной продажи блюда за час
+    _upsert_add(
+        db, DishHourlyRollup, ["hour", "plate_id"], list(dishes.values()), ["quantity", "revenue"],
+        insert_only_columns=["category"]
+    )
+
+    if sign < 0:
+        # Строки, обнулившиеся после вычитания, удаляем, чтобы в отчетах не было пустых периодов
+        db.execute(delete(OrderHourlyRollup).where(OrderHourlyRollup.hour == hour, OrderHourlyRollup.orders == 0))
+        db.execute(delete(DishHourlyRollup).where(DishHourlyRollup.hour == hour, DishHourlyRollup.quantity == 0))
+
+def rebuild_rollups(db: Session, batch_size: int = 1000) -> int:
+    """
+    Полный пересчет агрегатов по всем закрытым заказам.
+    Заказы читаются потоково (yield_per), в памяти держатся только агрегаты.
+    Порядок чтения - по времени закрытия, чтобы категория часа бралась
+    у первой продажи, как и при пошаговом учете. Возвращает число учтенных заказов.
+    """
+    order_totals = defaultdict(lambda: [0, Decimal(0)])
+    dish_totals = {}
+    counted_orders = set()
+
+    rows = db.query(
+        Order.id, Order.waiter, Order.timestart, Order.endtime,
+        PlateForOrder.plate_id, _sold_category, PlateForOrder.price, PlateForOrder.count
+    ).outerjoin(PlateForOrder, PlateForOrder.order_id == Order.id)\
+        .outerjoin(Menu, Menu.id == PlateForOrder.plate_id)\
+        .filter(Order.status == "completed")\
+        .order_by(func.coalesce(Order.endtime, Order.timestart), Order.id, PlateForOrder.id)\
+        .yield_per(batch_size)
+
+    for order_id, waiter, timestart, endtime, plate_id, category, price, count in rows:
+        hour = hour_of(endtime or timestart)
+        totals = order_totals[(hour, waiter)]
+        if order_id not in counted_orders:
+            counted_orders.add(order_id)
+            totals[0] += 1
+        if plate_id is None:
+            continue
+
+        revenue = Decimal(str(price)) * count
+        totals[1] += revenue
+        dish = dish_totals.setdefault((hour, plate_id), {
+            "hour": hour, "plate_id": plate_id, "category": category, "quantity": 0, "revenue": Decimal(0)
+        })
+        dish["quantity"] += count
+        dish["revenue"] += revenue
+
+    db.execute(delete(OrderHourlyRollup))
+    db.execute(delete(DishHourlyRollup))
+    if order_totals:
+        db.execute(insert(OrderHourlyRollup), [
+            {"hour": hour, "waiter": waiter, "orders": orders, "revenue": revenue}
+            for (hour, waiter), (orders, revenue) in order_totals.items()
+        ])
+    if dish_totals:
+        db.execute(insert(DishHourlyRollup), list(dish_totals.values()))
+    db.commit()
+
+    return len(counted_orders)
@@ -1,26 +1,65 @@
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.hashing import password_hasher
 from app.database import get_db
 from app.db_models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Кеш данных пользователя по id (без хеша пароля). Кеш свой у каждого воркера,
+# поэтому роль и is_available из него не берутся: они читаются из БД на каждом
+# запросе, и блокировка или смена роли действует сразу во всех воркерах.
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+_CACHED_USER_FIELDS = ("id", "name", "login", "role", "is_available")
+
+def invalidate_user_cache(user_id: int):
+    """Сбросить закешированные данные пользователя"""
+    user_cache.delete(user_id)
+
+def _load_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    Пользователь для текущего запроса: из кеша или из БД.
+    При попадании в кеш из БД читаются только роль и is_available (поиск по
+    первичному ключу), остальные поля берутся из кеша. Из кеша возвращается
+    новый несвязанный с сессией объект User; для изменения пользователя его
+    нужно загрузить из БД заново.
+    """
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        access = db.execute(select(User.role, User.is_available).where(User.id == user_id)).first()
+        if access is None:
+            user_cache.delete(user_id)
+            return None
+        return User(**dict(cached, role=access.role, is_available=access.is_available))
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        user_cache.set(user_id, {field: getattr(user, field) for field in _CACHED_USER_FIELDS})
+    return user
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверка пароля"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Проверка пароля (в пуле процессов хеширования)"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Хеширование пароля"""
-    return pwd_context.hash(password)
+    """Хеширование пароля (в пуле процессов хеширования)"""
+    return password_hasher.hash(password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Нужно ли перехешировать пароль после смены PASSWORD_HASH_ROUNDS"""
+    return password_hasher.needs_rehash(hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создание JWT токена"""
@@ -54,7 +93,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = _load_user(db, int(user_id))
     if user is None:
         raise credentials_exception
 
@@ -1,9 +1,15 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.concurrency import run_in_threadpool
+from typing import Union
 import os
 from dotenv import load_dotenv
 
+from app.core.config import settings
+
 load_dotenv()
 
 DATABASE_URL = os.getenv(
@@ -11,17 +17,24 @@ DATABASE_URL = os.getenv(
     ""
 )
 
-print(f"Подключаемся к базе данных: {DATABASE_URL.split('@')[-1]}")
-
 # движок SQLAlchemy
 engine = create_engine(
     DATABASE_URL,
-    pool_size=20,
-    max_overflow=10,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
     echo=False
 )
 
+# движок для проверок готовности: без пула, чтобы исчерпанный основной пул
+# не мешал проверить саму БД
+probe_engine = create_engine(
+    DATABASE_URL,
+    poolclass=NullPool,
+    connect_args={"connect_timeout": settings.HEALTH_CONNECT_TIMEOUT_SECONDS}
+    if DATABASE_URL.startswith("postgres") else {}
+)
+
 # фабрика сессий
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -46,6 +59,72 @@ def get_db():
     finally:
         db.close()
 
+def _async_database_url() -> str:
+    """URL для асинхронного движка: явный ASYNC_DATABASE_URL или DATABASE_URL с драйвером asyncpg"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if DATABASE_URL.startswith(prefix):
+            return "postgresql+asyncpg://" + DATABASE_URL[len(prefix):]
+    return DATABASE_URL
+
+# тип сессии, которую отдает get_session
+DbSession = Union[Session, AsyncSession]
+
+# асинхронный движок создается только в асинхронном режиме
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        _async_database_url(),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=False
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+async def get_session():
+    """
+    Сессия для асинхронных эндпоинтов.
+    В режиме DATABASE_ASYNC отдает AsyncSession, иначе - обычную Session.
+    Использование вместе с run_db:
+        db = Depends(get_session)
+        result = await run_db(db, sync_function, *args)
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            try:
+                yield session
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise e
+        return
+
+    db = SessionLocal()
+    try:
+        yield db
+    except SQLAlchemyError as e:
+        await run_in_threadpool(db.rollback)
+        raise e
+    finally:
+        await run_in_threadpool(db.close)
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Выполнить синхронную функцию fn(session, *args, **kwargs) с ORM-кодом.
+    Для AsyncSession функция выполняется в event loop через run_sync (asyncpg,
+    без пула потоков), для обычной Session - в пуле потоков.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
 def test_connection():
     """Тестирует подключение к базе данных"""
     try:
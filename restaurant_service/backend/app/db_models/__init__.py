@@ -5,8 +5,9 @@ from .menu import Menu
 from .order import Order, OrderStatus
 from .table_for_order import TableForOrder
 from .plates_for_order import PlateForOrder, CookingStatus
-from .cooking_history import CookingStatusHistory
+from .cooking_history import CookingStatusHistory, CookingStatusHistoryArchive
 from .category import Category
+from .sales_rollup import OrderHourlyRollup, DishHourlyRollup
 
 __all__ = [
     'Base',
@@ -22,5 +23,8 @@ __all__ = [
     'PlateForOrder',
     'CookingStatus',
     'CookingStatusHistory',
-    'Category'
+    'CookingStatusHistoryArchive',
+    'Category',
+    'OrderHourlyRollup',
+    'DishHourlyRollup'
 ]
\ No newline at end of file
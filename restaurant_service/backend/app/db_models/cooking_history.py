@@ -1,10 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, VARCHAR
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, VARCHAR, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from datetime import datetime
 
 class CookingStatusHistory(BaseModel):
     __tablename__ = "cooking_status_history"
+    __table_args__ = (
+        # Индексы под фильтры и сортировку эндпоинтов истории
+        Index("ix_cooking_status_history_change_time", "change_time"),
+        Index("ix_cooking_status_history_order_time", "order_id", "change_time"),
+        Index("ix_cooking_status_history_plate_time", "plate_id", "change_time"),
+        Index("ix_cooking_status_history_user_time", "change_by", "change_time"),
+    )
 
     # Основные поля
     id = Column(Integer, primary_key=True)
@@ -31,3 +38,22 @@ class CookingStatusHistory(BaseModel):
         "Menu",
         back_populates="plate_statuses"
     )
+
+class CookingStatusHistoryArchive(BaseModel):
+    """
+    Архив истории статусов. Записи старше срока хранения переносятся сюда
+    из cooking_status_history, чтобы основная таблица оставалась небольшой.
+    Внешних ключей нет: архив переживает удаление заказов и блюд.
+    """
+    __tablename__ = "cooking_status_history_archive"
+    __table_args__ = (
+        Index("ix_cooking_status_history_archive_change_time", "change_time"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    change_time = Column(DateTime, nullable=False)
+    new_status = Column(VARCHAR(100), nullable=False)
+    order_id = Column(Integer)
+    plate_id = Column(Integer, nullable=False)
+    change_by = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, String, DateTime, Integer, ForeignKey, Enum
+from sqlalchemy import Column, Float, String, DateTime, Integer, ForeignKey, Enum, Index, NUMERIC
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -11,6 +11,10 @@ class OrderStatus(enum.Enum):
 
 class Order(BaseModel):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Индекс под keyset-пагинацию по (timestart, id)
+        Index("ix_orders_timestart_id", "timestart", "id"),
+    )
 
     # Основные поля
     id = Column(Integer, primary_key=True)
@@ -18,6 +22,11 @@ class Order(BaseModel):
     timestart = Column(DateTime, nullable=False)
     endtime = Column(DateTime, nullable=True)
 
+    # Денормализованные счетчики, поддерживаются эндпоинтами изменения блюд
+    total = Column(NUMERIC, nullable=False, default=0, server_default="0")
+    plate_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_plate_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Внешние ключи
     waiter = Column(Integer, ForeignKey("users.id"), nullable=False)
 
@@ -22,6 +22,8 @@ class PlateForOrder(BaseModel):
     # Внешние ключи
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     plate_id = Column(Integer, ForeignKey("menu.id"), nullable=False)
+    # Категория блюда на момент продажи: по ней считаются отчеты по категориям
+    category = Column(Integer, ForeignKey("category.id"), nullable=True)
 
     # Связи
     order = relationship(
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, NUMERIC
+from .base import BaseModel
+
+class OrderHourlyRollup(BaseModel):
+    """Почасовая выручка и число закрытых заказов по официантам"""
+    __tablename__ = "order_hourly_rollup"
+
+    hour = Column(DateTime, primary_key=True)
+    waiter = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(NUMERIC, nullable=False, default=0)
+
+class DishHourlyRollup(BaseModel):
+    """Почасовые продажи по блюдам (категория - первой продажи блюда за этот час)"""
+    __tablename__ = "dish_hourly_rollup"
+
+    hour = Column(DateTime, primary_key=True)
+    plate_id = Column(Integer, primary_key=True)
+    category = Column(Integer, nullable=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(NUMERIC, nullable=False, default=0)
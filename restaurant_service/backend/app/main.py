@@ -1,18 +1,44 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.db_metrics import finish_request_stats, instrument_engine, route_db_metrics, start_request_stats
+from app.core.hashing import password_hasher
+from app.core.history_buffer import history_buffer
+from app.core.media import media_store
+from app.core.metrics import request_metrics
 
-from app.api import users, tables, menu, orders, health, status_history, table_for_order, auth
+from app.api import users, tables, menu, orders, health, status_history, table_for_order, auth, events, hall, reports, exports, metrics, media
 
-from app.database import engine
-from app.db_models import Base
+from app.database import engine, async_engine
 
-Base.metadata.create_all(bind=engine)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Схема создается командой python -m app.bootstrap; при старте воркера
+    # к БД не обращаемся, кроме режима AUTO_CREATE_SCHEMA для локальной разработки
+    if settings.AUTO_CREATE_SCHEMA:
+        from app.bootstrap import create_schema
+        await run_in_threadpool(create_schema)
+        health.health_checker.clear()
+    if settings.HISTORY_WRITE_BEHIND:
+        await run_in_threadpool(history_buffer.start)
+    yield
+    # Остаток очереди истории дописывается до остановки воркера
+    await run_in_threadpool(history_buffer.stop)
+    password_hasher.shutdown()
+    media_store.shutdown()
 
 app = FastAPI(
     title="Restaurant Service API",
     description="API для управления рестораном",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -25,8 +51,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Disposition", "Server-Timing", "X-DB-Query-Count"],
 )
 
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    """
+    Метрики HTTP-запроса: длительность и число запросов по маршрутам, запросы
+    в обработке, число SQL-запросов и время в БД. В режиме DEBUG - заголовки
+    Server-Timing и X-DB-Query-Count. Для потоковых ответов учитывается время
+    до начала отправки тела.
+    """
+    stats, token = start_request_stats(request.scope)
+    request_metrics.started()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        finish_request_stats(token)
+        request_metrics.finished(request.method, stats.route, status_code, time.perf_counter() - started)
+
+    route_db_metrics.observe(request.method, stats.route, stats)
+    if settings.DEBUG:
+        response.headers["Server-Timing"] = stats.server_timing()
+        response.headers["X-DB-Query-Count"] = str(stats.queries)
+    return response
+
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(tables.router, prefix="/api")
@@ -35,6 +87,12 @@ app.include_router(orders.router, prefix="/api")
 app.include_router(health.router, prefix="/api")
 app.include_router(status_history.router, prefix="/api")
 app.include_router(table_for_order.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(hall.router, prefix="/api")
+app.include_router(reports.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(media.router, prefix="/api")
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
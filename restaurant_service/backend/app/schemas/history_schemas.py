@@ -1,6 +1,7 @@
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 class CookingStatusHistoryCreate(BaseModel):
     new_status: str
@@ -26,4 +27,45 @@ class CookingStatusHistoryResponse(BaseModel):
     order_number: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+@dataclass(slots=True)
+class CookingStatusHistoryRecord:
+    """Запись истории для быстрого пути чтения, поля как у CookingStatusHistoryResponse"""
+    id: int
+    change_time: datetime
+    new_status: str
+    order_id: Optional[int]
+    plate_id: int
+    change_by: Optional[int]
+    plate_name: Optional[str]
+    user_name: Optional[str]
+    order_number: Optional[str]
+
+class CookingStatusHistoryArchiveResult(BaseModel):
+    archived: int
+    before: datetime
+
+class KitchenStageStats(BaseModel):
+    stage: str
+    count: int
+    avg_seconds: float
+    p50_seconds: float
+    p90_seconds: float
+    p99_seconds: float
+
+class KitchenDishStats(BaseModel):
+    plate_id: int
+    plate_name: Optional[str] = None
+    stages: List[KitchenStageStats]
+
+class KitchenCookStats(BaseModel):
+    cook_id: int
+    cook_name: Optional[str] = None
+    stages: List[KitchenStageStats]
+
+class KitchenStats(BaseModel):
+    day: date
+    stages: List[KitchenStageStats]
+    dishes: List[KitchenDishStats]
+    cooks: List[KitchenCookStats]
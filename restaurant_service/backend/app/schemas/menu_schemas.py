@@ -27,10 +27,14 @@ class MenuResponse(BaseModel):
     category: Optional[int]
     category_name: Optional[str] = None
     is_available: bool
+    thumbnail: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class MenuSearchResult(MenuResponse):
+    score: float
+
 # Схемы для категорий
 class CategoryCreate(BaseModel):
     name: str
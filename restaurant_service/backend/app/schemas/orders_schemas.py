@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -37,11 +38,43 @@ class OrderResponse(BaseModel):
     endtime: Optional[datetime]
     waiter_name: Optional[str] = None
     table_numbers: List[int] = []
+    total: float = 0
+    plate_count: int = 0
+    pending_plate_count: int = 0
     plates: List[PlateInOrderResponse] = []
 
     class Config:
         from_attributes = True
 
+# Записи для быстрого пути чтения: строятся прямо из строк SQL и отдаются
+# FastJSONResponse без pydantic. Поля и их порядок совпадают с *Response.
+@dataclass(slots=True)
+class PlateInOrderRecord:
+    id: int
+    plate_id: int
+    count: int
+    comment: Optional[str]
+    cooking_status: str
+    price: float
+    plate_name: Optional[str]
+
+@dataclass(slots=True)
+class OrderSummaryRecord:
+    id: int
+    waiter: int
+    status: str
+    timestart: datetime
+    endtime: Optional[datetime]
+    waiter_name: Optional[str]
+    table_numbers: List[int]
+    total: float
+    plate_count: int
+    pending_plate_count: int
+
+@dataclass(slots=True)
+class OrderRecord(OrderSummaryRecord):
+    plates: List[PlateInOrderRecord]
+
 class PlateInOrderCreate(BaseModel):
     plate_id: int
     count: int = 1
@@ -54,3 +87,31 @@ class PlateInOrderUpdate(BaseModel):
     comment: Optional[str] = None
     cooking_status: Optional[str] = None
     price: Optional[float] = None
+
+class OrderCountersMismatch(BaseModel):
+    order_id: int
+    total: float
+    plate_count: int
+    pending_plate_count: int
+    expected_total: float
+    expected_plate_count: int
+    expected_pending_plate_count: int
+
+class OrderCountersRebuildResult(BaseModel):
+    updated: int
+
+class PlateStatusBulkUpdate(BaseModel):
+    plate_ids: List[int]
+    status: str
+
+class PlateStatusResult(BaseModel):
+    id: int
+    order_id: Optional[int] = None
+    previous_status: Optional[str] = None
+    # updated - статус изменен, unchanged - уже был таким, not_found - блюда нет
+    result: str
+
+class PlateStatusBulkResult(BaseModel):
+    status: str
+    updated: int
+    results: List[PlateStatusResult]
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class RevenuePoint(BaseModel):
+    period: datetime
+    orders: int
+    revenue: float
+
+class WaiterRevenue(BaseModel):
+    waiter: int
+    waiter_name: Optional[str] = None
+    orders: int
+    revenue: float
+
+class CategoryRevenue(BaseModel):
+    category: Optional[int]
+    category_name: Optional[str] = None
+    quantity: int
+    revenue: float
+
+class DishRevenue(BaseModel):
+    plate_id: int
+    plate_name: Optional[str] = None
+    quantity: int
+    revenue: float
+
+class RollupRebuildResult(BaseModel):
+    orders: int
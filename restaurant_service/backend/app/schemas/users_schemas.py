@@ -13,6 +13,7 @@ class UserUpdate(BaseModel):
     login: Optional[str] = None
     password: Optional[str] = None
     role: Optional[str] = None
+    is_available: Optional[bool] = None
 
 class UserResponse(BaseModel):
     id: int
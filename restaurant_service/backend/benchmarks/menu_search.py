@@ -0,0 +1,96 @@
+"""
+Поиск по меню: индекс в памяти (MenuSearchIndex) против ILIKE '%q%' в БД.
+
+    python -m benchmarks.menu_search [--items 5000] [--runs 200] [--database-url URL]
+
+Без --database-url используется временная SQLite-база. На SQLite ILIKE
+выполняется как lower(...) LIKE lower(...), а lower() не меняет регистр
+кириллицы, поэтому запросы со словами из начала названия там ничего не находят;
+на PostgreSQL - настоящий ILIKE. Опечатки ("борш") ILIKE не находит нигде.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DISHES = ["борщ", "солянка", "цезарь", "плов", "пельмени", "вареники", "стейк", "паста", "ризотто", "блины",
+          "сырники", "окрошка", "харчо", "шашлык", "котлета", "гуляш", "лагман", "рамен", "том ям", "тартар"]
+ADJECTIVES = ["домашний", "острый", "сливочный", "постный", "фирменный", "летний", "грузинский", "итальянский",
+              "копченый", "жареный", "запеченный", "мраморный", "классический", "деревенский"]
+INGREDIENTS = ["говядина", "курица", "свинина", "лосось", "креветки", "грибы", "сметана", "сыр", "томаты",
+               "картофель", "капуста", "свекла", "зелень", "чеснок", "лук", "перец", "пармезан", "рукола"]
+QUERIES = ["борщ", "борш", "цезар", "сливочн", "креветки", "пельмени домашние", "рамен", "грузинск", "сыр"]
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/menu_search.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    sys.path.insert(0, BACKEND_DIR)
+
+    from sqlalchemy import create_engine, or_
+    from sqlalchemy.orm import sessionmaker
+    from app.core.menu_cache import MenuCache
+    from app.db_models import Base, Category, Menu
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    random.seed(1)
+    category = Category(name="Бенчмарк")
+    db.add(category)
+    db.flush()
+    db.add_all([
+        Menu(
+            name=f"{random.choice(DISHES).capitalize()} {random.choice(ADJECTIVES)} №{number}",
+            description=", ".join(random.sample(INGREDIENTS, 4)),
+            price=random.randint(100, 1500),
+            category=category.id,
+            is_available=True
+        )
+        for number in range(args.items)
+    ])
+    db.commit()
+
+    cache = MenuCache(ttl_seconds=3600)
+    started = time.perf_counter()
+    cache.get(db)
+    print(f"items={args.items} catalog load + index build: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    print(f"{'query':<20} {'index, us':>10} {'found':>6} {'ILIKE, us':>10} {'found':>6}")
+    for query in QUERIES:
+        index_time = timed(lambda: cache.search_index.search(query, 20), args.runs)
+        found = len(cache.search_index.search(query, 20))
+
+        pattern = f"%{query}%"
+        ilike = lambda: db.query(Menu.id)\
+            .filter(or_(Menu.name.ilike(pattern), Menu.description.ilike(pattern)))\
+            .limit(20).all()
+        ilike_time = timed(ilike, max(args.runs // 10, 5))
+        ilike_found = len(ilike())
+
+        print(f"{query:<20} {index_time * 1e6:>10.0f} {found:>6} {ilike_time * 1e6:>10.0f} {ilike_found:>6}")
+
+
+if __name__ == "__main__":
+    main()
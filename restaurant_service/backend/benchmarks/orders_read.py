@@ -0,0 +1,128 @@
+"""
+Чтение страницы заказов: прежний путь (ORM с жадной загрузкой, OrderResponse
+и валидация по response_model) против записей со __slots__ и FastJSONResponse.
+
+    python -m benchmarks.orders_read [--orders 500] [--plates 4] [--runs 50] [--database-url URL]
+
+Оба варианта вызываются через TestClient как полноценный HTTP-запрос, поэтому
+в замер входит все, что делает FastAPI вокруг обработчика. Без --database-url
+используется временная SQLite-база.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(fn, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--plates", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/orders_read.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    sys.path.insert(0, BACKEND_DIR)
+
+    from datetime import datetime, timedelta
+    from typing import List
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session, joinedload, selectinload, sessionmaker
+    from app.api import orders
+    from app.database import get_session
+    from app.db_models import Base, Category, Menu, Order, PlateForOrder, Table, TableForOrder, User
+    from app.schemas.orders_schemas import OrderResponse, PlateInOrderResponse
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    waiter = User(name="Бенчмарк", login="benchmark", password="x", role="waiter", is_available=True)
+    category = Category(name="Бенчмарк")
+    db.add_all([waiter, category])
+    db.flush()
+    dishes = [Menu(name=f"Блюдо {i}", price=100 + i, category=category.id, is_available=True) for i in range(20)]
+    tables = [Table(number=i + 1, pos_x=i, pos_y=0, status="occupied", is_available=True) for i in range(20)]
+    db.add_all(dishes + tables)
+    db.flush()
+    start = datetime(2026, 1, 1, 12, 0)
+    for i in range(args.orders):
+        order = Order(waiter=waiter.id, status="active", timestart=start + timedelta(minutes=i),
+                      total=0, plate_count=args.plates, pending_plate_count=args.plates)
+        db.add(order)
+        db.flush()
+        db.add(TableForOrder(order=order.id, table=tables[i % len(tables)].id))
+        db.add_all([
+            PlateForOrder(order_id=order.id, plate_id=dishes[(i + j) % len(dishes)].id, count=1,
+                          comment="без лука" if j == 0 else None, cooking_status="ordered",
+                          price=dishes[(i + j) % len(dishes)].price)
+            for j in range(args.plates)
+        ])
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(orders.router, prefix="/api")
+    app.dependency_overrides[get_session] = lambda: db
+
+    @app.get("/before", response_model=List[OrderResponse])
+    def before(session: Session = Depends(get_session)):
+        # Путь чтения до перехода на записи: граф ORM -> OrderResponse -> response_model
+        rows = session.query(Order).options(
+            joinedload(Order.waiter_user),
+            selectinload(Order.tables).joinedload(TableForOrder.table_for_order),
+            selectinload(Order.plates).joinedload(PlateForOrder.menu_item)
+        ).order_by(Order.timestart.desc(), Order.id.desc()).limit(args.orders + 1).all()
+        session.expunge_all()
+        return [
+            OrderResponse(
+                id=order.id, waiter=order.waiter, status=order.status,
+                timestart=order.timestart, endtime=order.endtime,
+                waiter_name=order.waiter_user.name if order.waiter_user else None,
+                table_numbers=[t.table_for_order.number for t in order.tables if t.table_for_order],
+                total=order.total, plate_count=order.plate_count, pending_plate_count=order.pending_plate_count,
+                plates=[
+                    PlateInOrderResponse(
+                        id=plate.id, plate_id=plate.plate_id, count=plate.count, comment=plate.comment,
+                        cooking_status=plate.cooking_status, price=plate.price,
+                        plate_name=plate.menu_item.name if plate.menu_item else None
+                    )
+                    for plate in order.plates
+                ]
+            )
+            for order in rows[:args.orders]
+        ]
+
+    client = TestClient(app)
+    after_url = f"/api/orders/?limit={args.orders}"
+    assert client.get("/before").json() == client.get(after_url).json()
+
+    before_time = timed(lambda: client.get("/before"), args.runs)
+    after_time = timed(lambda: client.get(after_url), args.runs)
+    size = len(client.get(after_url).content)
+
+    print(f"orders={args.orders} plates/order={args.plates} body={size / 1024:.0f} KiB")
+    print(f"{'path':<28} {'median, ms':>10} {'req/s':>8}")
+    print(f"{'ORM + pydantic (before)':<28} {before_time * 1000:>10.1f} {1 / before_time:>8.1f}")
+    print(f"{'rows + orjson (after)':<28} {after_time * 1000:>10.1f} {1 / after_time:>8.1f}")
+    print(f"speedup: x{before_time / after_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
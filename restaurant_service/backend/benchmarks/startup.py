@@ -0,0 +1,64 @@
+"""
+Время старта воркера: импорт app.main в отдельном процессе, как при запуске
+uvicorn-воркера или перезапуске по --reload, и отдельно - время проверки схемы
+через create_all, которое раньше выполнялось при каждом импорте.
+
+    python -m benchmarks.startup [--runs 10] [--database-url URL]
+
+Без --database-url используется временная SQLite-база со схемой, созданной заранее.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEASURE = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+SCHEMA_CHECK = (
+    "import time; from app.bootstrap import create_schema; "
+    "started = time.perf_counter(); create_schema(); "
+    "print(time.perf_counter() - started)"
+)
+
+
+def measure(env: dict, runs: int, code: str = MEASURE):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def report(name: str, timings):
+    print(f"{name}: runs={len(timings)} median={statistics.median(timings) * 1000:.1f} ms "
+          f"min={min(timings) * 1000:.1f} ms max={max(timings) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    env = dict(os.environ, SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"))
+    env["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/startup.db"
+
+    # Схема создается заранее, как командой python -m app.bootstrap
+    measure(env, 1, SCHEMA_CHECK)
+    report("import app.main", measure(env, args.runs))
+    report("create_all on existing schema", measure(env, args.runs, SCHEMA_CHECK))
+
+
+if __name__ == "__main__":
+    main()
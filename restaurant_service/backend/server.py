@@ -1,6 +1,11 @@
 import uvicorn
 
+from app.bootstrap import create_schema
+
 if __name__ == "__main__":
+    # Схема готовится один раз здесь, а не в каждом процессе, перезапускаемом --reload
+    create_schema()
+
     host = "0.0.0.0"
     port = 8000
     reload = True
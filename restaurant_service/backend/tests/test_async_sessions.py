@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.db_models import Base, Menu, Order, PlateForOrder, Table, TableForOrder, User
+from app.main import app
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_db(tmp_path, monkeypatch):
+    """Файловая SQLite-база, доступная и синхронному, и асинхронному (aiosqlite) движку"""
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    ))
+
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    yield sessionmaker(bind=sync_engine)(), statements
+    sync_engine.dispose()
+
+
+def seed(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    table = Table(number=5, pos_x=0, pos_y=0, status="occupied", is_available=True)
+    db.add_all([waiter, dish, table])
+    db.flush()
+    ids = []
+    for hour, status in ((12, "completed"), (13, "active")):
+        order = Order(waiter=waiter.id, status=status, timestart=datetime(2026, 1, 1, hour, 0),
+                      total=300, plate_count=1, pending_plate_count=1)
+        db.add(order)
+        db.flush()
+        db.add(TableForOrder(order=order.id, table=table.id))
+        db.add(PlateForOrder(order_id=order.id, plate_id=dish.id, count=1, cooking_status="ordered", price=300))
+        ids.append(order.id)
+    db.commit()
+    return ids
+
+
+def test_order_reads_run_on_async_session(async_db):
+    db, statements = async_db
+    completed_id, active_id = seed(db)
+
+    with TestClient(app) as client:
+        orders = client.get("/api/orders/", params={"limit": 1})
+        active = client.get("/api/orders/active").json()
+        single = client.get(f"/api/orders/{completed_id}").json()
+        missing = client.get("/api/orders/999")
+
+    assert orders.status_code == 200
+    assert [order["id"] for order in orders.json()] == [active_id]
+    assert orders.headers["X-Next-Cursor"]
+    assert [order["id"] for order in active] == [active_id]
+    assert active[0]["waiter_name"] == "Анна"
+    assert active[0]["table_numbers"] == [5]
+    assert single["status"] == "completed"
+    assert [plate["plate_name"] for plate in single["plates"]] == ["Борщ"]
+    assert missing.status_code == 404
+    # Все чтения прошли через асинхронный движок (run_db -> AsyncSession.run_sync)
+    assert len(statements) >= 9
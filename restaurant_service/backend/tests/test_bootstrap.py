@@ -0,0 +1,106 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.api.orders import _list_orders
+from app.bootstrap import check_schema, create_schema
+from app.db_models import Base, CookingStatusHistory
+
+
+def test_create_schema_is_explicit_and_idempotent():
+    engine = create_engine("sqlite://")
+
+    assert check_schema(engine)["missing_tables"] == sorted(Base.metadata.tables)
+    assert create_schema(engine) == sorted(Base.metadata.tables)
+    assert create_schema(engine) == []
+    assert check_schema(engine)["up_to_date"] is True
+
+
+
+def test_missing_indexes_are_reported_and_created():
+    engine = create_engine("sqlite://")
+    create_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_orders_timestart_id"))
+
+    state = check_schema(engine)
+
+    assert state["up_to_date"] is False
+    assert state["missing_indexes"] == ["ix_orders_timestart_id"]
+    assert create_schema(engine) == ["ix_orders_timestart_id"]
+    assert check_schema(engine)["up_to_date"] is True
+
+
+def test_history_indexes_are_added_to_existing_table():
+    engine = create_engine("sqlite://")
+    create_schema(engine)
+    history_indexes = sorted(index.name for index in CookingStatusHistory.__table__.indexes)
+    with engine.begin() as connection:
+        for name in history_indexes:
+            connection.execute(text(f"DROP INDEX {name}"))
+
+    assert check_schema(engine)["missing_indexes"] == history_indexes
+    assert create_schema(engine) == history_indexes
+    assert {index["name"] for index in inspect(engine).get_indexes("cooking_status_history")} == set(history_indexes)
+
+
+def test_keyset_index_is_added_to_existing_orders_table():
+    engine = create_engine("sqlite://")
+    create_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_orders_timestart_id"))
+
+    assert create_schema(engine) == ["ix_orders_timestart_id"]
+
+    with engine.connect() as connection:
+        plan = connection.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM orders WHERE timestart < '2026-01-01' "
+            "ORDER BY timestart DESC, id DESC LIMIT 20"
+        )).all()
+    assert any("ix_orders_timestart_id" in row[-1] for row in plan)
+
+
+def test_order_counters_are_added_and_backfilled_on_baseline_schema():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    create_schema(engine)
+    with engine.begin() as connection:
+        # Таблица orders до появления денормализованных счетчиков
+        for column in ("total", "plate_count", "pending_plate_count"):
+            connection.execute(text(f"ALTER TABLE orders DROP COLUMN {column}"))
+        connection.execute(text("INSERT INTO users (id, name, login, password, role, is_available) "
+                                "VALUES (1, 'Анна', 'anna', 'x', 'waiter', 1)"))
+        connection.execute(text("INSERT INTO menu (id, name, price, is_available) VALUES (1, 'Борщ', 300, 1)"))
+        connection.execute(text("INSERT INTO orders (id, status, timestart, waiter) "
+                                "VALUES (1, 'active', '2026-01-01 12:00:00', 1)"))
+        connection.execute(text("INSERT INTO plates_for_order (order_id, plate_id, count, cooking_status, price) "
+                                "VALUES (1, 1, 2, 'ordered', 300), (1, 1, 1, 'served', 300)"))
+
+    assert check_schema(engine)["missing_columns"] == ["orders.total", "orders.plate_count", "orders.pending_plate_count"]
+    assert create_schema(engine) == ["orders.total", "orders.plate_count", "orders.pending_plate_count"]
+    assert check_schema(engine)["up_to_date"] is True
+
+    with Session(bind=engine) as db:
+        orders, _ = _list_orders(db)
+    assert [(o.total, o.plate_count, o.pending_plate_count) for o in orders] == [(900, 2, 1)]
+
+
+def test_plate_category_is_added_and_backfilled_from_menu():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    create_schema(engine)
+    with engine.begin() as connection:
+        # Таблица plates_for_order до появления категории продажи
+        connection.execute(text("DROP TABLE plates_for_order"))
+        connection.execute(text(
+            "CREATE TABLE plates_for_order (id INTEGER PRIMARY KEY, count INTEGER NOT NULL, comment TEXT, "
+            "cooking_status VARCHAR(20) NOT NULL, price NUMERIC NOT NULL, "
+            "order_id INTEGER NOT NULL REFERENCES orders (id), plate_id INTEGER NOT NULL REFERENCES menu (id))"
+        ))
+        connection.execute(text("INSERT INTO category (id, name) VALUES (1, 'Супы')"))
+        connection.execute(text("INSERT INTO menu (id, name, price, category, is_available) "
+                                "VALUES (1, 'Борщ', 300, 1, 1)"))
+        connection.execute(text("INSERT INTO plates_for_order (order_id, plate_id, count, cooking_status, price) "
+                                "VALUES (1, 1, 2, 'ordered', 300)"))
+
+    assert create_schema(engine) == ["plates_for_order.category"]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT category FROM plates_for_order")).scalars().all() == [1]
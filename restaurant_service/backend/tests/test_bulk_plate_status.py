@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from app.api.orders import check_order_counters, create_order, update_plates_status
+from app.core.events import kitchen_events
+from app.db_models import CookingStatusHistory, Menu, User
+from app.schemas.orders_schemas import OrderCreate, PlateStatusBulkUpdate
+
+
+def seed_orders(db, count):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([waiter, dish])
+    db.commit()
+    plate_ids = []
+    for _ in range(count):
+        order = create_order(OrderCreate(
+            waiter=waiter.id, timestart=datetime(2026, 1, 1, 12, 0), tables=[],
+            plates=[{"plate_id": dish.id, "price": 300}, {"plate_id": dish.id, "price": 300}]
+        ), db=db)
+        plate_ids.extend(plate.id for plate in order.plates)
+    return plate_ids
+
+
+def test_tray_of_plates_in_one_transaction(db, query_counter, monkeypatch):
+    plate_ids = seed_orders(db, 5)
+    published = []
+    monkeypatch.setattr(kitchen_events, "publish", lambda event_type, data: published.append((event_type, data)))
+
+    query_counter.clear()
+    result = update_plates_status(PlateStatusBulkUpdate(plate_ids=plate_ids, status="served"), db=db)
+
+    assert result.updated == 10
+    assert {r.result for r in result.results} == {"updated"}
+    # SELECT ... FOR UPDATE, UPDATE ... RETURNING, INSERT истории, UPDATE счетчиков, названия блюд
+    assert len(query_counter) == 5
+    assert db.query(CookingStatusHistory).filter(CookingStatusHistory.new_status == "served").count() == 10
+    assert len(published) == 10
+    assert published[0][1]["plate"]["cooking_status"] == "served"
+    assert published[0][1]["plate"]["plate_name"] == "Борщ"
+    assert check_order_counters(db) == []
+
+
+def test_per_plate_results(db):
+    plate_ids = seed_orders(db, 1)
+    update_plates_status(PlateStatusBulkUpdate(plate_ids=plate_ids[:1], status="served"), db=db)
+
+    result = update_plates_status(
+        PlateStatusBulkUpdate(plate_ids=[plate_ids[0], plate_ids[1], 999, plate_ids[1]], status="ready"), db=db
+    )
+
+    assert [(r.id, r.previous_status, r.result) for r in result.results] == [
+        (plate_ids[0], "served", "updated"),
+        (plate_ids[1], "ordered", "updated"),
+        (999, None, "not_found"),
+    ]
+    assert check_order_counters(db) == []
+
+    again = update_plates_status(PlateStatusBulkUpdate(plate_ids=plate_ids, status="ready"), db=db)
+    assert again.updated == 0
+    assert {r.result for r in again.results} == {"unchanged"}
@@ -0,0 +1,60 @@
+import logging
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.db_metrics import Histogram, instrument_engine, route_db_metrics
+from app.database import get_db, get_session
+from app.db_models import Order, User
+from app.main import app
+
+
+@pytest.fixture
+def client(engine, db, monkeypatch):
+    instrument_engine(engine)
+    monkeypatch.setattr(settings, "DEBUG", True)
+    route_db_metrics.clear()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_session] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((1, 5))
+    for value in (0, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(1, 2), (5, 3), (float("inf"), 4)]
+    assert histogram.sum == 14
+
+
+def test_query_count_headers_and_route_histograms(client, db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    db.add(waiter)
+    db.flush()
+    db.add(Order(waiter=waiter.id, status="active", timestart=datetime(2026, 3, 1, 12, 0)))
+    db.commit()
+
+    response = client.get("/api/orders/1")
+
+    assert response.status_code == 200
+    assert int(response.headers["X-DB-Query-Count"]) >= 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+    stats = client.get("/api/health/queries").json()
+    assert stats["GET /api/orders/{order_id}"]["queries"]["count"] == 1
+
+
+def test_headers_hidden_outside_debug(client, monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG", False)
+    response = client.get("/api/health/queries")
+    assert "Server-Timing" not in response.headers
+
+
+def test_slow_queries_are_logged_with_route(client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="app.core.db_metrics"):
+        client.get("/api/orders/1")
+    assert any("/api/orders/{order_id}" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.exports import iter_csv
+from app.core.config import settings
+from app.database import get_db
+from app.db_models import CookingStatusHistory, Category, Menu, Order, User
+from app.main import app
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def seed(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    category = Category(name="Супы")
+    db.add_all([waiter, category])
+    db.flush()
+    soup = Menu(name="Борщ", price=300, category=category.id, is_available=True)
+    db.add(soup)
+    db.flush()
+    for day in (1, 2, 2, 2, 3):
+        order = Order(waiter=waiter.id, timestart=datetime(2026, 3, day, 12, 0), status="completed", total=300, plate_count=1)
+        db.add(order)
+        db.flush()
+        db.add(CookingStatusHistory(
+            order_id=order.id, plate_id=soup.id, new_status="ready",
+            change_time=datetime(2026, 3, day, 12, 30), change_by=waiter.id
+        ))
+    db.commit()
+
+
+def test_csv_is_written_in_chunks():
+    chunks = list(iter_csv(["a", "b"], ((i, None) for i in range(5)), chunk_size=2))
+    assert len(chunks) == 3
+    assert "".join(chunks).splitlines() == ["a,b", "0,", "1,", "2,", "3,", "4,"]
+
+
+def test_orders_csv_filtered_by_date(client, db):
+    seed(db)
+    response = client.get("/api/exports/orders?start_date=2026-03-02&end_date=2026-03-02")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="orders_2026-03-02_2026-03-02.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert {row["waiter_name"] for row in rows} == {"Анна"}
+    assert rows[0]["timestart"] == "2026-03-02T12:00:00"
+
+
+def test_history_ndjson(client, db):
+    seed(db)
+    response = client.get("/api/exports/cooking-status-history?start_date=2026-03-03&format=ndjson")
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [{
+        "id": 5, "change_time": "2026-03-03T12:30:00", "new_status": "ready", "order_id": 5,
+        "plate_id": 1, "plate_name": "Борщ", "change_by": 1, "user_name": "Анна"
+    }]
+
+
+def test_unknown_format_is_rejected(client):
+    assert client.get("/api/exports/orders?format=xlsx").status_code == 400
@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+from app.database import get_db, get_session
+from app.db_models import Category, CookingStatusHistory, Menu, Order, PlateForOrder, Table, TableForOrder, User
+from app.main import app
+from app.schemas.history_schemas import CookingStatusHistoryResponse
+from app.schemas.orders_schemas import OrderResponse, OrderSummaryRecord
+
+
+@pytest.fixture
+def client(db):
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_session] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def seed(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    category = Category(name="Супы")
+    db.add_all([waiter, category])
+    db.flush()
+    soup = Menu(name="Борщ", price=300, category=category.id, is_available=True)
+    bread = Menu(name="Хлеб", price=50, category=category.id, is_available=True)
+    table = Table(number=7, pos_x=0, pos_y=0, status="occupied", is_available=True)
+    db.add_all([soup, bread, table])
+    db.flush()
+    order = Order(waiter=waiter.id, status="active", timestart=datetime(2026, 1, 1, 12, 0, 30, 250000),
+                  total=Decimal("650.50"), plate_count=2, pending_plate_count=2)
+    db.add(order)
+    db.flush()
+    db.add(TableForOrder(order=order.id, table=table.id))
+    db.add_all([
+        PlateForOrder(order_id=order.id, plate_id=soup.id, count=2, cooking_status="ordered", price=Decimal("300.25")),
+        PlateForOrder(order_id=order.id, plate_id=bread.id, count=1, comment="без лука", cooking_status="ordered", price=50)
+    ])
+    db.add(CookingStatusHistory(
+        order_id=order.id, plate_id=soup.id, new_status="ordered",
+        change_time=datetime(2026, 1, 1, 12, 1), change_by=waiter.id
+    ))
+    db.commit()
+    return order.id
+
+
+def test_orders_body_matches_response_model(client, db):
+    order_id = seed(db)
+
+    body = client.get("/api/orders/").json()
+    single = client.get(f"/api/orders/{order_id}").json()
+
+    validated = TypeAdapter(List[OrderResponse]).validate_python(body)
+    assert body == TypeAdapter(List[OrderResponse]).dump_python(validated, mode="json")
+    assert single == body[0]
+    assert single["timestart"] == "2026-01-01T12:00:30.250000"
+    assert single["total"] == 650.5
+    assert single["table_numbers"] == [7]
+    assert [(p["plate_name"], p["price"]) for p in single["plates"]] == [("Борщ", 300.25), ("Хлеб", 50.0)]
+    assert client.get("/api/orders/999").status_code == 404
+
+
+def test_history_body_matches_response_model(client, db):
+    seed(db)
+
+    body = client.get("/api/cooking-status-history/").json()
+
+    validated = TypeAdapter(List[CookingStatusHistoryResponse]).validate_python(body)
+    assert body == TypeAdapter(List[CookingStatusHistoryResponse]).dump_python(validated, mode="json")
+    assert body[0]["user_name"] == "Анна"
+    assert body[0]["order_number"] == f"Заказ #{body[0]['order_id']}"
+
+
+def test_fallback_without_orjson_renders_same_json(monkeypatch):
+    record = OrderSummaryRecord(1, 2, "active", datetime(2026, 1, 1, 12, 0), None, "Анна", [3], 10.5, 1, 1)
+    content = [record, {"price": Decimal("1.25")}]
+    fast = json.loads(FastJSONResponse(content=content).body)
+
+    monkeypatch.setattr(responses, "orjson", None)
+
+    assert json.loads(FastJSONResponse(content=content).body) == fast
+    assert fast[0]["timestart"] == "2026-01-01T12:00:00"
+    assert fast[1]["price"] == 1.25
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+
+from app.api.orders import create_order, update_plate_status
+from app.core.hall_state import HallState, hall_state
+from app.db_models import User, Table, Menu
+from app.schemas.orders_schemas import OrderCreate
+
+
+def seed_hall(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([
+        waiter, dish,
+        Table(number=1, pos_x=10, pos_y=20, status="free", is_available=True),
+        Table(number=2, pos_x=30, pos_y=20, status="free", is_available=True)
+    ])
+    db.commit()
+    return waiter.id, dish.id
+
+
+def test_snapshot_is_reused_until_invalidated(db, query_counter):
+    seed_hall(db)
+    state = HallState(ttl_seconds=60)
+
+    query_counter.clear()
+    first = state.get(db)
+    assert len(query_counter) == 2
+    assert state.get(db) is first
+    assert len(query_counter) == 2
+
+    state.invalidate()
+    assert state.get(db) is not first
+
+
+def test_snapshot_shows_active_order_with_total(db):
+    waiter_id, dish_id = seed_hall(db)
+    table_id = db.query(Table.id).filter(Table.number == 2).scalar()
+    hall_state.invalidate()
+    before = hall_state.get(db)
+
+    order = create_order(OrderCreate(
+        waiter=waiter_id,
+        timestart=datetime(2026, 1, 1, 12, 0),
+        tables=[table_id],
+        plates=[{"plate_id": dish_id, "price": 300, "count": 2}, {"plate_id": dish_id, "price": 150}]
+    ), db=db)
+
+    snapshot = hall_state.get(db)
+    assert snapshot is not before
+    tables = json.loads(snapshot.payload)["tables"]
+    assert [t["number"] for t in tables] == [1, 2]
+    assert tables[0]["order"] is None
+    assert tables[1]["status"] == "occupied"
+    assert tables[1]["pos_x"] == 30
+    assert tables[1]["order"]["id"] == order.id
+    assert tables[1]["order"]["waiter_name"] == "Анна"
+    assert tables[1]["order"]["total"] == 750
+    assert tables[1]["order"]["plate_count"] == 2
+
+
+def test_single_plate_status_change_refreshes_pending_count(db):
+    waiter_id, dish_id = seed_hall(db)
+    table_id = db.query(Table.id).filter(Table.number == 1).scalar()
+    order = create_order(OrderCreate(
+        waiter=waiter_id, timestart=datetime(2026, 1, 1, 12, 0), tables=[table_id],
+        plates=[{"plate_id": dish_id, "price": 300}]
+    ), db=db)
+    assert json.loads(hall_state.get(db).payload)["tables"][0]["order"]["pending_plate_count"] == 1
+
+    update_plate_status(order.plates[0].id, "served", db=db)
+
+    assert json.loads(hall_state.get(db).payload)["tables"][0]["order"]["pending_plate_count"] == 0
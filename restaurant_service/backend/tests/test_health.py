@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.api import health
+from app.core.config import settings
+from app.core.health import HealthChecker
+from app.db_models import Base
+from app.main import app
+
+
+def make_checker(probe_engine, pools=(), cache_seconds=60):
+    return HealthChecker(probe_engine, pools, Base.metadata, cache_seconds)
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(health, "health_checker", make_checker(engine))
+    return TestClient(app)
+
+
+def test_ready_reports_latency_and_schema(client):
+    response = client.get("/api/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["database"]["latency_ms"] >= 0
+    assert body["schema"]["up_to_date"] is True
+
+
+def test_live_does_not_touch_database(monkeypatch):
+    broken = make_checker(create_engine("sqlite:////nonexistent/dir/db.sqlite"))
+    monkeypatch.setattr(health, "health_checker", broken)
+    client = TestClient(app)
+
+    assert client.get("/api/health/live").status_code == 200
+    assert client.get("/api/health/ready").json()["status"] == "down"
+    response = client.get("/api/health")
+    assert response.status_code == 503
+    assert response.json() == {"status": "unhealthy", "database": "disconnected"}
+
+
+def test_missing_table_and_saturated_pool_degrade_readiness(monkeypatch):
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    probe = create_engine("sqlite://")
+    pool_engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    connection = pool_engine.connect()
+    try:
+        result = make_checker(probe, [("sync", pool_engine.pool)]).check()
+    finally:
+        connection.close()
+
+    assert result["status"] == "degraded"
+    assert "orders" in result["schema"]["missing_tables"]
+    assert result["pools"][0]["saturation"] == 1.0
+    assert len(result["problems"]) == 2
+
+
+def test_result_is_cached(engine, query_counter):
+    checker = make_checker(engine)
+    first = checker.check()
+    executed = len(query_counter)
+
+    assert checker.check() is first
+    assert len(query_counter) == executed
+
+
+def test_schema_is_not_introspected_on_every_probe(engine, query_counter):
+    checker = HealthChecker(engine, (), Base.metadata, cache_seconds=0, schema_cache_seconds=600)
+    first = checker.check()
+
+    query_counter.clear()
+    second = checker.check()
+
+    assert second is not first
+    assert second["schema"] is first["schema"]
+    assert query_counter == ["SELECT 1"]
@@ -0,0 +1,146 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.api.orders import create_order, update_plate_status
+from app.core import history_buffer as history_module
+from app.core.history_buffer import HistoryBuffer, record_history
+from app.db_models import CookingStatusHistory, Menu, User
+from app.schemas.orders_schemas import OrderCreate
+
+
+def seed_plate(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([waiter, dish])
+    db.commit()
+    order = create_order(OrderCreate(
+        waiter=waiter.id, timestart=datetime(2026, 1, 1, 12, 0), tables=[],
+        plates=[{"plate_id": dish.id, "price": 300}]
+    ), db=db)
+    return order.plates[0].id
+
+
+def history_row(status="ready"):
+    return {"order_id": None, "plate_id": 1, "new_status": status, "change_by": None,
+            "change_time": datetime(2026, 1, 1, 12, 0)}
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def write_journal(path, statuses):
+    lines = [json.dumps({"seq": seq, "row": dict(history_row(status), change_time="2026-01-01T12:00:00")})
+             for seq, status in enumerate(statuses, start=1)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def buffer(engine, tmp_path, monkeypatch):
+    buffer = HistoryBuffer(
+        sessionmaker(bind=engine), spill_dir=str(tmp_path), max_size=100, flush_size=50, flush_interval=60
+    )
+    monkeypatch.setattr(history_module, "history_buffer", buffer)
+    yield buffer
+    buffer.stop()
+
+
+def test_history_is_written_in_request_transaction_by_default(db):
+    plate_id = seed_plate(db)
+    update_plate_status(plate_id, "preparing", db=db)
+    assert db.query(CookingStatusHistory).filter(CookingStatusHistory.new_status == "preparing").count() == 1
+
+
+def test_write_behind_flushes_after_commit_and_on_stop(db, buffer, tmp_path):
+    plate_id = seed_plate(db)
+    buffer.start()
+
+    update_plate_status(plate_id, "preparing", db=db)
+    update_plate_status(plate_id, "ready", db=db)
+
+    journal = tmp_path / f"history-{os.getpid()}.jsonl"
+    assert [json.loads(line)["row"]["new_status"] for line in journal.read_text().splitlines()] == ["preparing", "ready"]
+
+    buffer.stop()
+    statuses = [row.new_status for row in db.query(CookingStatusHistory).order_by(CookingStatusHistory.id)]
+    # "ordered" записан при создании заказа, до запуска буфера
+    assert statuses == ["ordered", "preparing", "ready"]
+    assert buffer.flushed == 2
+    assert os.listdir(tmp_path) == []
+
+
+def test_rolled_back_request_writes_no_history(db, buffer):
+    buffer.start()
+    record_history(db, [history_row()])
+    db.rollback()
+    buffer.stop()
+    assert buffer.flushed == 0
+
+
+def test_full_queue_falls_back_to_direct_insert(engine, db, tmp_path, monkeypatch):
+    buffer = HistoryBuffer(sessionmaker(bind=engine), spill_dir=str(tmp_path), max_size=1, flush_size=50, flush_interval=60)
+    monkeypatch.setattr(history_module, "history_buffer", buffer)
+    buffer.start()
+
+    record_history(db, [history_row(), history_row(), history_row()])
+    db.commit()
+
+    assert buffer.overflowed == 2
+    assert db.query(CookingStatusHistory).count() == 2
+    buffer.stop()
+    assert db.query(CookingStatusHistory).count() == 3
+
+
+def test_recovery_replays_entries_after_checkpoint(engine, db, tmp_path):
+    pid = dead_pid()
+    journal = tmp_path / f"history-{pid}.jsonl"
+    write_journal(journal, ["s1", "s2", "s3"])
+    with open(journal, "a") as tail:
+        tail.write("{\"seq\": 4, \"ro")
+    (tmp_path / f"history-{pid}.checkpoint").write_text("1")
+
+    buffer = HistoryBuffer(sessionmaker(bind=engine), spill_dir=str(tmp_path), max_size=10, flush_size=50, flush_interval=60)
+
+    assert buffer.recover() == 2
+    assert sorted(row.new_status for row in db.query(CookingStatusHistory)) == ["s2", "s3"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_recovery_skips_live_and_empty_journals(engine, tmp_path):
+    write_journal(tmp_path / f"history-{os.getppid()}.jsonl", ["live"])
+    (tmp_path / f"history-{dead_pid()}.jsonl").write_text("")
+
+    buffer = HistoryBuffer(sessionmaker(bind=engine), spill_dir=str(tmp_path), max_size=10, flush_size=50, flush_interval=60)
+
+    assert buffer.recover() == 0
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_journal_survives_stop_when_database_is_down(engine, db, tmp_path, monkeypatch):
+    def unavailable():
+        raise OperationalError("INSERT", {}, ConnectionRefusedError())
+
+    buffer = HistoryBuffer(unavailable, spill_dir=str(tmp_path), max_size=10, flush_size=50, flush_interval=60)
+    monkeypatch.setattr(history_module, "history_buffer", buffer)
+    buffer.start()
+
+    record_history(db, [history_row("preparing"), history_row("ready")])
+    db.commit()
+    buffer.stop()
+
+    assert (tmp_path / f"history-{os.getpid()}.jsonl").exists()
+    assert db.query(CookingStatusHistory).count() == 0
+
+    restarted = HistoryBuffer(sessionmaker(bind=engine), spill_dir=str(tmp_path), max_size=10, flush_size=50, flush_interval=60)
+    assert restarted.recover() == 2
+    assert sorted(row.new_status for row in db.query(CookingStatusHistory)) == ["preparing", "ready"]
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import events, orders
+from app.core.events import EventBroker, kitchen_events
+from app.database import get_db, get_session
+from app.db_models import Order, User, Menu, PlateForOrder
+
+
+def test_publish_from_worker_thread_reaches_subscriber():
+    broker = EventBroker()
+
+    async def scenario():
+        subscription = broker.subscribe()
+        worker = threading.Thread(target=broker.publish, args=("plate_added", {"order_id": 1}))
+        worker.start()
+        worker.join()
+        return await subscription.get(timeout=1)
+
+    event = asyncio.run(scenario())
+    assert event["type"] == "plate_added"
+    assert event["order_id"] == 1
+
+
+def test_slow_subscriber_keeps_latest_events():
+    broker = EventBroker(max_queue=2)
+
+    async def scenario():
+        subscription = broker.subscribe()
+        for i in range(5):
+            broker.publish("plate_updated", {"order_id": i})
+        await asyncio.sleep(0)
+        return [(await subscription.get(timeout=1))["order_id"] for _ in range(2)], subscription.dropped
+
+    received, dropped = asyncio.run(scenario())
+    assert received == [3, 4]
+    assert dropped == 3
+
+
+def test_status_change_is_pushed_over_websocket(engine, db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([waiter, dish])
+    db.flush()
+    order = Order(waiter=waiter.id, status="active", timestart=datetime(2026, 1, 1, 12, 0))
+    db.add(order)
+    db.flush()
+    plate = PlateForOrder(order_id=order.id, plate_id=dish.id, count=1, cooking_status="ordered", price=300)
+    db.add(plate)
+    db.commit()
+    order_id, plate_row_id = order.id, plate.id
+
+    app = FastAPI()
+    app.include_router(orders.router, prefix="/api")
+    app.include_router(events.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_session] = lambda: db
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/api/events/kitchen/ws?order_id={order_id}") as socket:
+            response = client.put(f"/api/orders/plate/{plate_row_id}/status/preparing")
+            assert response.status_code == 200
+
+            event = socket.receive_json()
+
+    assert event["type"] == "plate_status_changed"
+    assert event["order_id"] == order_id
+    assert event["plate"]["id"] == plate_row_id
+    assert event["plate"]["cooking_status"] == "preparing"
+    assert event["plate"]["plate_name"] == "Борщ"
+    assert kitchen_events.subscriber_count == 0
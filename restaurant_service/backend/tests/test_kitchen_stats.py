@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.kitchen_stats import KitchenStatsCache, compute_kitchen_stats
+from app.database import get_db
+from app.db_models import Category, CookingStatusHistory, Menu, Order, User
+from app.main import app
+
+DAY = date(2026, 3, 1)
+
+
+def seed(db):
+    cook = User(name="Повар", login="cook", password="x", role="cook", is_available=True)
+    waiter = User(name="Официант", login="waiter", password="x", role="waiter", is_available=True)
+    category = Category(name="Супы")
+    db.add_all([cook, waiter, category])
+    db.flush()
+    soup = Menu(name="Борщ", price=300, category=category.id, is_available=True)
+    db.add(soup)
+    db.flush()
+    return cook.id, waiter.id, soup.id
+
+
+def add_timeline(db, order_id, plate_id, start, steps):
+    """steps: [(status, минут от start, кто сменил)]"""
+    for status, minutes, user_id in steps:
+        db.add(CookingStatusHistory(
+            order_id=order_id, plate_id=plate_id, new_status=status,
+            change_time=start + timedelta(minutes=minutes), change_by=user_id
+        ))
+
+
+def test_stage_durations_and_percentiles(db, query_counter):
+    cook, waiter, soup = seed(db)
+    start = datetime(2026, 3, 1, 12, 0)
+    for i, cooking_minutes in enumerate([10, 20, 30, 40]):
+        order = Order(waiter=waiter, timestart=start, status="active")
+        db.add(order)
+        db.flush()
+        add_timeline(db, order.id, soup, start, [
+            ("ordered", 0, waiter),
+            ("preparing", 2, cook),
+            ("ready", 2 + cooking_minutes, cook),
+            ("served", 5 + cooking_minutes, waiter),
+        ])
+    db.commit()
+
+    query_counter.clear()
+    stats = compute_kitchen_stats(db, DAY)
+
+    stages = {s.stage: s for s in stats.stages}
+    assert set(stages) == {"ordered", "preparing", "ready"}
+    preparing = stages["preparing"]
+    assert preparing.count == 4
+    assert preparing.p50_seconds == 20 * 60
+    assert preparing.p90_seconds == 40 * 60
+    assert preparing.avg_seconds == 25 * 60
+    assert stages["ready"].p99_seconds == 3 * 60
+
+    assert [d.plate_name for d in stats.dishes] == ["Борщ"]
+    cooks = {c.cook_name: {s.stage for s in c.stages} for c in stats.cooks}
+    assert cooks == {"Повар": {"ordered", "preparing"}, "Официант": {"ready"}}
+    # Один проход по истории и два запроса за названиями
+    assert len(query_counter) == 3
+
+
+def test_stage_started_before_midnight_counts_for_its_day(db):
+    cook, waiter, soup = seed(db)
+    order = Order(waiter=waiter, timestart=datetime(2026, 3, 1, 23, 50), status="active")
+    db.add(order)
+    db.flush()
+    add_timeline(db, order.id, soup, datetime(2026, 3, 1, 23, 50), [
+        ("preparing", 0, cook),
+        ("ready", 20, cook),
+    ])
+    db.commit()
+
+    assert [(s.stage, s.p50_seconds) for s in compute_kitchen_stats(db, DAY).stages] == [("preparing", 1200)]
+    assert compute_kitchen_stats(db, DAY + timedelta(days=1)).stages == []
+
+
+def test_past_days_are_served_from_cache(db):
+    cook, waiter, soup = seed(db)
+    db.commit()
+    cache = KitchenStatsCache(max_days=7, today_ttl_seconds=0, past_ttl_seconds=3600)
+
+    first = cache.get(db, DAY, today=date(2026, 3, 5))
+    assert cache.get(db, DAY, today=date(2026, 3, 5)) is first
+
+    today = cache.get(db, DAY, today=DAY)
+    assert cache.get(db, DAY, today=DAY) is not today
+
+
+def test_stats_from_real_order_endpoints(db):
+    cook, waiter, soup = seed(db)
+    bread = Menu(name="Хлеб", price=50, is_available=True)
+    db.add(bread)
+    db.commit()
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        order = client.post("/api/orders/", json={
+            "waiter": waiter, "timestart": "2026-03-01T12:00:00", "tables": [],
+            "plates": [{"plate_id": soup, "price": 300}]
+        }).json()
+        added = client.post(f"/api/orders/{order['id']}/plates", json={"plate_id": bread.id, "price": 50}).json()
+        assert added["cooking_status"] == "waiting"
+        for plate_id, status in [(order["plates"][0]["id"], "preparing"), (order["plates"][0]["id"], "ready"),
+                                 (added["id"], "preparing")]:
+            assert client.put(f"/api/orders/plate/{plate_id}/status/{status}").status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+    stats = compute_kitchen_stats(db, datetime.utcnow().date())
+
+    # Первый этап измеряется и для блюд из заказа, и для добавленных позже
+    assert {s.stage: s.count for s in stats.stages} == {"ordered": 1, "waiting": 1, "preparing": 1}
+    dishes = {d.plate_name: [s.stage for s in d.stages] for d in stats.dishes}
+    assert dishes == {"Борщ": ["ordered", "preparing"], "Хлеб": ["waiting"]}
@@ -0,0 +1,109 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import media as media_api
+from app.api import menu as menu_api
+from app.bootstrap import move_inline_photos
+from app.core.media import MediaError, MediaStore
+from app.core.menu_cache import MenuCache
+from app.db_models import Category, Menu
+from app.main import app
+from app.schemas.menu_schemas import MenuCreate, MenuUpdate
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MediaStore(root=str(tmp_path), thumbnail_size=64, max_bytes=1024, workers=1)
+    monkeypatch.setattr(menu_api, "media_store", store)
+    monkeypatch.setattr(media_api, "media_store", store)
+    monkeypatch.setattr(menu_api, "menu_cache", MenuCache(ttl_seconds=60))
+    yield store
+    store.shutdown()
+
+
+def test_store_is_content_addressed(store):
+    url = store.put(PNG)
+    assert url.startswith("/api/media/") and url.endswith(".png")
+    assert store.put(PNG) == url
+
+    with pytest.raises(MediaError):
+        store.put(b"not an image")
+    with pytest.raises(MediaError):
+        store.put(PNG + b"\x00" * 2048)
+
+
+def test_menu_keeps_only_urls(db, store):
+    category = Category(name="Супы")
+    db.add(category)
+    db.flush()
+    db.add(Menu(name="Старое фото", photo=base64.b64encode(PNG).decode(), price=1, category=category.id, is_available=True))
+    db.commit()
+
+    created = menu_api.create_menu_item(MenuCreate(
+        name="Борщ", price=300, category=category.id,
+        photo="data:image/png;base64," + base64.b64encode(PNG).decode()
+    ), db=db)
+
+    assert created.photo.startswith("/api/media/")
+    assert created.thumbnail.startswith("/api/media/thumbs/")
+    items = {item.name: item for item in menu_api.menu_cache.get(db).items}
+    assert items["Борщ"].photo == created.photo
+    # Не перенесенное base64-фото в ответы не попадает
+    assert items["Старое фото"].photo is None
+
+
+def test_photo_delivery_headers(store):
+    name = store.put(PNG).rsplit("/", 1)[1]
+    client = TestClient(app)
+
+    response = client.get(f"/api/media/{name}")
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+
+    assert client.get(f"/api/media/{name}", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    assert client.get("/api/media/passwd.png").status_code == 404
+
+    thumbnail = client.get(f"/api/media/thumbs/{name}")
+    assert thumbnail.status_code == 200
+    if not store.thumbnails_enabled:
+        # Без Pillow отдается оригинал с коротким кешем
+        assert "immutable" not in thumbnail.headers["cache-control"]
+
+
+def test_bootstrap_moves_inline_photos(engine, db, store):
+    db.add_all([
+        Menu(name="base64", photo=base64.b64encode(PNG).decode(), price=1, is_available=True),
+        Menu(name="ссылка", photo="https://example.com/a.png", price=1, is_available=True),
+        Menu(name="мусор", photo="не картинка", price=1, is_available=True),
+    ])
+    db.commit()
+
+    assert move_inline_photos(engine, store) == (1, 1)
+    db.expire_all()
+    photos = {item.name: item.photo for item in db.query(Menu)}
+    assert photos["base64"].startswith("/api/media/")
+    assert photos["ссылка"] == "https://example.com/a.png"
+
+
+def test_rejected_update_stores_no_photo(db, store, tmp_path):
+    category = Category(name="Супы")
+    db.add(category)
+    db.flush()
+    item = Menu(name="Борщ", price=300, category=category.id, is_available=True)
+    db.add(item)
+    db.commit()
+
+    with pytest.raises(HTTPException) as error:
+        menu_api.update_menu_item(item.id, MenuUpdate(
+            category=category.id + 100, photo=base64.b64encode(PNG).decode()
+        ), db=db)
+
+    assert error.value.status_code == 404
+    assert [path for path in tmp_path.rglob("*") if path.is_file()] == []
@@ -0,0 +1,55 @@
+from app.core.menu_cache import MenuCache
+from app.db_models import Menu, Category
+
+
+def seed_menu(db):
+    category = Category(name="Супы")
+    db.add(category)
+    db.flush()
+    db.add(Menu(name="Борщ", price=300, category=category.id, is_available=True))
+    db.commit()
+
+
+def test_catalog_is_loaded_once(db, query_counter):
+    seed_menu(db)
+    cache = MenuCache(ttl_seconds=60)
+
+    first = cache.get(db)
+    queries = len(query_counter)
+    second = cache.get(db)
+
+    assert second is first
+    assert len(query_counter) == queries
+    assert first.items[0].category_name == "Супы"
+
+
+def test_invalidate_changes_etag(db):
+    seed_menu(db)
+    cache = MenuCache(ttl_seconds=60)
+    etag = cache.get(db).etag
+
+    db.query(Menu).update({Menu.price: 350})
+    db.commit()
+    assert cache.get(db).etag == etag
+
+    cache.invalidate()
+    catalog = cache.get(db)
+    assert catalog.etag != etag
+    assert catalog.items[0].price == 350
+
+
+def test_stale_load_is_not_stored_after_invalidate(db):
+    seed_menu(db)
+    cache = MenuCache(ttl_seconds=60)
+    original_load = cache._load
+
+    def load_with_concurrent_write(session):
+        catalog = original_load(session)
+        cache.invalidate()
+        return catalog
+
+    cache._load = load_with_concurrent_write
+    cache.get(db)
+    cache._load = original_load
+
+    assert cache._catalog is None
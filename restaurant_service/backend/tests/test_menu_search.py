@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+
+from app.api import menu
+from app.core.menu_cache import MenuCache
+from app.core.menu_search import MenuSearchIndex
+from app.database import get_db
+from app.db_models import Category, Menu
+from app.main import app
+from app.schemas.menu_schemas import MenuResponse
+
+
+def item(item_id, name, description=None, category=1, is_available=True):
+    return MenuResponse(id=item_id, name=name, description=description, photo=None, price=100,
+                        category=category, is_available=is_available)
+
+
+ITEMS = [
+    item(1, "Борщ украинский", "Свекла, капуста, сметана"),
+    item(2, "Салат Цезарь", "Курица, пармезан, соус цезарь"),
+    item(3, "Цезарь с креветками", "Креветки, айсберг"),
+    item(4, "Морс клюквенный"),
+    item(5, "Солянка", "Копчености, маслины, лимон, сметана"),
+]
+
+
+def ids(results):
+    return [item_id for item_id, _ in results]
+
+
+def test_typos_prefixes_and_ranking():
+    index = MenuSearchIndex()
+    index.sync(ITEMS)
+
+    assert ids(index.search("борш"))[0] == 1
+    assert sorted(ids(index.search("цезарь"))) == [2, 3]
+    assert sorted(ids(index.search("цизарь"))) == [2, 3]
+    assert ids(index.search("клюкв")) == [4]
+    # Совпадения в описании тоже находятся, но с меньшим весом, чем в названии
+    assert ids(index.search("пармезан")) == [2]
+    assert dict(index.search("салат"))[2] > dict(index.search("пармезан"))[2]
+    assert sorted(ids(index.search("сметана"))) == [1, 5]
+    assert index.search("ёжик") == []
+    assert index.search("  ") == []
+
+
+def test_sync_reindexes_only_changed_items():
+    index = MenuSearchIndex()
+    assert index.sync(ITEMS) == 5
+
+    renamed = [ITEMS[0], item(2, "Салат Греческий", "Фета, оливки"), *ITEMS[2:4]]
+    assert index.sync(renamed) == 2
+
+    assert len(index) == 4
+    assert 2 in ids(index.search("греческий"))
+    assert ids(index.search("солянка")) == []
+
+
+def test_search_endpoint_uses_menu_cache(db, monkeypatch):
+    category = Category(name="Супы")
+    db.add(category)
+    db.flush()
+    db.add_all([
+        Menu(name="Борщ", price=300, category=category.id, is_available=True),
+        Menu(name="Борщ постный", price=250, category=category.id, is_available=False),
+    ])
+    db.commit()
+    monkeypatch.setattr(menu, "menu_cache", MenuCache(ttl_seconds=60))
+
+    results = menu.search_menu(q="борщ", limit=20, category_id=None, is_available=True, db=db)
+
+    assert [r.name for r in results] == ["Борщ"]
+    assert results[0].category_name == "Супы"
+    assert results[0].score == 1
+
+
+def test_search_limit_is_bounded(db):
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        client = TestClient(app)
+        for limit in (0, -1, menu.MAX_SEARCH_LIMIT + 1):
+            assert client.get("/api/menu/search", params={"q": "борщ", "limit": limit}).status_code == 422
+        assert client.get("/api/menu/search", params={"q": "борщ", "limit": menu.MAX_SEARCH_LIMIT}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
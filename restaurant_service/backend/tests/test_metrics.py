@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import MetricsWriter, request_metrics, write_pool_metrics
+from app.database import get_db, get_session
+from app.db_models import Order, Table, User
+from app.main import app
+
+
+@pytest.fixture
+def client(db):
+    request_metrics.clear()
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_session] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_metrics_exposition(client, db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    db.add(waiter)
+    db.flush()
+    db.add_all([
+        Order(waiter=waiter.id, status="active", timestart=datetime(2026, 3, 1, 12), pending_plate_count=2),
+        Order(waiter=waiter.id, status="completed", timestart=datetime(2026, 3, 1, 11)),
+        Table(number=1, pos_x=0, pos_y=0, status="occupied", is_available=True),
+        Table(number=2, pos_x=0, pos_y=0, status="free", is_available=True),
+    ])
+    db.commit()
+    client.get("/api/orders/1")
+    client.get("/api/orders/1")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    values = samples(response.text)
+    assert values['http_requests_total{method="GET",route="/api/orders/{order_id}",status="200"}'] == "2"
+    assert values['http_request_duration_seconds_count{method="GET",route="/api/orders/{order_id}"}'] == "2"
+    assert values['http_request_duration_seconds_bucket{method="GET",route="/api/orders/{order_id}",le="+Inf"}'] == "2"
+    # Запрос к /metrics еще в обработке
+    assert values["http_requests_in_flight"] == "1"
+    assert values["restaurant_active_orders"] == "1"
+    assert values["restaurant_pending_plates"] == "2"
+    assert values['restaurant_tables{status="occupied"}'] == "1"
+    assert values["restaurant_db_up"] == "1"
+
+
+def test_pool_gauges():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2, max_overflow=1)
+    connections = [engine.connect() for _ in range(3)]
+    writer = MetricsWriter()
+    write_pool_metrics(writer, [("sync", engine.pool)])
+    for connection in connections:
+        connection.close()
+
+    values = samples(writer.render())
+    assert values['db_pool_checked_out{engine="sync"}'] == "3"
+    assert values['db_pool_overflow{engine="sync"}'] == "1"
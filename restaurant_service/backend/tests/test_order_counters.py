@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from app.api.orders import (
+    add_plate_to_order, check_order_counters, create_order, delete_plate_from_order,
+    rebuild_order_counters, update_plate_in_order, update_plate_status
+)
+from app.db_models import Order, User, Menu
+from app.schemas.orders_schemas import OrderCreate, PlateInOrderCreate, PlateInOrderUpdate
+
+
+def seed(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([waiter, dish])
+    db.commit()
+    return waiter.id, dish.id
+
+
+def counters(db, order_id):
+    db.expire_all()
+    order = db.query(Order).filter(Order.id == order_id).one()
+    return float(order.total), order.plate_count, order.pending_plate_count
+
+
+def test_plate_mutations_keep_counters_in_sync(db):
+    waiter_id, dish_id = seed(db)
+    order = create_order(OrderCreate(
+        waiter=waiter_id,
+        timestart=datetime(2026, 1, 1, 12, 0),
+        tables=[],
+        plates=[{"plate_id": dish_id, "price": 300, "count": 2}]
+    ), db=db)
+    assert (order.total, order.plate_count, order.pending_plate_count) == (600, 1, 1)
+    assert counters(db, order.id) == (600, 1, 1)
+
+    added = add_plate_to_order(order.id, PlateInOrderCreate(plate_id=dish_id, price=150.5), db=db)
+    assert counters(db, order.id) == (750.5, 2, 2)
+
+    update_plate_in_order(added.id, PlateInOrderUpdate(count=3, cooking_status="served"), db=db)
+    assert counters(db, order.id) == (1051.5, 2, 1)
+
+    update_plate_status(order.plates[0].id, "served", db=db)
+    assert counters(db, order.id) == (1051.5, 2, 0)
+
+    delete_plate_from_order(added.id, db=db)
+    assert counters(db, order.id) == (600, 1, 0)
+
+    assert check_order_counters(db) == []
+
+
+def test_rebuild_repairs_drifted_counters(db):
+    waiter_id, dish_id = seed(db)
+    order = create_order(OrderCreate(
+        waiter=waiter_id,
+        timestart=datetime(2026, 1, 1, 12, 0),
+        tables=[],
+        plates=[{"plate_id": dish_id, "price": 300, "count": 2}, {"plate_id": dish_id, "price": 100}]
+    ), db=db)
+    db.query(Order).update({Order.total: 0, Order.plate_count: 0, Order.pending_plate_count: 7})
+    db.commit()
+
+    mismatches = check_order_counters(db)
+    assert [m.order_id for m in mismatches] == [order.id]
+    assert mismatches[0].expected_total == 700
+
+    assert rebuild_order_counters(db) == 1
+    assert counters(db, order.id) == (700, 2, 2)
+    assert check_order_counters(db) == []
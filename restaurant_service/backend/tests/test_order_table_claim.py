@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.orders import create_order
+from app.db_models import Base, Order, User, Table, Menu, TableForOrder
+from app.schemas.orders_schemas import OrderCreate
+
+THREADS = 16
+ROUNDS = 5
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """Файловая SQLite: у каждого потока свое соединение, как в пуле сервера"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'claim.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_concurrent_orders_claim_each_table_once(file_engine):
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=file_engine)
+
+    with Session() as db:
+        waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+        dish = Menu(name="Борщ", price=300, is_available=True)
+        tables = [Table(number=i, pos_x=i, pos_y=0, status="free", is_available=True) for i in range(1, 3)]
+        db.add_all([waiter, dish, *tables])
+        db.commit()
+        waiter_id, dish_id = waiter.id, dish.id
+        table_ids = [table.id for table in tables]
+
+    for round_number in range(ROUNDS):
+        barrier = threading.Barrier(THREADS)
+        outcomes = []
+        outcomes_lock = threading.Lock()
+
+        def seat():
+            with Session() as db:
+                order_data = OrderCreate(
+                    waiter=waiter_id,
+                    timestart=datetime(2026, 1, 1, 12, round_number),
+                    tables=table_ids,
+                    plates=[{"plate_id": dish_id, "price": 300}]
+                )
+                barrier.wait()
+                try:
+                    result = create_order(order_data, db=db)
+                    outcome = ("won", result.id)
+                except HTTPException as error:
+                    outcome = ("lost", error.status_code)
+            with outcomes_lock:
+                outcomes.append(outcome)
+
+        workers = [threading.Thread(target=seat) for _ in range(THREADS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        winners = [value for kind, value in outcomes if kind == "won"]
+        losers = [value for kind, value in outcomes if kind == "lost"]
+        assert len(winners) == 1
+        assert losers == [400] * (THREADS - 1)
+
+        with Session() as db:
+            links = db.query(TableForOrder).filter(TableForOrder.order == winners[0]).count()
+            assert links == len(table_ids)
+            assert db.query(TableForOrder).count() == len(table_ids) * (round_number + 1)
+            assert db.query(Order).count() == round_number + 1
+            # Освобождаем столы для следующего раунда
+            db.query(Table).update({Table.status: "free"})
+            db.commit()
@@ -0,0 +1,162 @@
+import json
+from datetime import datetime, timedelta
+
+import asyncio
+
+from sqlalchemy import event
+
+from app.api.orders import _list_orders, _load_order, create_order, get_all_orders
+from app.db_models import Order, User, Table, Menu, Category, PlateForOrder, TableForOrder
+from app.schemas.orders_schemas import OrderCreate
+
+
+def seed_menu(db):
+    waiter = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    category = Category(name="Горячее")
+    db.add_all([waiter, category])
+    db.flush()
+
+    dishes = [
+        Menu(name=f"Блюдо {i}", price=100 + i, category=category.id, is_available=True)
+        for i in range(3)
+    ]
+    db.add_all(dishes)
+    db.commit()
+    return waiter.id, [(dish.id, dish.price) for dish in dishes]
+
+
+def seed_orders(db, waiter_id, dishes, count):
+    start = datetime(2026, 1, 1, 12, 0)
+    offset = db.query(Order).count()
+    for i in range(offset, offset + count):
+        table = Table(number=i + 1, pos_x=i, pos_y=0, status="occupied", is_available=True)
+        order = Order(waiter=waiter_id, status="active", timestart=start + timedelta(minutes=i))
+        db.add_all([table, order])
+        db.flush()
+        db.add(TableForOrder(order=order.id, table=table.id))
+        for dish_id, price in dishes:
+            db.add(PlateForOrder(
+                order_id=order.id, plate_id=dish_id, count=1,
+                cooking_status="ordered", price=price
+            ))
+    db.commit()
+
+
+def count_queries(db, query_counter, call):
+    db.expunge_all()
+    query_counter.clear()
+    result = call()
+    return result, len(query_counter)
+
+
+def test_get_all_orders_query_count_is_constant(db, query_counter):
+    waiter_id, dishes = seed_menu(db)
+
+    seed_orders(db, waiter_id, dishes, 2)
+    small, small_queries = count_queries(db, query_counter, lambda: _list_orders(db)[0])
+
+    seed_orders(db, waiter_id, dishes, 40)
+    large, large_queries = count_queries(db, query_counter, lambda: _list_orders(db)[0])
+
+    assert len(small) == 2
+    assert len(large) == 42
+    assert small_queries == large_queries
+    assert large_queries <= 3
+
+
+def test_get_all_orders_returns_full_graph(db):
+    waiter_id, dishes = seed_menu(db)
+    seed_orders(db, waiter_id, dishes, 2)
+
+    orders, _ = _list_orders(db)
+
+    latest = orders[0]
+    assert latest.timestart > orders[1].timestart
+    assert latest.waiter_name == "Анна"
+    assert latest.table_numbers == [2]
+    assert sorted(p.plate_name for p in latest.plates) == ["Блюдо 0", "Блюдо 1", "Блюдо 2"]
+
+
+def test_get_order_uses_eager_loading(db, query_counter):
+    waiter_id, dishes = seed_menu(db)
+    seed_orders(db, waiter_id, dishes, 1)
+    order_id = db.query(Order.id).scalar()
+
+    order, queries = count_queries(db, query_counter, lambda: _load_order(db, order_id))
+
+    assert order.waiter_name == "Анна"
+    assert len(order.plates) == 3
+    assert queries <= 3
+
+
+def test_keyset_pagination_walks_all_orders(db):
+    waiter_id, dishes = seed_menu(db)
+    seed_orders(db, waiter_id, dishes, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        page = asyncio.run(get_all_orders(
+            status=None, waiter_id=None,
+            limit=3, cursor=cursor, include_plates=True, db=db
+        ))
+        seen.extend(order["id"] for order in json.loads(page.body))
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    full, _ = _list_orders(db)
+    assert seen == [order.id for order in full]
+    assert len(seen) == 7
+
+
+def test_orders_without_plates_skip_plate_loading(db, query_counter):
+    waiter_id, dishes = seed_menu(db)
+    seed_orders(db, waiter_id, dishes, 3)
+
+    query_counter.clear()
+    result = asyncio.run(get_all_orders(
+        status=None, waiter_id=None,
+        limit=2, cursor=None, include_plates=False, db=db
+    ))
+
+    body = json.loads(result.body)
+    assert len(body) == 2
+    assert "plates" not in body[0]
+    assert body[0]["table_numbers"] == [3]
+    assert "X-Next-Cursor" in result.headers
+    assert len(query_counter) <= 2
+
+
+def test_create_order_commits_once(db, query_counter):
+    waiter_id, dishes = seed_menu(db)
+    db.add_all([
+        Table(number=1, pos_x=0, pos_y=0, status="free", is_available=True),
+        Table(number=2, pos_x=1, pos_y=0, status="free", is_available=True)
+    ])
+    db.commit()
+    table_ids = [table_id for (table_id,) in db.query(Table.id).all()]
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+
+    dish_id, price = dishes[0]
+    query_counter.clear()
+    response = create_order(OrderCreate(
+        waiter=waiter_id,
+        timestart=datetime(2026, 1, 1, 12, 0),
+        tables=table_ids,
+        plates=[
+            {"plate_id": dish_id, "price": price, "count": 2},
+            {"plate_id": dish_id, "price": price, "comment": "без лука"}
+        ]
+    ), db=db)
+
+    assert len(commits) == 1
+    assert response.waiter_name == "Анна"
+    assert sorted(response.table_numbers) == [1, 2]
+    assert [plate.count for plate in response.plates] == [2, 1]
+    assert [plate.comment for plate in response.plates] == [None, "без лука"]
+
+    stored = _load_order(db, response.id)
+    assert [plate.id for plate in stored.plates] == [plate.id for plate in response.plates]
+    assert {t.status for t in db.query(Table).all()} == {"occupied"}
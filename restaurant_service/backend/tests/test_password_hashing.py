@@ -0,0 +1,31 @@
+from passlib.context import CryptContext
+
+from app.api.auth import _rehash_if_needed
+from app.core.hashing import PasswordHasher
+from app.db_models import User
+
+
+def test_process_pool_hashes_and_verifies():
+    hasher = PasswordHasher(workers=1)
+    try:
+        hashed = hasher.hash("secret-password")
+        assert hashed.startswith("$2b$04$")
+        assert hasher.verify("secret-password", hashed)
+        assert not hasher.verify("wrong-password", hashed)
+    finally:
+        hasher.shutdown()
+
+
+def test_login_rehashes_password_with_old_cost(db):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("secret-password")
+    user = User(name="Анна", login="anna", password=old_hash, role="waiter", is_available=True)
+    db.add(user)
+    db.commit()
+
+    assert PasswordHasher.needs_rehash(old_hash)
+    _rehash_if_needed(user, "secret-password", db)
+
+    db.refresh(user)
+    assert user.password != old_hash
+    assert user.password.startswith("$2b$04$")
+    assert not PasswordHasher.needs_rehash(user.password)
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from app.api.orders import complete_order, create_order, update_order
+from app.api.reports import get_revenue, get_revenue_by_category, get_revenue_by_dish, get_revenue_by_waiter
+from app.core.sales_rollups import rebuild_rollups
+from app.db_models import Category, Menu, OrderHourlyRollup, DishHourlyRollup, User
+from app.schemas.orders_schemas import OrderCreate, OrderUpdate
+
+
+def seed(db):
+    anna = User(name="Анна", login="anna", password="x", role="waiter", is_available=True)
+    oleg = User(name="Олег", login="oleg", password="x", role="waiter", is_available=True)
+    soups = Category(name="Супы")
+    drinks = Category(name="Напитки")
+    db.add_all([anna, oleg, soups, drinks])
+    db.flush()
+    borsch = Menu(name="Борщ", price=300, category=soups.id, is_available=True)
+    tea = Menu(name="Чай", price=100, category=drinks.id, is_available=True)
+    db.add_all([borsch, tea])
+    db.commit()
+    return anna.id, oleg.id, borsch.id, tea.id
+
+
+def place(db, waiter_id, plates, hour):
+    order = create_order(OrderCreate(
+        waiter=waiter_id, timestart=datetime(2026, 3, 1, hour, 0), tables=[], plates=plates
+    ), db=db)
+    complete_order(order.id, db=db)
+    update_order(order.id, OrderUpdate(endtime=datetime(2026, 3, 1, hour, 40)), db=db)
+    return order.id
+
+
+def rollup_rows(db):
+    db.expire_all()
+    orders = sorted((r.hour, r.waiter, r.orders, float(r.revenue)) for r in db.query(OrderHourlyRollup).all())
+    dishes = sorted(
+        (r.hour, r.plate_id, r.category, r.quantity, float(r.revenue)) for r in db.query(DishHourlyRollup).all()
+    )
+    return orders, dishes
+
+
+def test_reports_read_incremental_rollups(db):
+    anna, oleg, borsch, tea = seed(db)
+    place(db, anna, [{"plate_id": borsch, "price": 300, "count": 2}, {"plate_id": tea, "price": 100}], 12)
+    place(db, anna, [{"plate_id": tea, "price": 100, "count": 3}], 12)
+    place(db, oleg, [{"plate_id": borsch, "price": 300}], 12)
+    create_order(OrderCreate(
+        waiter=oleg, timestart=datetime(2026, 3, 1, 13, 0), tables=[],
+        plates=[{"plate_id": borsch, "price": 300}]
+    ), db=db)
+
+    revenue = get_revenue(start=None, end=None, granularity="day", waiter_id=None, db=db)
+    assert [(p.orders, p.revenue) for p in revenue] == [(3, 1300)]
+
+    waiters = get_revenue_by_waiter(start=None, end=None, db=db)
+    assert [(w.waiter_name, w.orders, w.revenue) for w in waiters] == [("Анна", 2, 1000), ("Олег", 1, 300)]
+
+    categories = get_revenue_by_category(start=None, end=None, db=db)
+    assert [(c.category_name, c.quantity, c.revenue) for c in categories] == [("Супы", 3, 900), ("Напитки", 4, 400)]
+
+    dishes = get_revenue_by_dish(start=None, end=None, limit=1, db=db)
+    assert [(d.plate_name, d.quantity) for d in dishes] == [("Борщ", 3)]
+
+
+def test_reopening_order_removes_it_and_rebuild_matches(db):
+    anna, oleg, borsch, tea = seed(db)
+    place(db, anna, [{"plate_id": borsch, "price": 300}], 12)
+    reopened = place(db, oleg, [{"plate_id": tea, "price": 100, "count": 2}], 14)
+
+    update_order(reopened, OrderUpdate(status="active"), db=db)
+    incremental = rollup_rows(db)
+
+    assert rebuild_rollups(db) == 1
+    rebuilt = rollup_rows(db)
+
+    assert incremental == rebuilt
+
+
+def test_moving_dish_keeps_category_of_past_hours(db):
+    anna, oleg, borsch, tea = seed(db)
+    place(db, anna, [{"plate_id": borsch, "price": 300}], 12)
+    order_id = place(db, oleg, [{"plate_id": borsch, "price": 300}], 12)
+    drinks = db.query(Menu).filter(Menu.id == tea).one().category
+
+    db.query(Menu).filter(Menu.id == borsch).update({"category": drinks})
+    db.commit()
+    # Правка закрытого заказа вычитает и снова добавляет его вклад в тот же час
+    update_order(order_id, OrderUpdate(endtime=datetime(2026, 3, 1, 12, 50)), db=db)
+
+    categories = get_revenue_by_category(start=None, end=None, db=db)
+    assert [(c.category_name, c.quantity) for c in categories] == [("Супы", 2)]
+
+
+def test_rebuild_keeps_category_of_sale_after_dish_moves(db):
+    anna, oleg, borsch, tea = seed(db)
+    place(db, anna, [{"plate_id": borsch, "price": 300}], 12)
+    drinks = db.query(Menu).filter(Menu.id == tea).one().category
+
+    db.query(Menu).filter(Menu.id == borsch).update({"category": drinks})
+    db.commit()
+    place(db, oleg, [{"plate_id": borsch, "price": 300, "count": 2}], 14)
+
+    incremental = rollup_rows(db)
+    categories = get_revenue_by_category(start=None, end=None, db=db)
+    assert [(c.category_name, c.quantity) for c in categories] == [("Напитки", 2), ("Супы", 1)]
+
+    assert rebuild_rollups(db) == 2
+    assert rollup_rows(db) == incremental
+    rebuilt = get_revenue_by_category(start=None, end=None, db=db)
+    assert [(c.category_name, c.quantity) for c in rebuilt] == [("Напитки", 2), ("Супы", 1)]
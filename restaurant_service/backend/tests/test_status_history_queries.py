@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta
+
+from app.api.status_history import archive_history_before, get_all_cooking_status_history, get_history_by_order
+from app.db_models import CookingStatusHistory, CookingStatusHistoryArchive, Order, User, Menu
+
+
+def seed_history(db, count):
+    cook = User(name="Олег", login="oleg", password="x", role="cook", is_available=True)
+    dish = Menu(name="Борщ", price=300, is_available=True)
+    db.add_all([cook, dish])
+    db.flush()
+    order = Order(waiter=cook.id, status="active", timestart=datetime(2026, 1, 1, 12, 0))
+    db.add(order)
+    db.flush()
+
+    for i in range(count):
+        db.add(CookingStatusHistory(
+            change_time=datetime(2026, 1, 1, 12, 0) + timedelta(minutes=i),
+            new_status="preparing",
+            order_id=order.id if i % 2 else None,
+            plate_id=dish.id,
+            change_by=cook.id if i % 3 else None
+        ))
+    db.commit()
+    return order.id
+
+
+def test_history_is_resolved_in_one_query(db, query_counter):
+    seed_history(db, 30)
+    query_counter.clear()
+
+    history = json.loads(get_all_cooking_status_history(db=db).body)
+
+    assert len(query_counter) == 1
+    assert len(history) == 30
+    assert all(item["plate_name"] == "Борщ" for item in history)
+    for item in history:
+        assert item["user_name"] == ("Олег" if item["change_by"] else None)
+        assert item["order_number"] == (f"Заказ #{item['order_id']}" if item["order_id"] else None)
+
+
+def test_history_by_order_does_not_grow_with_rows(db, query_counter):
+    order_id = seed_history(db, 20)
+    query_counter.clear()
+
+    history = json.loads(get_history_by_order(order_id, db=db).body)
+
+    assert len(history) == 10
+    assert len(query_counter) == 2
+
+
+def test_archive_moves_only_old_rows(db):
+    seed_history(db, 10)
+    before = datetime(2026, 1, 1, 12, 4)
+
+    archived = archive_history_before(db, before, batch_size=3)
+
+    assert archived == 4
+    assert db.query(CookingStatusHistory).count() == 6
+    assert db.query(CookingStatusHistory).filter(CookingStatusHistory.change_time < before).count() == 0
+    archive = db.query(CookingStatusHistoryArchive).order_by(CookingStatusHistoryArchive.change_time).all()
+    assert [row.change_time.minute for row in archive] == [0, 1, 2, 3]
+    assert all(row.plate_id and row.archived_at for row in archive)
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.users import update_user_full
+from app.core.cache import TTLCache
+from app.core.security import create_access_token, get_current_user, user_cache
+from app.db_models import User
+from app.schemas.users_schemas import UserUpdateFull
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(1) == "a"
+    assert cache.get(2) is None
+    assert cache.get(3) == "c"
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_size=2, ttl_seconds=-1)
+    cache.set(1, "a")
+
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+
+def test_current_user_is_cached_and_blocking_applies_immediately(db, query_counter):
+    user = User(name="Анна", login="anna", password="hash", role="waiter", is_available=True)
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "role": user.role})
+
+    query_counter.clear()
+    first = asyncio.run(get_current_user(token=token, db=db))
+    second = asyncio.run(get_current_user(token=token, db=db))
+
+    assert first.name == second.name == "Анна"
+    assert second.password is None
+    # Повторный запрос читает из БД только роль и is_available
+    assert len(query_counter) == 2
+    assert "password" not in query_counter[1]
+
+    update_user_full(user.id, UserUpdateFull(
+        name="Анна", login="anna", password="hash", role="waiter", is_available=False
+    ), db=db)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_user(token=token, db=db))
+    assert error.value.status_code == 403
+
+
+def test_block_and_role_change_apply_without_local_invalidation(db):
+    user = User(name="Анна", login="anna", password="hash", role="waiter", is_available=True)
+    db.add(user)
+    db.commit()
+    token = create_access_token({"sub": str(user.id), "role": user.role})
+    asyncio.run(get_current_user(token=token, db=db))
+
+    # Изменение, сделанное другим воркером: локальный кеш не сброшен
+    db.query(User).filter(User.id == user.id).update({"role": "admin"})
+    db.commit()
+    assert asyncio.run(get_current_user(token=token, db=db)).role == "admin"
+
+    db.query(User).filter(User.id == user.id).update({"is_available": False})
+    db.commit()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_user(token=token, db=db))
+    assert error.value.status_code == 403